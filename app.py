@@ -1,32 +1,60 @@
-from flask import Flask, jsonify, request, session, abort
+from flask import Flask, jsonify, request, session, abort, make_response, stream_with_context, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from sqlalchemy.ext.mutable import Mutable
 from sqlalchemy_serializer import SerializerMixin
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 from sqlalchemy.exc import IntegrityError
 import json
 from flask_session import Session
 import pytz
-from collections import defaultdict
+from collections import defaultdict, namedtuple, OrderedDict
 from dateutil.relativedelta import relativedelta
 
 from flask_bcrypt import Bcrypt
-from functools import wraps
+from functools import wraps, lru_cache
+from operator import attrgetter, itemgetter
+from bisect import bisect_left
 from urllib.parse import urlparse
-from sqlalchemy.orm import joinedload
-from itsdangerous import URLSafeTimedSerializer
+from sqlalchemy.orm import contains_eager, joinedload, load_only, lazyload, validates
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex
+from itsdangerous import URLSafeTimedSerializer, URLSafeSerializer, BadSignature
 from flask_cors import CORS
 import re
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import jwt
-from sqlalchemy import extract,func, cast, Date, or_
+from sqlalchemy import extract,func, cast, Date, or_, and_, select, literal, literal_column, union_all, update, insert, case, text, event, DDL
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from functools import wraps
 import calendar
+import click
+import csv
+import io
+import zlib
+import hashlib
+import threading
+import math
+import heapq
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor as WorkerPool
+import time
+import queue
+import logging
+import logging.handlers
+import random
+import uuid
+import atexit
+import copy
+from contextlib import contextmanager
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
 
 import os
 
@@ -35,13 +63,256 @@ SECRET_KEY = "your_secret_key"  # Use a secure value here (e.g., from an environ
 app = Flask(__name__)
 bcrypt = Bcrypt(app)
 serializer = URLSafeTimedSerializer(SECRET_KEY)
+cursor_serializer = URLSafeSerializer(SECRET_KEY, salt="pagination-cursor")
 CORS(app, supports_credentials=True, origins=["http://localhost:5173", "http://127.0.0.1:5173", "https://jwhitproductionstattooparlor.netlify.app"], allow_headers=["Content-Type", "Authorization"])
 
+#--------------------------------------------------------------------------------------------#
+# Request metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Seconds; +Inf is implicit
+
+
+class EndpointStats:
+    __slots__ = ('count', 'errors', 'latency_sum', 'buckets', 'db_time', 'queries', 'max_queries', 'rows', 'pool_wait')
+
+    def __init__(self):
+        self.count = self.errors = self.queries = self.max_queries = self.rows = 0
+        self.latency_sum = self.db_time = self.pool_wait = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint latency histograms plus DB time, query count, rows and pool checkout
+    wait, for this process. Per-request counters live in a thread-local and are folded
+    into the endpoint's totals once, under one lock, when the response is ready.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(EndpointStats)
+        self.local = threading.local()
+        self.started_at = datetime.utcnow()
+
+    def begin(self):
+        local = self.local
+        local.start = time.perf_counter()
+        local.queries = local.rows = 0
+        local.db_time = local.pool_wait = 0.0
+        local.active = True
+
+    def query_started(self):
+        self.local.query_start = time.perf_counter()
+
+    def query_finished(self, rowcount):
+        local = self.local
+        if getattr(local, 'active', False):
+            local.queries += 1
+            local.db_time += time.perf_counter() - local.query_start
+            if rowcount > 0:
+                local.rows += rowcount
+
+    def pool_waited(self, seconds):
+        if getattr(self.local, 'active', False):
+            self.local.pool_wait += seconds
+
+    def finish(self, endpoint, status_code):
+        local = self.local
+        if not getattr(local, 'active', False):
+            return
+        local.active = False
+        latency = time.perf_counter() - local.start
+        bucket = bisect_left(LATENCY_BUCKETS, latency)
+        with self.lock:
+            stats = self.endpoints[endpoint]
+            stats.count += 1
+            stats.errors += status_code >= 500
+            stats.latency_sum += latency
+            stats.buckets[bucket] += 1
+            stats.db_time += local.db_time
+            stats.queries += local.queries
+            stats.max_queries = max(stats.max_queries, local.queries)
+            stats.rows += local.rows
+            stats.pool_wait += local.pool_wait
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {slot: copy.copy(getattr(stats, slot)) for slot in EndpointStats.__slots__}
+                for name, stats in self.endpoints.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+            self.started_at = datetime.utcnow()
+
+
+request_metrics = RequestMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            request_metrics.pool_waited(time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def time_query_start(conn, cursor, statement, parameters, context, executemany):
+    request_metrics.query_started()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def time_query_end(conn, cursor, statement, parameters, context, executemany):
+    request_metrics.query_finished(cursor.rowcount)
+
+
+@app.before_request
+def start_request_metrics():
+    request_metrics.begin()
+
+
+@app.after_request
+def record_request_metrics(response):
+    request_metrics.finish(request.endpoint or 'unmatched', response.status_code)
+    return response
+
+
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')  # Use the deployed database
+if (app.config['SQLALCHEMY_DATABASE_URI'] or '').startswith(('postgres', 'postgresql')):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'poolclass': TimedQueuePool}
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
 
+def dialect_insert(model):
+    """INSERT construct with ON CONFLICT support for the bound dialect (PostgreSQL or SQLite)."""
+    return pg_insert(model) if db.engine.dialect.name == "postgresql" else sqlite_insert(model)
+
+# Cache-Control policy per endpoint for conditional GETs; override with a JSON object in CACHE_CONTROL_POLICIES
+app.config['CACHE_CONTROL'] = {
+    'get_artist_by_id': 'public, max-age=60, stale-while-revalidate=300',
+    'artists': 'public, max-age=60, stale-while-revalidate=300',
+    'get_gallery': 'public, max-age=300',
+    'get_all_galleries': 'public, max-age=300',
+    'get_reviews': 'public, max-age=30',
+    'get_newsletters': 'public, max-age=300',
+    'get_global_settings': 'no-cache',  # Always revalidate; the ETag check is served from the settings cache
+}
+app.config['CACHE_CONTROL'].update(json.loads(os.getenv('CACHE_CONTROL_POLICIES', '{}')))
+
+#--------------------------------------------------------------------------------------------#
+# Logging
+# Request threads only enqueue records; a QueueListener thread formats them as JSON lines and writes them out.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+# Fraction of records kept per level; WARNING and above are always kept
+LOG_SAMPLE_RATES = {
+    'DEBUG': float(os.getenv('LOG_SAMPLE_DEBUG', 0.1)),
+    'INFO': float(os.getenv('LOG_SAMPLE_INFO', 1.0)),
+}
+_LOG_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the id, method and path of the request that emitted them."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = getattr(request, 'request_id', None)
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a random fraction of records per level name."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelname, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields become top-level keys."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _LOG_RECORD_FIELDS)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without waiting: a full queue drops the
+    record (counted in `dropped`) instead of stalling the request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback now, so the listener never touches request-owned objects
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging():
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATES))
+    queue_handler.addFilter(RequestContextFilter())
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JSONFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger = logging.getLogger('tattoo_parlor')
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    return logger, queue_handler, listener
+
+
+log, log_handler, log_listener = configure_logging()
+
+
+
+@app.after_request
+def attach_request_id(response):
+    request_id = getattr(request, 'request_id', None)
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    return response
+
 
 @app.before_request
 def before_request():
@@ -49,12 +320,17 @@ def before_request():
     Global token verification applied before each request.
     Skips validation for OPTIONS requests and public endpoints.
     """
+    request.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    # Make sure queued emails left over from a previous run get delivered
+    ensure_outbox_worker()
+
     # Allow OPTIONS requests to bypass token verification
     if request.method == 'OPTIONS':
         return '', 204
 
     # List of public endpoints that don't require authentication
-    public_endpoints = ['signup', 'signin', 'reset_password', 'get_piercings','send_message', 'get_booking', 'request_password_reset',  'delete_photo','search_piercings_by_name', 'search_bookings_by_name','search_piercings_and_bookings','get_average_rating', 'artists' ,'get_artist_by_id','get_artist_bookings','create_review','get_reviews','get_gallery', 'bookings', 'create_booking', 'get_all_galleries', 'show_create_artist_button','create_inquiry', 'create_piercing', 'delete_booking', 'delete_piercing', 'update_piercing', 'update_booking', 'get_or_create_global_setting','subscribe', 'get_newsletters', 'delete_newsletter','create_newsletter', 'get_subscribers', 'unsubscribe', 'metrics/subscribers']
+    public_endpoints = ['signup', 'signin', 'reset_password', 'get_piercings','send_message', 'get_booking', 'request_password_reset',  'delete_photo','search_piercings_by_name', 'search_bookings_by_name','search_piercings_and_bookings','get_average_rating', 'artists' ,'get_artist_by_id','get_artist_bookings','create_review','get_reviews','get_gallery', 'bookings', 'create_booking', 'get_all_galleries', 'show_create_artist_button','create_inquiry', 'create_piercing', 'delete_booking', 'delete_piercing', 'update_piercing', 'update_booking', 'get_or_create_global_setting', 'get_global_settings','subscribe', 'get_newsletters', 'delete_newsletter','create_newsletter', 'get_subscribers', 'unsubscribe', 'metrics/subscribers', 'search_availability']
     if request.endpoint in public_endpoints:
         return  # Skip token validation for public endpoints
 
@@ -74,6 +350,7 @@ def before_request():
         request.user_id = payload.get('user_id')
         request.username = payload.get('username')
         request.user_type = payload.get('user_type')
+        request.token_issued_at = payload.get('iat')
 
     except jwt.ExpiredSignatureError:
         return jsonify({'error': 'Token has expired'}), 401
@@ -83,6 +360,12 @@ def before_request():
 def format_datetime(dt):
     """Format a datetime object into the desired string format."""
     return dt.strftime("%A, %B %d, %Y %I:%M %p") if dt else None
+
+def parse_date_param(value):
+    """Parse a YYYY-MM-DD query parameter. Returns None when absent, raises ValueError when malformed."""
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d')
 def is_valid_url(url):
     regex = re.compile(
         r"^(https?://)?"
@@ -93,15 +376,723 @@ def is_valid_url(url):
     )
     return re.match(regex, url) is not None
 
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds
+    (or at an explicit per-entry deadline). Tracks hits and misses.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + min(self.ttl if ttl is None else ttl, self.ttl)
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key matches `predicate`."""
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class Principal(namedtuple('Principal', 'id username email user_type')):
+    """Immutable snapshot of the authenticated user, safe to share across requests."""
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.email, user.user_type)
+
+
+# Verified token payloads, kept until the token expires (capped at TOKEN_CACHE_TTL)
+token_cache = TTLCache(maxsize=int(os.getenv('TOKEN_CACHE_SIZE', 10000)), ttl=int(os.getenv('TOKEN_CACHE_TTL', 6 * 3600)))
+# Principals keyed by (user_id, token iat); dropped when the principals stamp moves (see revalidate_principals)
+principal_cache = TTLCache(maxsize=int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000)), ttl=int(os.getenv('PRINCIPAL_CACHE_TTL', 60)))
+PRINCIPAL_RECHECK_SECONDS = float(os.getenv('PRINCIPAL_RECHECK_SECONDS', 5))
+principal_cache_state = {"version": None, "checked_at": None}
+PRINCIPAL_ATTRS = ("username", "email", "user_type")
+
+
 def verify_token(token):
+    payload = token_cache.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        return None  # Token expired
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
     except jwt.ExpiredSignatureError:
         return None  # Token expired
     except jwt.InvalidTokenError:
         return None  # Invalid token
 
+    if "exp" in payload:
+        token_cache.set(token, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+
+def invalidate_principal(user_id):
+    """Forget cached principals for a user after their account changes."""
+    principal_cache.discard_where(lambda key: key[0] == user_id)
+
+
+def revalidate_principals(force=False):
+    """
+    Clear the principal cache when a user has been deleted or had their role changed on
+    any worker since the last check. The principals stamp is read at most once every
+    PRINCIPAL_RECHECK_SECONDS, unless `force`.
+    """
+    now = time.monotonic()
+    checked_at = principal_cache_state["checked_at"]
+    if not force and checked_at is not None and now - checked_at < PRINCIPAL_RECHECK_SECONDS:
+        return
+    version = db.session.execute(
+        select(TableVersion.version).where(TableVersion.table_name == "principals")
+    ).scalar() or 0
+    if version != principal_cache_state["version"]:
+        principal_cache.clear()
+        principal_cache_state["version"] = version
+    principal_cache_state["checked_at"] = now
+
+
+def load_principal(user_id, issued_at):
+    """
+    The authenticated user for a verified token, from the cache when possible. A cached
+    admin is only used after a fresh stamp check, so a demotion or deletion on another
+    worker revokes admin access on the next request.
+    """
+    revalidate_principals()
+    key = (user_id, issued_at)
+    principal = principal_cache.get(key)
+    if principal is not None and principal.user_type == 'admin':
+        revalidate_principals(force=True)
+        principal = principal_cache.get(key)
+    if principal is None:
+        user = User.query.get(user_id)
+        if not user:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(key, principal)
+    return principal
+
+
+def encode_cursor(scope, row, sort_attr, direction):
+    """
+    Build an opaque, signed cursor pointing at `row` for keyset pagination.
+    """
+    value = getattr(row, sort_attr)
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    return cursor_serializer.dumps({"s": scope, "k": value, "id": row.id, "d": direction})
+
+
+def decode_cursor(scope, token):
+    """
+    Verify a cursor and return (sort_value, row_id, direction), or None if it is invalid.
+    """
+    try:
+        data = cursor_serializer.loads(token)
+    except BadSignature:
+        return None
+    if not isinstance(data, dict) or data.get("s") != scope or data.get("d") not in ("next", "prev"):
+        return None
+    value = data.get("k")
+    if isinstance(value, dict) and "dt" in value:
+        value = datetime.fromisoformat(value["dt"])
+    return value, data.get("id"), data["d"]
+
+
+def cursor_paginate(query, model, scope, per_page, cursor=None, sort_attr="id", descending=False):
+    """
+    Keyset pagination over (sort_attr, id). Seeks past the cursor with an indexed
+    range predicate instead of OFFSET and never issues a COUNT(*).
+    Returns (items, next_cursor, prev_cursor). Raises ValueError on a bad cursor.
+    """
+    sort_column = getattr(model, sort_attr)
+    direction = "next"
+    ascending = not descending
+
+    if cursor:
+        decoded = decode_cursor(scope, cursor)
+        if decoded is None:
+            raise ValueError("Invalid cursor.")
+        value, last_id, direction = decoded
+        if direction == "prev":
+            ascending = not ascending
+
+        if sort_attr == "id":
+            seek = model.id > last_id if ascending else model.id < last_id
+        elif ascending:
+            seek = or_(sort_column > value, and_(sort_column == value, model.id > last_id))
+        else:
+            seek = or_(sort_column < value, and_(sort_column == value, model.id < last_id))
+        query = query.filter(seek)
+
+    order = [model.id.asc()] if ascending else [model.id.desc()]
+    if sort_attr != "id":
+        order.insert(0, sort_column.asc() if ascending else sort_column.desc())
+
+    rows = query.order_by(None).order_by(*order).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == "prev":
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if direction == "next":
+            if has_more:
+                next_cursor = encode_cursor(scope, rows[-1], sort_attr, "next")
+            if cursor:
+                prev_cursor = encode_cursor(scope, rows[0], sort_attr, "prev")
+        else:
+            if has_more:
+                prev_cursor = encode_cursor(scope, rows[0], sort_attr, "prev")
+            next_cursor = encode_cursor(scope, rows[-1], sort_attr, "next")
+
+    return rows, next_cursor, prev_cursor
+
+
+def sparse_fieldset(query, model, serializer):
+    """
+    Apply `?fields=`: validate the names against the serializer's whitelist and push
+    them down into load_only(). Returns (query, fields, serializer); raises ValueError.
+    """
+    fields = serializer.parse_fields(request.args.get('fields'))
+    if fields:
+        query = query.options(load_only(*serializer.load_only(model, fields)))
+    return query, fields, serializer.only(fields)
+
+
+def cursor_scope(name, *filters):
+    """
+    Scope for the cursors of a filtered list: `name` plus a digest of the filter values,
+    so a cursor is rejected when replayed against different filters.
+    """
+    digest = hashlib.sha1(json.dumps(filters, default=str).encode()).hexdigest()[:16]
+    return f"{name}:{digest}"
+
+
+def cursor_page_response(query, model, key, per_page, scope=None, sort_attr="id", descending=False, serialize=None, extra=None):
+    """
+    JSON response for the opt-in `?cursor=` mode of list endpoints.
+    `extra(items)` may return more top-level fields for the payload.
+    """
+    serialize = serialize or (lambda item: item.to_dict())
+    per_page = min(max(per_page or 1, 1), 100)
+    try:
+        items, next_cursor, prev_cursor = cursor_paginate(
+            query, model, scope or key, per_page,
+            cursor=request.args.get('cursor'), sort_attr=sort_attr, descending=descending
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        key: [serialize(item) for item in items],
+        **(extra(items) if extra else {}),
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "per_page": per_page
+    }), 200
+
+
+# Columns served by the substring search indexes: (table, column)
+SEARCH_INDEXES = [
+    ("bookings", "name"),
+    ("piercings", "name"),
+    ("artists", "name"),
+    ("gallery", "caption"),
+    ("newsletters", "title"),
+    ("subscribers", "email"),
+]
+SEARCH_LIMIT_DEFAULT = 20
+SEARCH_LIMIT_MAX = 100
+# How often a worker checks the search_indexes stamp for indexes built since it started
+SEARCH_BACKEND_RECHECK_SECONDS = int(os.getenv('SEARCH_BACKEND_RECHECK_SECONDS', 30))
+search_backends = {}
+search_backends_state = {"version": None, "checked_at": None}
+
+
+def search_backend(table, column):
+    """
+    Which index backs substring search on table.column: 'pg_trgm', 'fts5' or 'like'
+    (no index yet). Detection is cached until `flask create-search-indexes` bumps the
+    search_indexes stamp, which workers look at every SEARCH_BACKEND_RECHECK_SECONDS.
+    """
+    now = time.monotonic()
+    checked_at = search_backends_state["checked_at"]
+    if checked_at is None or now - checked_at >= SEARCH_BACKEND_RECHECK_SECONDS:
+        version = db.session.execute(
+            select(TableVersion.version).where(TableVersion.table_name == "search_indexes")
+        ).scalar() or 0
+        if version != search_backends_state["version"]:
+            search_backends.clear()
+            search_backends_state["version"] = version
+        search_backends_state["checked_at"] = now
+
+    key = (table, column)
+    if key not in search_backends:
+        dialect = db.engine.dialect.name
+        backend = "like"
+        if dialect == "postgresql":
+            if db.session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                backend = "pg_trgm"
+        elif dialect == "sqlite":
+            found = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": f"{table}_{column}_fts"}
+            ).first()
+            if found:
+                backend = "fts5"
+        search_backends[key] = backend
+    return search_backends[key]
+
+
+def search_limit():
+    """The `limit` query parameter, clamped to SEARCH_LIMIT_MAX."""
+    limit = request.args.get('limit', SEARCH_LIMIT_DEFAULT, type=int)
+    return min(max(limit, 1), SEARCH_LIMIT_MAX)
+
+
+def text_search_clause(model, column, term):
+    """
+    Unranked WHERE clause for a substring match on `column`, for use inside
+    Core statements such as UNIONs. Uses the same indexes as apply_text_search.
+    """
+    backend = search_backend(model.__tablename__, column.key)
+    if backend == "fts5" and len(term) >= 3:
+        fts_table = f"{model.__tablename__}_{column.key}_fts"
+        phrase = '"' + term.replace('"', '""') + '"'
+        return model.id.in_(
+            text(f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :phrase")
+            .bindparams(phrase=phrase).columns(rowid=db.Integer)
+        )
+    return column.ilike(f"%{term}%")
+
+
+def apply_text_search(query, model, column, term, limit=None):
+    """
+    Restrict `query` to rows whose `column` contains `term`, best matches first.
+    Uses the pg_trgm GIN index on PostgreSQL and the FTS5 trigram table on SQLite;
+    terms shorter than a trigram fall back to ILIKE.
+    """
+    backend = search_backend(model.__tablename__, column.key)
+
+    if backend == "pg_trgm":
+        query = query.filter(column.ilike(f"%{term}%")).order_by(func.similarity(column, term).desc(), model.id)
+    elif backend == "fts5" and len(term) >= 3:
+        fts_table = f"{model.__tablename__}_{column.key}_fts"
+        phrase = '"' + term.replace('"', '""') + '"'
+        matches = text(
+            f"SELECT rowid AS rowid, rank AS rank FROM {fts_table} WHERE {fts_table} MATCH :phrase"
+        ).bindparams(phrase=phrase).columns(rowid=db.Integer, rank=db.Float).subquery()
+        query = query.join(matches, model.id == matches.c.rowid).order_by(matches.c.rank, model.id)
+    else:
+        query = query.filter(column.ilike(f"%{term}%"))
+
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def search_index_statements(dialect):
+    """Idempotent DDL that builds the substring search indexes for `dialect`."""
+    if dialect == "postgresql":
+        statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+        for table, column in SEARCH_INDEXES:
+            statements.append(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+        return statements
+
+    if dialect == "sqlite":
+        statements = []
+        for table, column in SEARCH_INDEXES:
+            fts = f"{table}_{column}_fts"
+            statements += [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column}, content='{table}', content_rowid='id', tokenize='trigram')",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]
+        return statements
+
+    return []
+
+
+@app.cli.command("create-search-indexes")
+def create_search_indexes():
+    """Build the pg_trgm (PostgreSQL) or FTS5 trigram (SQLite) substring search indexes."""
+    statements = search_index_statements(db.engine.dialect.name)
+    if not statements:
+        click.echo(f"No search indexes for dialect {db.engine.dialect.name}.")
+        return
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+        bump_table_versions(["search_indexes"], connection)  # Running workers switch over on their next check
+    search_backends.clear()
+    click.echo(f"Created {len(SEARCH_INDEXES)} search indexes.")
+
+
+#--------------------------------------------------------------------------------------------#
+# Query indexes and plan checks
+def model_index_statements(dialect):
+    """
+    CREATE INDEX ... IF NOT EXISTS for every index the models declare, so a database
+    created before an index was added can be brought up to date. On PostgreSQL the
+    indexes are built CONCURRENTLY, without blocking writes to the table.
+    """
+    statements = []
+    for table in db.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=attrgetter("name")):
+            statement = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+            if dialect.name == "postgresql":
+                statement = statement.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+            statements.append(statement)
+    return statements
+
+
+@app.cli.command("create-indexes")
+def create_indexes():
+    """
+    Build any model-declared indexes missing from the database (CONCURRENTLY on PostgreSQL).
+    Deployments get indexes from `flask db upgrade`; this repairs ad-hoc or scratch databases.
+    """
+    statements = model_index_statements(db.engine.dialect)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    click.echo(f"Ensured {len(statements)} indexes.")
+
+
+# Hot queries whose plans must stay on an index: (label, table, statement factory).
+# Tables smaller than PLAN_CHECK_MIN_ROWS are skipped, since a sequential scan is the right plan there.
+PLAN_CHECK_MIN_ROWS = 10_000
+QUERY_PLAN_CHECKS = [
+    ("artist bookings by date", "bookings", lambda artist_id: select(Booking.id)
+        .where(Booking.artist_id == artist_id).order_by(Booking.appointment_date)),
+    ("artist piercings by date", "piercings", lambda artist_id: select(Piercing.id)
+        .where(Piercing.artist_id == artist_id).order_by(Piercing.appointment_date)),
+    ("artist reviews, newest first", "reviews", lambda artist_id: select(Review.id)
+        .where(Review.artist_id == artist_id).order_by(Review.created_at.desc())),
+    ("artist gallery, newest first", "gallery", lambda artist_id: select(Gallery.id)
+        .where(Gallery.artist_id == artist_id).order_by(Gallery.created_at.desc())),
+    ("latest inquiries", "inquiries", lambda artist_id: select(Inquiry.id)
+        .order_by(Inquiry.submitted_at.desc()).limit(20)),
+    ("subscriber by email", "subscribers", lambda artist_id: select(Subscriber.id)
+        .where(func.lower(Subscriber.email) == "someone@example.com")),
+    ("artists created by a user", "artists", lambda artist_id: select(Artist.id)
+        .where(Artist.created_by == -1)),
+    ("recent logins", "users", lambda artist_id: select(User.id)
+        .order_by(User.last_login.desc()).limit(10)),
+]
+
+
+def sequential_scans(connection, statement):
+    """Tables the plan for `statement` reads with a full sequential scan."""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "postgresql":
+        plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans, nodes = [], [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                scans.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return scans
+    if connection.dialect.name == "sqlite":
+        # detail reads "SCAN <table>" for a full scan, "SCAN <table> USING INDEX ..." / "SEARCH ..." otherwise
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return [row[-1].split()[1] for row in rows if row[-1].startswith("SCAN ") and " USING " not in row[-1]]
+    return []
+
+
+def query_plan_report():
+    """Run EXPLAIN on each QUERY_PLAN_CHECKS query and report any that fall back to a sequential scan."""
+    report = []
+    with db.engine.connect() as connection:
+        artist_id = connection.execute(select(func.min(Artist.id))).scalar() or 0
+        for label, table_name, build in QUERY_PLAN_CHECKS:
+            rows = connection.execute(select(func.count()).select_from(db.metadata.tables[table_name])).scalar()
+            if rows < PLAN_CHECK_MIN_ROWS:
+                report.append({"query": label, "table": table_name, "rows": rows, "status": "skipped"})
+                continue
+            # Planner statistics must be current (e.g. straight after a bulk load) for the plan to mean anything
+            connection.execute(text(f"ANALYZE {table_name}"))
+            scans = sequential_scans(connection, build(artist_id))
+            report.append({
+                "query": label, "table": table_name, "rows": rows,
+                "status": "seq_scan" if scans else "ok", "sequential_scans": scans,
+            })
+        connection.commit()
+    return report
+
+
+@app.cli.command("check-query-plans")
+def check_query_plans():
+    """EXPLAIN the hot queries and exit non-zero if any regressed to a sequential scan."""
+    report = query_plan_report()
+    for entry in report:
+        click.echo(f"{entry['status']:9s} {entry['query']} ({entry['table']}, {entry['rows']} rows)")
+    failures = [entry for entry in report if entry["status"] == "seq_scan"]
+    if failures:
+        raise SystemExit(f"{len(failures)} queries use a sequential scan.")
+
+
+#--------------------------------------------------------------------------------------------#
+# Table versions and conditional GETs
+class TableVersion(db.Model):
+    """
+    Monotonic change counter per table, bumped right after every committed write to it.
+    Cheap validators for conditional GETs come from these rows.
+    """
+    __tablename__ = "table_versions"
+
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+VERSIONED_TABLES = {
+    "artists", "bookings", "piercings", "reviews", "gallery", "newsletters", "subscription_events", "global_settings",
+    "artist_schedules",  # Not a table: bumped only when an artist's schedule, name or active flag changes
+    "search_indexes",  # Not a table: bumped by `flask create-search-indexes`
+    "principals",  # Not a table: bumped when a user is deleted or their username, email or role changes
+}
+
+
+def bump_table_versions(tables, connection=None):
+    """
+    Increment the version stamp of each table right away, one upsert per table in name
+    order. Request code should use defer_table_version_bumps instead.
+    """
+    connection = connection or db.session.connection()
+    versions = TableVersion.__table__
+    now = datetime.utcnow()
+    for table_name in sorted(set(tables) & VERSIONED_TABLES):
+        stmt = dialect_insert(versions).values(table_name=table_name, version=1, updated_at=now)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[versions.c.table_name],
+            set_={"version": versions.c.version + 1, "updated_at": now},
+        ))
+
+
+def defer_table_version_bumps(tables, session=None):
+    """
+    Bump the version stamps of `tables` once the current transaction commits. Call after
+    Core writes that bypass the ORM; ORM flushes are picked up automatically.
+    """
+    session = session or db.session
+    session.info.setdefault("pending_versions", set()).update(set(tables) & VERSIONED_TABLES)
+
+
+@event.listens_for(db.session, "after_flush")
+def bump_versions_after_flush(session, flush_context):
+    tables = {
+        obj.__table__.name
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if getattr(obj, "__table__", None) is not None
+    } & VERSIONED_TABLES
+    if tables:
+        defer_table_version_bumps(tables, session)
+        # Stamps this session will bump on commit, so in-process caches can tell their own writes from other workers'
+        flushed = session.info.setdefault("flushed_versions", defaultdict(int))
+        for table_name in tables:
+            flushed[table_name] = 1
+
+
+@event.listens_for(db.session, "after_commit")
+def publish_version_bumps(session):
+    """
+    Bump the stamps in a short transaction of their own after the data commits, so writers
+    never hold a version row lock for the length of their transaction. Readers fetch the
+    stamp before the data, so a cached payload is never older than the stamp it is keyed by;
+    a crash between the two commits leaves the stamp stale until that table's next write.
+    """
+    tables = session.info.pop("pending_versions", None)
+    if not tables:
+        return
+    try:
+        with db.engine.begin() as connection:
+            bump_table_versions(tables, connection)
+    except Exception:
+        log.exception("table version bump failed", extra={"tables": sorted(tables)})
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_version_bumps(session):
+    session.info.pop("pending_versions", None)
+
+
+def conditional_get(*tables):
+    """
+    Serve ETag / Last-Modified validators built from the version stamps of `tables`
+    (the tables the endpoint's payload is read from) and answer 304 when the client's
+    copy is current, before the view runs. Adds the endpoint's Cache-Control policy.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            stamps = db.session.execute(
+                select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+                .where(TableVersion.table_name.in_(tables))
+            ).all()
+            fingerprint = "|".join(f"{name}:{version}" for name, version, _ in sorted(stamps))
+            etag = hashlib.sha1(f"{request.full_path}|{fingerprint}".encode()).hexdigest()
+            last_modified = max((updated_at for _, _, updated_at in stamps), default=None)
+            if last_modified:
+                last_modified = pytz.utc.localize(last_modified.replace(microsecond=0))
+            cache_control = app.config['CACHE_CONTROL'].get(request.endpoint)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                not_modified = bool(
+                    last_modified and request.if_modified_since and last_modified <= request.if_modified_since
+                )
+
+            if not_modified:
+                response = app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            if cache_control:
+                response.headers['Cache-Control'] = cache_control
+            return response
+        return decorated
+    return decorator
+
+
+class ModelSerializer:
+    """
+    Explicit, fixed-field serializer. Each field is compiled once into a getter
+    (an attrgetter for plain columns, or a callable taking the object), so
+    serializing a row is one pass over a tuple with no reflection. Relationships are
+    only followed when named in `nested`, which keeps nesting depth under the caller's
+    control.
+    """
+
+    MAX_CACHED_SUBSETS = 64
+
+    def __init__(self, *fields, nested=None, sources=None):
+        self.getters = tuple(
+            (spec, attrgetter(spec)) if isinstance(spec, str) else spec
+            for spec in fields
+        )
+        self.fields = tuple(name for name, _ in self.getters)
+        self.nested = nested or {}
+        self.sources = sources or {}  # Field -> columns it reads, when not simply its own name
+        self.subsets = {}
+
+    def __call__(self, obj, nested=()):
+        data = {name: get(obj) for name, get in self.getters}
+        for name in nested:
+            data[name] = self.nested[name](obj)
+        return data
+
+    def many(self, objs, nested=()):
+        return [self(obj, nested) for obj in objs]
+
+    def parse_fields(self, raw):
+        """
+        Validate a comma-separated `?fields=` value against this serializer's fields.
+        Returns a tuple of names, or None when every field is wanted. Raises ValueError.
+        """
+        if not raw:
+            return None
+        requested = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+        unknown = [name for name in requested if name not in self.fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(self.fields)}")
+        return requested or None
+
+    def only(self, fields):
+        """A serializer restricted to `fields`, compiled once per distinct field set."""
+        if fields is None:
+            return self
+        subset = self.subsets.get(fields)
+        if subset is None:
+            getters = dict(self.getters)
+            subset = ModelSerializer(*[(name, getters[name]) for name in fields], nested=self.nested, sources=self.sources)
+            if len(self.subsets) < self.MAX_CACHED_SUBSETS:
+                self.subsets[fields] = subset
+        return subset
+
+    def load_only(self, model, fields):
+        """The model columns needed to produce `fields`, for a load_only() query option."""
+        columns = {"id"}
+        for name in fields:
+            columns.update(self.sources.get(name, (name,)))
+        return [getattr(model, column) for column in sorted(columns) if column in model.__table__.columns]
+
+
+def formatted(name):
+    """Field spec that renders a datetime column with format_datetime."""
+    get = attrgetter(name)
+    return name, lambda obj: format_datetime(get(obj))
+
+
+def artist_summary(obj):
+    """One-level artist reference used inside appointment and review payloads."""
+    artist = obj.artist
+    return {"id": artist.id, "name": artist.name} if artist else None
+
 
 def token_required(f):
     @wraps(f)
@@ -118,7 +1109,7 @@ def token_required(f):
         if not hasattr(request, 'user_id'):
             return jsonify({'error': 'Unauthorized access'}), 403
 
-        current_user = User.query.get(request.user_id)
+        current_user = load_principal(request.user_id, request.token_issued_at)
         if not current_user:
             return jsonify({'error': 'User not found'}), 404
 
@@ -136,8 +1127,14 @@ def get_artist_bookings(artist_id):
     if not artist:
         return jsonify({"error": "Artist not found"}), 404
 
-    bookings = Booking.query.filter_by(artist_id=artist_id).all()
-    return jsonify([booking.to_dict() for booking in bookings]), 200
+    try:
+        query, fields, serializer = sparse_fieldset(Booking.query.filter_by(artist_id=artist_id), Booking, booking_serializer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # The artist is already in the identity map, so each booking's artist summary costs no query
+    bookings = query.all()
+    return jsonify(serializer.many(bookings)), 200
 
 @app.delete('/api/users/<int:user_id>')
 @token_required
@@ -152,12 +1149,119 @@ def delete_user(current_user, user_id):
     try:
         db.session.delete(user)
         db.session.commit()
+        invalidate_principal(user_id)
         return jsonify({'message': 'User deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
 
+@app.get('/api/admin/auth-cache')
+@token_required
+def auth_cache_metrics(current_user):
+    """
+    Hit ratios for the token and principal caches (this process only).
+    """
+    if current_user.user_type != 'admin':
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+    return jsonify({'tokens': token_cache.stats(), 'principals': principal_cache.stats()}), 200
+
+
+def pool_status():
+    pool = db.engine.pool
+    status = {'class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            status[name] = getattr(pool, name)()
+    return status
+
+
+def prometheus_metrics(endpoints, pool):
+    """Render the request metrics in the Prometheus text exposition format."""
+    lines = [
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for name, stats in sorted(endpoints.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), stats['buckets']):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'http_request_duration_seconds_bucket{{endpoint="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_sum{{endpoint="{name}"}} {stats["latency_sum"]}')
+        lines.append(f'http_request_duration_seconds_count{{endpoint="{name}"}} {stats["count"]}')
+
+    counters = (
+        ('http_request_errors_total', 'errors'),
+        ('db_query_seconds_total', 'db_time'),
+        ('db_queries_total', 'queries'),
+        ('db_rows_total', 'rows'),
+        ('db_pool_wait_seconds_total', 'pool_wait'),
+    )
+    for metric, field in counters:
+        lines.append(f'# TYPE {metric} counter')
+        lines.extend(
+            f'{metric}{{endpoint="{name}"}} {stats[field]}' for name, stats in sorted(endpoints.items())
+        )
+
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if name in pool:
+            lines.append(f'# TYPE db_pool_{name} gauge')
+            lines.append(f'db_pool_{name} {pool[name]}')
+    lines.append('# TYPE log_records_dropped_total counter')
+    lines.append(f'log_records_dropped_total {log_handler.dropped}')
+    return '\n'.join(lines) + '\n'
+
+
+@app.get('/api/admin/metrics')
+@token_required
+def request_metrics_report(current_user):
+    """
+    Per-endpoint latency, DB time, query counts, rows and pool wait for this process.
+    Pass format=prometheus for the Prometheus text format, reset=true to start a new window.
+    """
+    if current_user.user_type != 'admin':
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+
+    endpoints, since, pool = request_metrics.snapshot(), request_metrics.started_at, pool_status()
+    if request.args.get('reset', 'false').lower() in ('1', 'true', 'yes'):
+        request_metrics.reset()
+
+    if request.args.get('format') == 'prometheus':
+        return app.response_class(prometheus_metrics(endpoints, pool), mimetype='text/plain; version=0.0.4')
+
+    def percentile_ms(stats, fraction):
+        """Upper bound of the histogram bucket holding the given fraction of requests."""
+        target, seen = stats['count'] * fraction, 0
+        for bound, count in zip(LATENCY_BUCKETS, stats['buckets']):
+            seen += count
+            if seen >= target:
+                return bound * 1000
+        return None  # Beyond the largest bucket
+
+    report = {}
+    for name, stats in endpoints.items():
+        count = stats['count'] or 1
+        report[name] = {
+            'requests': stats['count'],
+            'errors': stats['errors'],
+            'latency_avg_ms': round(stats['latency_sum'] / count * 1000, 3),
+            'latency_p50_ms': percentile_ms(stats, 0.5),
+            'latency_p95_ms': percentile_ms(stats, 0.95),
+            'latency_p99_ms': percentile_ms(stats, 0.99),
+            'db_time_avg_ms': round(stats['db_time'] / count * 1000, 3),
+            'queries_avg': round(stats['queries'] / count, 2),
+            'queries_max': stats['max_queries'],
+            'rows_avg': round(stats['rows'] / count, 2),
+            'pool_wait_avg_ms': round(stats['pool_wait'] / count * 1000, 3),
+        }
+    return jsonify({
+        'since': since.isoformat() + 'Z',
+        'endpoints': report,
+        'pool': pool,
+        'log_records_dropped': log_handler.dropped,
+    }), 200
+
+
 @app.delete('/api/artists/<int:artist_id>')
 @token_required
 def delete_artist(current_user, artist_id):
@@ -173,6 +1277,13 @@ def delete_artist(current_user, artist_id):
         return jsonify({'error': 'Unauthorized access'}), 403
 
     try:
+        # Bookings and reviews cascade with the artist, so take them out of the platform totals
+        bump_metrics(None, reviews_count=-(artist.rating_count or 0), rating_sum=-(artist.rating_sum or 0))
+        metrics = ArtistMetrics.query.get(artist_id)
+        if metrics:
+            bump_metrics(None, bookings_count=-metrics.bookings_count, bookings_earnings=-metrics.bookings_earnings)
+            db.session.delete(metrics)
+
         db.session.delete(artist)
         db.session.commit()
         return jsonify({'message': 'Artist deleted successfully'}), 200
@@ -182,9 +1293,129 @@ def delete_artist(current_user, artist_id):
 
 
 
+#--------------------------------------------------------------------------------------------#
+# Appointment scheduling
+DEFAULT_APPOINTMENT_MINUTES = int(os.getenv('DEFAULT_APPOINTMENT_MINUTES', 60))
+MAX_APPOINTMENT_MINUTES = int(os.getenv('MAX_APPOINTMENT_MINUTES', 8 * 60))
+CANCELLED_STATUSES = ('cancelled', 'canceled')
+
+
+class ScheduledAppointment:
+    """
+    Shared by Booking and Piercing: keeps appointment_end = appointment_date + duration
+    in sync on every assignment, so overlap checks can range-scan stored columns.
+    """
+
+    @validates('appointment_date', 'duration_minutes')
+    def sync_appointment_end(self, key, value):
+        start = value if key == 'appointment_date' else self.appointment_date
+        minutes = value if key == 'duration_minutes' else self.duration_minutes
+        if start is not None:
+            self.appointment_end = start + timedelta(minutes=minutes or DEFAULT_APPOINTMENT_MINUTES)
+        return value
+
+
+def parse_duration(value):
+    """Validate an appointment length in minutes. Raises ValueError."""
+    if value is None:
+        return DEFAULT_APPOINTMENT_MINUTES
+    if isinstance(value, bool) or not isinstance(value, int) or not (1 <= value <= MAX_APPOINTMENT_MINUTES):
+        raise ValueError(f"duration_minutes must be an integer between 1 and {MAX_APPOINTMENT_MINUTES}.")
+    return value
+
+
+def find_conflict(artist_id, start, end, exclude=None):
+    """
+    First booking or piercing of `artist_id` overlapping [start, end), as (type, row), or None.
+    Durations are capped at MAX_APPOINTMENT_MINUTES, so candidates are limited to a bounded
+    (artist_id, appointment_date) index range: O(log n) per check regardless of table size.
+    `exclude` is a (type, id) pair to ignore, for updates.
+    """
+    if artist_id is None or start is None:
+        return None
+    earliest = start - timedelta(minutes=MAX_APPOINTMENT_MINUTES)
+
+    with db.session.no_autoflush:
+        for kind, model in (('booking', Booking), ('piercing', Piercing)):
+            query = model.query.options(
+                lazyload('*'), load_only(model.id, model.appointment_date, model.appointment_end)
+            ).filter(
+                model.artist_id == artist_id,
+                model.appointment_date > earliest,
+                model.appointment_date < end,
+                model.appointment_end > start,
+                or_(model.status.is_(None), model.status.notin_(CANCELLED_STATUSES)),
+            )
+            if exclude and exclude[0] == kind:
+                query = query.filter(model.id != exclude[1])
+            conflict = query.order_by(model.appointment_date).first()
+            if conflict:
+                return kind, conflict
+    return None
+
+
+def conflict_response(kind, conflict):
+    return jsonify({
+        'error': 'The artist already has an appointment at that time.',
+        'conflict': {
+            'type': kind,
+            'id': conflict.id,
+            'appointment_date': format_datetime(conflict.appointment_date),
+            'appointment_end': format_datetime(conflict.appointment_end),
+        }
+    }), 409
+
+
+def check_schedule(kind, appointment):
+    """
+    Lock the artist's row (serializing concurrent writes to one artist's calendar) and
+    look for an overlapping appointment. Returns an error response, or None when clear.
+    """
+    if appointment.artist_id is None:
+        return None
+    with db.session.no_autoflush:
+        locked = db.session.execute(
+            select(Artist.id).where(Artist.id == appointment.artist_id).with_for_update()
+        ).first()
+    if not locked:
+        return jsonify({'error': 'Artist not found'}), 404
+
+    found = find_conflict(
+        appointment.artist_id, appointment.appointment_date, appointment.appointment_end,
+        exclude=(kind, appointment.id) if appointment.id else None
+    )
+    if found:
+        return conflict_response(*found)
+    return None
+
+
+def overlap_exclusion(table, artist_id, start, end):
+    """
+    PostgreSQL-only exclusion constraint rejecting overlapping live appointments of one
+    artist within a table (needs btree_gist). Timestamps are naive, hence tsrange.
+    """
+    return ExcludeConstraint(
+        (artist_id, '='), (func.tsrange(start, end), '&&'),
+        name=f"ex_{table}_artist_overlap", using='gist',
+        where=text("status IS NULL OR status NOT IN ('cancelled', 'canceled')"),
+    ).ddl_if(dialect='postgresql')
+
+
+SCHEDULE_CONSTRAINTS = {"ex_bookings_artist_overlap", "ex_piercings_artist_overlap"}
+
+
+def is_schedule_conflict(error):
+    """
+    True when an IntegrityError came from an overlap exclusion constraint, i.e. a
+    concurrent booking won the slot. Any other integrity failure is a real error.
+    """
+    diag = getattr(error.orig, "diag", None)  # psycopg2 names the violated constraint here
+    return getattr(diag, "constraint_name", None) in SCHEDULE_CONSTRAINTS
+
+
 #--------------------------------------------------------------------------------------------#
 # Booking Model
-class Booking(db.Model, SerializerMixin):
+class Booking(db.Model, ScheduledAppointment):
     __tablename__ = "bookings"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -201,16 +1432,32 @@ class Booking(db.Model, SerializerMixin):
     name = db.Column(db.String(100), nullable=False)
     phone_number = db.Column(db.String(15), nullable=False)
     call_or_text_preference = db.Column(db.String(10), nullable=False)  # Choices: 'call', 'text'
+    duration_minutes = db.Column(db.Integer, nullable=False, default=DEFAULT_APPOINTMENT_MINUTES, server_default=str(DEFAULT_APPOINTMENT_MINUTES))
+    appointment_end = db.Column(db.DateTime, nullable=False)  # appointment_date + duration_minutes
     artist = db.relationship("Artist", back_populates="bookings")
 
-    serialize_rules = ("-artist.bookings",)
+    __table_args__ = (
+        db.Index("ix_bookings_artist_appointment", "artist_id", "appointment_date"),
+        overlap_exclusion("bookings", artist_id, appointment_date, appointment_end),
+    )
 
     def to_dict(self):
+        return booking_serializer(self)
+
 
-        booking_dict = super().to_dict()
-        booking_dict["booking_date"] = format_datetime(self.booking_date)
-        booking_dict["appointment_date"] = format_datetime(self.appointment_date)
-        return booking_dict
+event.listen(
+    Booking.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+
+
+booking_serializer = ModelSerializer(
+    "id", formatted("booking_date"), formatted("appointment_date"), "tattoo_style", "tattoo_size",
+    "placement", "artist_id", "studio_location", "price", "payment_status", "status", "name",
+    "phone_number", "call_or_text_preference", "duration_minutes", formatted("appointment_end"),
+    ("artist", artist_summary),
+    sources={"artist": ("artist_id",)},
+)
 
 @app.post('/api/bookings', endpoint='create_booking')
 def create_booking():
@@ -229,6 +1476,11 @@ def create_booking():
     if not all([tattoo_style, tattoo_size, placement, artist_id, studio_location, appointment_date, price, name, phone_number, call_or_text_preference]):
         return jsonify({'error': 'All fields are required'}), 400
 
+    try:
+        duration_minutes = parse_duration(data.get('duration_minutes'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         appointment_date_obj = datetime.strptime(appointment_date, '%A, %B %d, %Y %I:%M %p')
         if appointment_date_obj <= datetime.now():
@@ -246,11 +1498,23 @@ def create_booking():
         price=price,
         name=name,
         phone_number=phone_number,
-        call_or_text_preference=call_or_text_preference
+        call_or_text_preference=call_or_text_preference,
+        duration_minutes=duration_minutes
     )
 
+    error = check_schedule('booking', new_booking)
+    if error:
+        return error
+
     db.session.add(new_booking)
-    db.session.commit()
+    bump_metrics(artist_id, bookings_count=1, bookings_earnings=float(price))
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_schedule_conflict(e):
+            raise
+        return jsonify({'error': 'The artist already has an appointment at that time.'}), 409
     return jsonify(new_booking.to_dict()), 201
 
 @app.patch('/api/bookings/<int:booking_id>')
@@ -260,7 +1524,8 @@ def update_booking(booking_id):
         return jsonify({'error': 'Booking not found'}), 404
 
     data = request.get_json()
-    
+    old_artist_id, old_price = booking.artist_id, booking.price
+
     if 'tattoo_style' in data:
         booking.tattoo_style = data['tattoo_style']
     if 'tattoo_size' in data:
@@ -285,8 +1550,25 @@ def update_booking(booking_id):
         booking.payment_status = data['payment_status']
     if 'status' in data:
         booking.status = data['status']
+    if 'duration_minutes' in data:
+        try:
+            booking.duration_minutes = parse_duration(data['duration_minutes'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-    db.session.commit()
+    if any(field in data for field in ('artist_id', 'appointment_date', 'duration_minutes', 'status')):
+        error = check_schedule('booking', booking)
+        if error:
+            return error
+
+    reassign_metrics('booking', old_artist_id, old_price, booking.artist_id, booking.price)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_schedule_conflict(e):
+            raise
+        return jsonify({'error': 'The artist already has an appointment at that time.'}), 409
     return jsonify(booking.to_dict()), 200
 
 @app.get('/api/bookings', endpoint='bookings')
@@ -294,10 +1576,20 @@ def get_bookings():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
 
-    bookings = Booking.query.paginate(page=page, per_page=per_page)
+    try:
+        query, fields, serializer = sparse_fieldset(Booking.query, Booking, booking_serializer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if fields is None or "artist" in fields:
+        query = query.options(joinedload(Booking.artist).load_only(Artist.id, Artist.name))
+
+    if 'cursor' in request.args:
+        return cursor_page_response(query, Booking, "bookings", per_page, serialize=serializer)
+
+    bookings = query.paginate(page=page, per_page=per_page)
 
     return jsonify({
-        "bookings": [booking.to_dict() for booking in bookings.items],
+        "bookings": serializer.many(bookings.items),
         "total_items": bookings.total,
         "total_pages": bookings.pages,
         "current_page": bookings.page
@@ -317,6 +1609,7 @@ def delete_booking(booking_id):
     if not booking:
         return jsonify({'error': 'Booking not found'}), 404
 
+    bump_metrics(booking.artist_id, bookings_count=-1, bookings_earnings=-booking.price)
     db.session.delete(booking)
     db.session.commit()
     return jsonify({'message': 'Booking deleted successfully'}), 200
@@ -331,7 +1624,7 @@ def search_bookings_by_name():
     if not name:
         return jsonify({'error': 'Search query is required'}), 400
 
-    bookings = Booking.query.filter(Booking.name.ilike(f"%{name}%")).all()
+    bookings = apply_text_search(Booking.query, Booking, Booking.name, name, limit=search_limit()).all()
 
     if not bookings:
         return jsonify({'message': 'No bookings found matching the search query.'}), 404
@@ -339,7 +1632,7 @@ def search_bookings_by_name():
     return jsonify([booking.to_dict() for booking in bookings]), 200
 
 #-----------------------------------------------------------------------------------------------#
-class Piercing(db.Model, SerializerMixin):
+class Piercing(db.Model, ScheduledAppointment):
     __tablename__ = "piercings"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -356,17 +1649,26 @@ class Piercing(db.Model, SerializerMixin):
     name = db.Column(db.String(100), nullable=False)
     phone_number = db.Column(db.String(15), nullable=False)
     call_or_text_preference = db.Column(db.String(10), nullable=False)  # Choices: 'call', 'text'
+    duration_minutes = db.Column(db.Integer, nullable=False, default=DEFAULT_APPOINTMENT_MINUTES, server_default=str(DEFAULT_APPOINTMENT_MINUTES))
+    appointment_end = db.Column(db.DateTime, nullable=False)  # appointment_date + duration_minutes
     artist = db.relationship("Artist", lazy="joined")
 
-    serialize_rules = ("-artist.piercings",)
+    __table_args__ = (
+        db.Index("ix_piercings_artist_appointment", "artist_id", "appointment_date"),
+        overlap_exclusion("piercings", artist_id, appointment_date, appointment_end),
+    )
 
     def to_dict(self):
+        return piercing_serializer(self)
 
-        
-        piercing_dict = super().to_dict()
-        piercing_dict["booking_date"] = format_datetime(self.booking_date)
-        piercing_dict["appointment_date"] = format_datetime(self.appointment_date)
-        return piercing_dict
+
+piercing_serializer = ModelSerializer(
+    "id", formatted("booking_date"), formatted("appointment_date"), "piercing_type", "jewelry_type",
+    "placement", "artist_id", "studio_location", "price", "payment_status", "status", "name",
+    "phone_number", "call_or_text_preference", "duration_minutes", formatted("appointment_end"),
+    ("artist", artist_summary),
+    sources={"artist": ("artist_id",)},
+)
 
 @app.post('/api/piercings', endpoint='create_piercing')
 def create_piercing():
@@ -385,6 +1687,11 @@ def create_piercing():
     if not all([piercing_type, jewelry_type, placement, studio_location, appointment_date, price, name, phone_number, call_or_text_preference]):
         return jsonify({'error': 'All fields are required'}), 400
 
+    try:
+        duration_minutes = parse_duration(data.get('duration_minutes'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         appointment_date_obj = datetime.strptime(appointment_date, '%A, %B %d, %Y %I:%M %p')
         if appointment_date_obj <= datetime.now():
@@ -402,12 +1709,23 @@ def create_piercing():
         name=name,
         phone_number=phone_number,
         call_or_text_preference=call_or_text_preference,
-                artist_id=artist_id  # Include artist_id
-
+                artist_id=artist_id,  # Include artist_id
+        duration_minutes=duration_minutes
     )
 
+    error = check_schedule('piercing', new_piercing)
+    if error:
+        return error
+
     db.session.add(new_piercing)
-    db.session.commit()
+    bump_metrics(artist_id, piercings_count=1, piercings_earnings=float(price))
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_schedule_conflict(e):
+            raise
+        return jsonify({'error': 'The artist already has an appointment at that time.'}), 409
     return jsonify(new_piercing.to_dict()), 201
 
 
@@ -416,10 +1734,20 @@ def get_piercings():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
 
-    piercings = Piercing.query.paginate(page=page, per_page=per_page)
+    try:
+        query, fields, serializer = sparse_fieldset(Piercing.query, Piercing, piercing_serializer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if fields is not None and "artist" not in fields:
+        query = query.options(lazyload(Piercing.artist))  # Skip the default artist join
+
+    if 'cursor' in request.args:
+        return cursor_page_response(query, Piercing, "piercings", per_page, serialize=serializer)
+
+    piercings = query.paginate(page=page, per_page=per_page)
 
     return jsonify({
-        "piercings": [piercing.to_dict() for piercing in piercings.items],
+        "piercings": serializer.many(piercings.items),
         "total_items": piercings.total,
         "total_pages": piercings.pages,
         "current_page": piercings.page
@@ -445,6 +1773,8 @@ def update_piercing(piercing_id):
         return jsonify({'error': 'Piercing not found'}), 404
 
     data = request.get_json()
+    old_artist_id, old_price = piercing.artist_id, piercing.price
+
     if 'piercing_type' in data:
         piercing.piercing_type = data['piercing_type']
     if 'jewelry_type' in data:
@@ -481,8 +1811,25 @@ def update_piercing(piercing_id):
         if data['call_or_text_preference'] not in ['call', 'text']:
             return jsonify({'error': 'Invalid preference. Choose "call" or "text".'}), 400
         piercing.call_or_text_preference = data['call_or_text_preference']
+    if 'duration_minutes' in data:
+        try:
+            piercing.duration_minutes = parse_duration(data['duration_minutes'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-    db.session.commit()
+    if any(field in data for field in ('artist_id', 'appointment_date', 'duration_minutes', 'status')):
+        error = check_schedule('piercing', piercing)
+        if error:
+            return error
+
+    reassign_metrics('piercing', old_artist_id, old_price, piercing.artist_id, piercing.price)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_schedule_conflict(e):
+            raise
+        return jsonify({'error': 'The artist already has an appointment at that time.'}), 409
     return jsonify(piercing.to_dict()), 200
 
 @app.delete('/api/piercings/<int:piercing_id>')
@@ -492,6 +1839,7 @@ def delete_piercing(piercing_id):
     if not piercing:
         return jsonify({'error': 'Piercing not found'}), 404
 
+    bump_metrics(piercing.artist_id, piercings_count=-1, piercings_earnings=-piercing.price)
     db.session.delete(piercing)
     db.session.commit()
     return jsonify({'message': 'Piercing deleted successfully'}), 200
@@ -507,16 +1855,395 @@ def search_piercings_by_name():
     if not name:
         return jsonify({'error': 'Search query is required'}), 400
 
-    piercings = Piercing.query.filter(Piercing.name.ilike(f"%{name}%")).all()
+    piercings = apply_text_search(Piercing.query, Piercing, Piercing.name, name, limit=search_limit()).all()
 
     if not piercings:
         return jsonify({'message': 'No piercings found matching the search query.'}), 404
 
     return jsonify([piercing.to_dict() for piercing in piercings]), 200
 
+@app.get('/api/appointments/search', endpoint='search_piercings_and_bookings')
+def search_piercings_and_bookings():
+    """
+    Search bookings and piercings together by client name, phone number and/or
+    appointment date range (YYYY-MM-DD, inclusive). One UNION ALL query, sorted and
+    paginated in SQL, returning a lightweight typed projection.
+    """
+    name = request.args.get('name', "").strip()
+    phone = request.args.get('phone', "").strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    order = request.args.get('order', 'asc')
+
+    try:
+        start_date = parse_date_param(request.args.get('start_date'))
+        end_date = parse_date_param(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+    if end_date:
+        end_date += timedelta(days=1)  # Make the end date inclusive
+
+    if not any([name, phone, start_date, end_date]):
+        return jsonify({'error': 'Search query is required'}), 400
+
+    results = appointments_feed_query(
+        start_date, end_date, name=name or None, phone=phone or None, fields=APPOINTMENT_SEARCH_FIELDS
+    )
+    if order == 'desc':
+        ordering = (results.c.appointment_date.desc(), results.c.type, results.c.id.desc())
+    else:
+        ordering = (results.c.appointment_date.asc(), results.c.type, results.c.id.asc())
+
+    stmt = select(results).order_by(*ordering).limit(per_page + 1).offset((page - 1) * per_page)
+    rows = db.session.execute(stmt).mappings().all()
+
+    return jsonify({
+        'results': [
+            {**row, 'appointment_date': format_datetime(row['appointment_date'])}
+            for row in rows[:per_page]
+        ],
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': len(rows) > per_page
+    }), 200
+
+#--------------------------------------------------------------------------------------------#
+# Bulk appointment import
+MAX_BULK_APPOINTMENTS = int(os.getenv('MAX_BULK_APPOINTMENTS', 500))
+APPOINTMENT_DATE_FORMAT = '%A, %B %d, %Y %I:%M %p'
+
+BulkSpec = namedtuple('BulkSpec', 'model required optional')
+BULK_APPOINTMENTS = {
+    'booking': BulkSpec(
+        Booking,
+        ('tattoo_style', 'tattoo_size', 'placement', 'artist_id', 'studio_location', 'appointment_date',
+         'price', 'name', 'phone_number', 'call_or_text_preference'),
+        ('duration_minutes', 'status', 'payment_status'),
+    ),
+    'piercing': BulkSpec(
+        Piercing,
+        ('piercing_type', 'jewelry_type', 'placement', 'studio_location', 'appointment_date',
+         'price', 'name', 'phone_number', 'call_or_text_preference'),
+        ('artist_id', 'duration_minutes', 'status', 'payment_status'),
+    ),
+}
+SCHEDULE_FIELDS = ('artist_id', 'appointment_date', 'duration_minutes', 'status')
+
+
+@lru_cache(maxsize=1024)
+def parse_appointment_date(value):
+    """strptime the API's appointment format; imported sheets repeat the same few slots, so results are memoized."""
+    return datetime.strptime(value, APPOINTMENT_DATE_FORMAT)
+
+
+def clean_appointment(kind, item, partial=False, allow_past=False):
+    """
+    Validate one bulk item into column values. `partial` checks only the fields
+    present (updates). Raises ValueError describing the first problem.
+    """
+    spec = BULK_APPOINTMENTS[kind]
+    if not isinstance(item, dict):
+        raise ValueError('Each item must be an object.')
+    fields = spec.required + spec.optional
+    unknown = set(item) - set(fields) - ({'id'} if partial else set())
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not partial:
+        missing = [field for field in spec.required if not item.get(field)]
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    values = {field: item[field] for field in fields if field in item}
+    if 'appointment_date' in values:
+        try:
+            values['appointment_date'] = parse_appointment_date(values['appointment_date'])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid date format. Use "Thursday, April 1, 2024 5:00 PM".')
+        if not allow_past and values['appointment_date'] <= datetime.now():
+            raise ValueError('Appointment date must be in the future')
+    if 'price' in values:
+        try:
+            values['price'] = float(values['price'])
+        except (TypeError, ValueError):
+            raise ValueError('price must be a number.')
+    if 'artist_id' in values and values['artist_id'] is not None \
+            and (isinstance(values['artist_id'], bool) or not isinstance(values['artist_id'], int)):
+        raise ValueError('artist_id must be an integer.')
+    if 'call_or_text_preference' in values and values['call_or_text_preference'] not in ('call', 'text'):
+        raise ValueError('Invalid preference. Choose "call" or "text".')
+    if not partial or 'duration_minutes' in values:
+        values['duration_minutes'] = parse_duration(values.get('duration_minutes'))
+    return values
+
+
+def batch_schedule_errors(kind, candidates, exclude_ids=()):
+    """
+    Artist and double-booking checks for a whole batch: one locking SELECT on the artists
+    and one range query per appointment table. `candidates` maps item index to
+    (artist_id, start, end, check); start None means the item holds no slot (cancelled),
+    and only items with check=True are reported as the offender of an overlap.
+    `exclude_ids` are rows of `kind` the batch rewrites. Returns per-item error dicts.
+    """
+    artist_ids = sorted({c[0] for c in candidates.values() if c[0] is not None})
+    if not artist_ids:
+        return []
+    found = set(db.session.execute(
+        select(Artist.id).where(Artist.id.in_(artist_ids)).order_by(Artist.id).with_for_update()
+    ).scalars())
+    errors = [
+        {'index': index, 'error': 'Artist not found'}
+        for index, (artist_id, _, _, _) in candidates.items()
+        if artist_id is not None and artist_id not in found
+    ]
+    live = {index: c for index, c in candidates.items() if c[0] in found and c[1] is not None}
+    if not live:
+        return errors
+
+    window = timedelta(minutes=MAX_APPOINTMENT_MINUTES)
+    earliest = min(c[1] for c in live.values()) - window
+    latest = max(c[2] for c in live.values())
+    booked = defaultdict(list)  # artist_id -> [(start, end, conflict)] already stored
+    for other_kind, model in (('booking', Booking), ('piercing', Piercing)):
+        stmt = select(model.id, model.artist_id, model.appointment_date, model.appointment_end).where(
+            model.artist_id.in_(sorted({c[0] for c in live.values()})),
+            model.appointment_date > earliest,
+            model.appointment_date < latest,
+            or_(model.status.is_(None), model.status.notin_(CANCELLED_STATUSES)),
+        )
+        if other_kind == kind and exclude_ids:
+            stmt = stmt.where(model.id.notin_(sorted(exclude_ids)))
+        for row_id, artist_id, start, end in db.session.execute(stmt):
+            booked[artist_id].append((start, end, {
+                'type': other_kind, 'id': row_id,
+                'appointment_date': format_datetime(start), 'appointment_end': format_datetime(end),
+            }))
+
+    batch = defaultdict(list)  # artist_id -> [(start, end, index)] from this request
+    for index, (artist_id, start, end, _) in live.items():
+        batch[artist_id].append((start, end, index))
+    for entries in list(booked.values()) + list(batch.values()):
+        entries.sort(key=lambda entry: entry[0])
+    starts = {key: [entry[0] for entry in entries] for key, entries in booked.items()}
+    batch_starts = {key: [entry[0] for entry in entries] for key, entries in batch.items()}
+
+    def overlapping(entries, entry_starts, start, end):
+        for entry in entries[bisect_left(entry_starts, start - window):bisect_left(entry_starts, end)]:
+            if entry[1] > start:
+                yield entry
+
+    for index, (artist_id, start, end, check) in sorted(live.items()):
+        if not check:
+            continue
+        conflict = next((entry[2] for entry in overlapping(
+            booked[artist_id], starts.get(artist_id, []), start, end
+        )), None)
+        if conflict is None:
+            conflict = next((
+                {'type': kind, 'index': other}
+                for _, _, other in overlapping(batch[artist_id], batch_starts[artist_id], start, end)
+                if other != index and (other < index or not live[other][3])
+            ), None)
+        if conflict is not None:
+            errors.append({
+                'index': index, 'error': 'The artist already has an appointment at that time.', 'conflict': conflict
+            })
+    return errors
+
+
+def bulk_error_response(errors):
+    status = 409 if all('conflict' in error for error in errors) else 400
+    return jsonify({
+        'error': 'No appointments were saved.',
+        'errors': sorted(errors, key=lambda error: error['index']),
+    }), status
+
+
+def bulk_request_items():
+    """The JSON array of a bulk request, or raise ValueError."""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        raise ValueError('Request body must be a non-empty JSON array.')
+    if len(items) > MAX_BULK_APPOINTMENTS:
+        raise ValueError(f'At most {MAX_BULK_APPOINTMENTS} appointments per request.')
+    return items
+
+
+@app.post('/api/bookings/bulk', defaults={'kind': 'booking'})
+@app.post('/api/piercings/bulk', defaults={'kind': 'piercing'})
+@token_required
+def bulk_create_appointments(current_user, kind):
+    """
+    Create up to MAX_BULK_APPOINTMENTS bookings or piercings in one transaction.
+    Every item is validated (fields, artist, double-booking) before anything is written;
+    any failure rejects the whole batch with per-item errors. Pass allow_past=true to
+    import past appointments.
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+    try:
+        items = bulk_request_items()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    allow_past = request.args.get('allow_past', 'false').lower() in ('1', 'true', 'yes')
+    spec = BULK_APPOINTMENTS[kind]
+
+    rows, errors = {}, []
+    for index, item in enumerate(items):
+        try:
+            rows[index] = clean_appointment(kind, item, allow_past=allow_past)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    candidates = {}
+    for index, row in rows.items():
+        row.setdefault('artist_id', None)
+        row.setdefault('status', 'pending')
+        row.setdefault('payment_status', 'unpaid')
+        # Core inserts skip the model's validators, so the end is computed here
+        row['appointment_end'] = row['appointment_date'] + timedelta(minutes=row['duration_minutes'])
+        cancelled = row['status'] in CANCELLED_STATUSES
+        candidates[index] = (
+            row['artist_id'],
+            None if cancelled else row['appointment_date'],
+            None if cancelled else row['appointment_end'],
+            True,
+        )
+    errors += batch_schedule_errors(kind, candidates)
+    if errors:
+        db.session.rollback()
+        return bulk_error_response(errors)
+
+    ordered = [rows[index] for index in sorted(rows)]
+    ids = db.session.execute(
+        insert(spec.model).returning(spec.model.id, sort_by_parameter_order=True), ordered
+    ).scalars().all()
+
+    count_field, earnings_field = f"{kind}s_count", f"{kind}s_earnings"
+    per_artist = defaultdict(lambda: [0, 0.0])
+    for row in ordered:
+        per_artist[row['artist_id']][0] += 1
+        per_artist[row['artist_id']][1] += row['price']
+    for artist_id, (count, earnings) in per_artist.items():
+        bump_metrics(artist_id, include_platform=False, **{count_field: count, earnings_field: earnings})
+    bump_metrics(None, **{count_field: len(ordered), earnings_field: sum(row['price'] for row in ordered)})
+    daily = daily_stat_deltas()
+    for row in ordered:
+        add_daily_delta(daily, kind, row['appointment_date'], row['price'], 1)
+    bump_daily_stats(daily)
+    defer_table_version_bumps([spec.model.__tablename__])
+
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_schedule_conflict(e):
+            raise
+        return jsonify({'error': 'The artist already has an appointment at that time.'}), 409
+    return jsonify({'created': len(ids), 'ids': ids}), 201
+
+
+@app.patch('/api/bookings/bulk', defaults={'kind': 'booking'})
+@app.patch('/api/piercings/bulk', defaults={'kind': 'piercing'})
+@token_required
+def bulk_update_appointments(current_user, kind):
+    """
+    Update up to MAX_BULK_APPOINTMENTS bookings or piercings in one transaction.
+    Each item carries its `id` plus the fields to change; validation mirrors the bulk create.
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+    try:
+        items = bulk_request_items()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    allow_past = request.args.get('allow_past', 'false').lower() in ('1', 'true', 'yes')
+    spec = BULK_APPOINTMENTS[kind]
+    model = spec.model
+
+    changes, errors, seen = {}, [], set()
+    for index, item in enumerate(items):
+        row_id = item.get('id') if isinstance(item, dict) else None
+        if isinstance(row_id, bool) or not isinstance(row_id, int):
+            errors.append({'index': index, 'error': 'Each item needs an integer id.'})
+            continue
+        if row_id in seen:
+            errors.append({'index': index, 'error': f'Duplicate id {row_id}.'})
+            continue
+        seen.add(row_id)
+        try:
+            changes[index] = (row_id, clean_appointment(kind, item, partial=True, allow_past=allow_past))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    current = {
+        row.id: row for row in db.session.execute(
+            select(model.id, model.artist_id, model.price, model.appointment_date,
+                   model.duration_minutes, model.status)
+            .where(model.id.in_(sorted(seen))).order_by(model.id).with_for_update()
+        )
+    }
+
+    candidates, updates = {}, []
+    for index, (row_id, values) in changes.items():
+        old = current.get(row_id)
+        if old is None:
+            errors.append({'index': index, 'error': f'{kind.capitalize()} {row_id} not found'})
+            continue
+        start = values.get('appointment_date', old.appointment_date)
+        minutes = values.get('duration_minutes', old.duration_minutes) or DEFAULT_APPOINTMENT_MINUTES
+        if 'appointment_date' in values or 'duration_minutes' in values:
+            values['appointment_end'] = start + timedelta(minutes=minutes)
+        cancelled = values.get('status', old.status) in CANCELLED_STATUSES
+        candidates[index] = (
+            values.get('artist_id', old.artist_id),
+            None if cancelled else start,
+            None if cancelled else start + timedelta(minutes=minutes),
+            any(field in values for field in SCHEDULE_FIELDS),
+        )
+        updates.append((old, {'id': row_id, **values}))
+    errors += batch_schedule_errors(kind, candidates, exclude_ids=seen)
+    if errors:
+        db.session.rollback()
+        return bulk_error_response(errors)
+
+    db.session.execute(update(model), [values for _, values in updates])
+
+    count_field, earnings_field = f"{kind}s_count", f"{kind}s_earnings"
+    per_artist = defaultdict(lambda: [0, 0.0])
+    platform_earnings = 0.0
+    daily = daily_stat_deltas()
+    for old, values in updates:
+        old_price = float(old.price or 0)
+        new_artist, new_price = values.get('artist_id', old.artist_id), values.get('price', old_price)
+        if 'appointment_date' in values or 'price' in values:
+            add_daily_delta(daily, kind, old.appointment_date, old_price, -1)
+            add_daily_delta(daily, kind, values.get('appointment_date', old.appointment_date), new_price, 1)
+        if new_artist == old.artist_id:
+            per_artist[new_artist][1] += new_price - old_price
+        else:
+            per_artist[old.artist_id][0] -= 1
+            per_artist[old.artist_id][1] -= old_price
+            per_artist[new_artist][0] += 1
+            per_artist[new_artist][1] += new_price
+        platform_earnings += new_price - old_price
+    for artist_id, (count, earnings) in per_artist.items():
+        bump_metrics(artist_id, include_platform=False, **{count_field: count, earnings_field: earnings})
+    bump_metrics(None, **{earnings_field: platform_earnings})
+    bump_daily_stats(daily)
+    defer_table_version_bumps([model.__tablename__])
+
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_schedule_conflict(e):
+            raise
+        return jsonify({'error': 'The artist already has an appointment at that time.'}), 409
+    return jsonify({'updated': len(updates), 'ids': [values['id'] for _, values in updates]}), 200
+
 #--------------------------------------------------------------------------------------------#
 # Artist Model
-class Artist(db.Model, SerializerMixin):
+class Artist(db.Model):
     __tablename__ = "artists"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -527,6 +2254,13 @@ class Artist(db.Model, SerializerMixin):
     years_of_experience = db.Column(db.Integer, nullable=True)
     styles = db.Column(db.JSON, nullable=True, default=[])  # Default to empty list
     average_rating = db.Column(db.Float, nullable=True, default=0.0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    star_1_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    star_2_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    star_3_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    star_4_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    star_5_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     location = db.Column(db.String(100), nullable=True)
     profile_picture = db.Column(db.String(255), nullable=True)
     availability_schedule = db.Column(db.JSON, nullable=True, default={})  # Default to empty dict
@@ -535,22 +2269,26 @@ class Artist(db.Model, SerializerMixin):
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now(), nullable=False)
-    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Foreign key to User model
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)  # Foreign key to User model
 
     reviews = db.relationship("Review", back_populates="artist", cascade="all, delete-orphan")
     gallery = db.relationship("Gallery", back_populates="artist", cascade="all, delete-orphan")
     bookings = db.relationship("Booking", back_populates="artist", cascade="all, delete-orphan")
 
-    serialize_rules = ("-bookings.artist", "-reviews.artist")
+    def to_dict(self, nested=()):
+        """`nested` may name 'reviews' and/or 'gallery' to embed them one level deep."""
+        return artist_serializer(self, nested)
 
-    def to_dict(self):
-        artist_dict = super().to_dict()
-        artist_dict["social_media"] = self.parse_social_media()
-        artist_dict["styles"] = self.styles or []  # Directly use the JSON field
-        artist_dict["created_at"] = format_datetime(self.created_at)
-        artist_dict["updated_at"] = format_datetime(self.updated_at)
-        artist_dict["is_active"] = self.is_active
-        return artist_dict
+    def rating_histogram(self):
+        """Review counts per star, read from the stored counters."""
+        return {str(stars): getattr(self, f"star_{stars}_count") or 0 for stars in range(1, 6)}
+
+    def rating_summary(self):
+        return {
+            "average_rating": self.average_rating or 0,
+            "rating_count": self.rating_count or 0,
+            "rating_histogram": self.rating_histogram(),
+        }
 
 
     def parse_social_media(self):
@@ -562,6 +2300,19 @@ class Artist(db.Model, SerializerMixin):
             return {}
         return dict(item.strip().split(": ") for item in self.social_media.split(",") if ": " in item)
 
+
+artist_serializer = ModelSerializer(
+    "id", "name", "specialties", "bio", ("social_media", Artist.parse_social_media), "years_of_experience",
+    ("styles", lambda artist: artist.styles or []), "average_rating", "rating_count",
+    ("rating_histogram", Artist.rating_histogram), "location", "profile_picture", "availability_schedule",
+    "certifications", "awards", "is_active", formatted("created_at"), formatted("updated_at"), "created_by",
+    nested={
+        "reviews": lambda artist: review_serializer.many(artist.reviews),
+        "gallery": lambda artist: gallery_serializer.many(artist.gallery),
+    },
+    sources={"rating_histogram": tuple(f"star_{stars}_count" for stars in range(1, 6))},
+)
+
 # Utility Function
 def validate_json(data, required_fields):
     """
@@ -625,12 +2376,13 @@ def create_artist(current_user):
 
 
 @app.get('/api/artists/<int:artist_id>')
+@conditional_get("artists", "reviews", "gallery")
 def get_artist_by_id(artist_id):
     """Public endpoint to fetch an artist profile."""
     artist = Artist.query.get(artist_id)
     if not artist:
         return jsonify({"error": "Artist not found"}), 404
-    return jsonify(artist.to_dict()), 200
+    return jsonify(artist.to_dict(nested=("reviews", "gallery"))), 200
 
 @app.patch('/api/artists/<int:artist_id>')
 @token_required
@@ -704,6 +2456,7 @@ def update_artist(current_user, artist_id):
 
 
 @app.get('/api/artists', endpoint='artists')
+@conditional_get("artists")
 def get_all_artists():
     """
     Fetch all artists.
@@ -711,10 +2464,15 @@ def get_all_artists():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 100, type=int)
 
-    artists_query = Artist.query.paginate(page=page, per_page=per_page)
+    try:
+        query, fields, serializer = sparse_fieldset(Artist.query, Artist, artist_serializer)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    artists_query = query.paginate(page=page, per_page=per_page)
 
     return jsonify({
-        "artists": [artist.to_dict() for artist in artists_query.items],
+        "artists": serializer.many(artists_query.items),
         "total_items": artists_query.total,
         "total_pages": artists_query.pages,
         "current_page": artists_query.page
@@ -743,14 +2501,14 @@ def search_artists():
 
     # Search by name
     if name:
-        query = query.filter(Artist.name.ilike(f"%{name}%"))
+        query = apply_text_search(query, Artist, Artist.name, name)
 
     # Filter by minimum years of experience
     if min_experience is not None:
         query = query.filter(Artist.years_of_experience >= min_experience)
 
     # Execute the query
-    artists = query.all()
+    artists = query.limit(search_limit()).all() if name else query.all()
 
     # Return the results
     if not artists:
@@ -791,10 +2549,340 @@ def deactivate_artist(current_user, artist_id):
     status = "activated" if is_active else "deactivated"
     return jsonify({'message': f'Artist {status} successfully', 'artist': artist.to_dict()}), 200
 
+#--------------------------------------------------------------------#
+# Availability search
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MAX_AVAILABILITY_DAYS = int(os.getenv('MAX_AVAILABILITY_DAYS', 31))
+MAX_AVAILABILITY_RESULTS = 500
+WEEKDAYS = {name.lower(): index for index, name in enumerate(calendar.day_name)}
+WEEKDAYS.update({name.lower(): index for index, name in enumerate(calendar.day_abbr)})
+
+
+def parse_clock(value):
+    """Parse "HH:MM" (24:00 allowed) into minutes after midnight. Raises ValueError."""
+    hours, minutes = (int(part) for part in str(value).strip().split(':'))
+    total = hours * 60 + minutes
+    if not (0 <= minutes < 60 and 0 <= total <= 24 * 60):
+        raise ValueError(f"Invalid time: {value}")
+    return total
+
+
+def slot_mask(start_minute, end_minute, inward=False):
+    """
+    Bitmap of the slots covering [start_minute, end_minute) of a day; bit i is slot i.
+    Busy time rounds outward to whole slots, open time rounds inward (`inward=True`).
+    """
+    if inward:
+        first, last = -(-start_minute // SLOT_MINUTES), end_minute // SLOT_MINUTES
+    else:
+        first, last = start_minute // SLOT_MINUTES, -(-end_minute // SLOT_MINUTES)
+    first, last = max(first, 0), min(last, SLOTS_PER_DAY)
+    return ((1 << last) - 1) ^ ((1 << first) - 1) if last > first else 0
+
+
+def compile_weekly_schedule(schedule):
+    """
+    Compile an artist's availability_schedule into seven open-slot bitmaps (Monday first).
+    Accepted shapes per weekday key ("monday" or "mon"): "10:00-18:00", ["10:00", "18:00"],
+    {"start": "10:00", "end": "18:00"}, or a list of any of those. Unreadable entries are
+    treated as closed.
+    """
+    if isinstance(schedule, str):  # create_artist historically stored the dict JSON-encoded
+        try:
+            schedule = json.loads(schedule)
+        except ValueError:
+            return (0,) * 7
+    week = [0] * 7
+    if not isinstance(schedule, dict):
+        return tuple(week)
+
+    for day, hours in schedule.items():
+        weekday = WEEKDAYS.get(str(day).strip().lower())
+        if weekday is None or not hours:
+            continue
+        if isinstance(hours, (str, dict)) or (
+            isinstance(hours, list) and len(hours) == 2 and all(isinstance(h, str) and '-' not in h for h in hours)
+        ):
+            hours = [hours]
+        for block in hours:
+            try:
+                if isinstance(block, str):
+                    start, end = block.split('-')
+                elif isinstance(block, dict):
+                    start, end = block['start'], block['end']
+                else:
+                    start, end = block
+                week[weekday] |= slot_mask(parse_clock(start), parse_clock(end), inward=True)
+            except (ValueError, TypeError, KeyError, AttributeError):
+                continue
+    return tuple(week)
+
+
+def free_runs(mask, min_slots=1):
+    """Yield (first_slot, length) for each run of set bits at least `min_slots` long."""
+    while mask:
+        first = (mask & -mask).bit_length() - 1
+        shifted = mask >> first
+        length = (shifted ^ (shifted + 1)).bit_length() - 1
+        if length >= min_slots:
+            yield first, length
+        mask &= ~(((1 << length) - 1) << first)
+
+
+def slot_clock(slot):
+    minutes = slot * SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class AvailabilityIndex:
+    """
+    In-process slot bitmaps: one weekly open-hours bitmap per active artist and one busy
+    bitmap per (day, artist) built from bookings and piercings.
+
+    Artists are grouped per weekday by identical open-hours bitmap, so a search tests each
+    distinct schedule once per day and only looks at individual artists who have
+    appointments that day; everyone else in a matching group qualifies as is. Results
+    come out in artist id order and stop at `limit`.
+
+    Days touched by this process's commits are marked dirty and rebuilt on their next
+    read; writes from other workers are detected through the version stamps and drop
+    the cached days wholesale. Schedules are keyed by the artist_schedules stamp, which
+    only schedule, name and active-flag changes bump (not ratings).
+    """
+
+    MAX_CACHED_DAYS = 400
+    TABLES = ("artist_schedules", "bookings", "piercings")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.templates = None  # artist_id -> (name, 7 weekday bitmaps)
+        self.by_weekday = None  # weekday -> {open bitmap: [artist_id, ...] ascending}
+        self.busy = {}  # date -> {artist_id: bitmap}
+        self.dirty = set()
+        self.versions = {}
+
+    def record_commit(self, flushed_versions, dirty_days, artists_changed):
+        """Apply a committed transaction of this process: version bumps and touched days."""
+        with self.lock:
+            for table_name in self.TABLES:
+                if table_name in self.versions:
+                    self.versions[table_name] += flushed_versions.get(table_name, 0)
+            self.dirty.update(dirty_days)
+            if artists_changed:
+                self.templates = None
+
+    def load_templates(self):
+        artists = db.session.execute(
+            select(Artist.id, Artist.name, Artist.availability_schedule)
+            .where(Artist.is_active == True).order_by(Artist.id)
+        ).all()
+        self.templates = {
+            artist_id: (name, compile_weekly_schedule(schedule))
+            for artist_id, name, schedule in artists
+        }
+        by_weekday = [defaultdict(list) for _ in range(7)]
+        for artist_id, (_, week) in self.templates.items():
+            for weekday, mask in enumerate(week):
+                if mask:
+                    by_weekday[weekday][mask].append(artist_id)
+        self.by_weekday = [dict(groups) for groups in by_weekday]
+
+    def sync(self):
+        """Reconcile with the version stamps; reload whatever another worker changed."""
+        current = dict.fromkeys(self.TABLES, 0)
+        current.update(db.session.execute(
+            select(TableVersion.table_name, TableVersion.version)
+            .where(TableVersion.table_name.in_(self.TABLES))
+        ).all())
+        if self.templates is None or current["artist_schedules"] != self.versions.get("artist_schedules"):
+            self.load_templates()
+        if any(current[t] != self.versions.get(t) for t in ("bookings", "piercings")) \
+                or len(self.busy) > self.MAX_CACHED_DAYS:
+            self.busy.clear()
+            self.dirty.clear()
+        self.versions = current
+
+    def load_days(self, days):
+        """Build busy bitmaps for `days` with one indexed range query per appointment table."""
+        first = datetime.combine(min(days), datetime.min.time())
+        last = datetime.combine(max(days), datetime.min.time()) + timedelta(days=1)
+        maps = {day: defaultdict(int) for day in days}
+
+        for model in (Booking, Piercing):
+            rows = db.session.execute(
+                select(model.artist_id, model.appointment_date, model.appointment_end)
+                .where(
+                    model.artist_id.isnot(None),
+                    model.appointment_date > first - timedelta(minutes=MAX_APPOINTMENT_MINUTES),
+                    model.appointment_date < last,
+                    or_(model.status.is_(None), model.status.notin_(CANCELLED_STATUSES)),
+                )
+            ).all()
+            for artist_id, start, end in rows:
+                day = start.date()
+                while datetime.combine(day, datetime.min.time()) < end:
+                    midnight = datetime.combine(day, datetime.min.time())
+                    if day in maps:
+                        maps[day][artist_id] |= slot_mask(
+                            max(int((start - midnight).total_seconds()) // 60, 0),
+                            min(-(-int((end - midnight).total_seconds()) // 60), 24 * 60),
+                        )
+                    day += timedelta(days=1)
+
+        for day, busy in maps.items():
+            self.busy[day] = busy
+            self.dirty.discard(day)
+
+    def search(self, days, window, min_slots, artist_id=None, limit=None):
+        """
+        Open runs of at least `min_slots` slots inside `window` per (day, artist), at most
+        `limit` entries. Returns (results, truncated).
+        """
+        with self.lock:
+            self.sync()
+            stale = [day for day in days if day not in self.busy or day in self.dirty]
+            if stale:
+                self.load_days(stale)
+            templates, by_weekday = self.templates, self.by_weekday
+            busy = {day: self.busy[day] for day in days}
+
+        def runs(mask):
+            return [
+                {"start": slot_clock(first), "end": slot_clock(first + length)}
+                for first, length in free_runs(mask, min_slots)
+            ]
+
+        now = datetime.now()
+        results = []
+        for day in days:
+            day_window = window
+            if day == now.date():
+                day_window &= ~slot_mask(0, now.hour * 60 + now.minute)
+            elif day < now.date():
+                continue
+            busy_today = busy[day]
+
+            if artist_id is None:
+                schedules = by_weekday[day.weekday()].items()
+            elif artist_id in templates:
+                schedules = [(templates[artist_id][1][day.weekday()], [artist_id])]
+            else:
+                schedules = []
+
+            # A group whose shared hours hold no long-enough run cannot gain one from appointments
+            groups = []
+            for mask, artist_ids in schedules:
+                slots = runs(mask & day_window)
+                if slots:
+                    groups.append(zip(artist_ids, repeat((mask & day_window, slots))))
+
+            for aid, (open_mask, slots) in heapq.merge(*groups, key=itemgetter(0)):
+                taken = busy_today.get(aid)
+                if taken:
+                    slots = runs(open_mask & ~taken)
+                    if not slots:
+                        continue
+                if limit is not None and len(results) >= limit:
+                    return results, True
+                results.append({
+                    "date": day.isoformat(), "artist_id": aid, "artist_name": templates[aid][0], "slots": slots
+                })
+        return results, False
+
+
+availability_index = AvailabilityIndex()
+
+
+ARTIST_SCHEDULE_ATTRS = ("availability_schedule", "is_active", "name")
+
+
+@event.listens_for(db.session, "after_flush")
+def track_schedule_changes(session, flush_context):
+    """Remember the days (old and new) of every appointment written in this transaction."""
+    days = session.info.setdefault("availability_days", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Artist):
+            state = db.inspect(obj)
+            if obj in session.new or obj in session.deleted or any(
+                state.attrs[attr].history.has_changes() for attr in ARTIST_SCHEDULE_ATTRS
+            ):
+                # Ratings and profile edits leave the cached schedules alone
+                session.info["availability_artists"] = True
+                defer_table_version_bumps(["artist_schedules"], session)
+                session.info.setdefault("flushed_versions", defaultdict(int))["artist_schedules"] = 1
+        elif isinstance(obj, (Booking, Piercing)):
+            state = db.inspect(obj)
+            for attr in ("appointment_date", "appointment_end"):
+                history = state.attrs[attr].history
+                for value in (*history.added, *history.unchanged, *history.deleted):
+                    if value is not None:
+                        days.add(value.date())
+            start, end = obj.appointment_date, obj.appointment_end
+            if start is not None and end is not None:  # Overnight appointments span several days
+                day = start.date()
+                while day <= end.date():
+                    days.add(day)
+                    day += timedelta(days=1)
+
+
+@event.listens_for(db.session, "after_commit")
+def apply_schedule_changes(session):
+    flushed = session.info.pop("flushed_versions", {})
+    days = session.info.pop("availability_days", set())
+    artists_changed = session.info.pop("availability_artists", False)
+    if flushed or days or artists_changed:
+        availability_index.record_commit(flushed, days, artists_changed)
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_schedule_changes(session):
+    for key in ("flushed_versions", "availability_days", "availability_artists"):
+        session.info.pop(key, None)
+
+
+@app.route('/api/availability/search', methods=['GET'])
+def search_availability():
+    """
+    Open slots across active artists.
+    Query params: start_date / end_date (YYYY-MM-DD, default today, at most
+    MAX_AVAILABILITY_DAYS days), from / to (HH:MM time-of-day window),
+    duration_minutes (minimum length of a returned slot), artist_id,
+    limit (entries returned, default 100, at most MAX_AVAILABILITY_RESULTS).
+    """
+    try:
+        start = (parse_date_param(request.args.get('start_date')) or datetime.now()).date()
+        end = (parse_date_param(request.args.get('end_date')) or datetime.combine(start, datetime.min.time())).date()
+        window = slot_mask(parse_clock(request.args.get('from', '00:00')), parse_clock(request.args.get('to', '24:00')), inward=True)
+        raw_duration = request.args.get('duration_minutes')
+        duration = parse_duration(int(raw_duration) if raw_duration else None)
+        artist_id = request.args.get('artist_id', type=int)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), MAX_AVAILABILITY_RESULTS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if end < start:
+        return jsonify({'error': 'end_date must not be before start_date.'}), 400
+    if (end - start).days >= MAX_AVAILABILITY_DAYS:
+        return jsonify({'error': f'Date range is limited to {MAX_AVAILABILITY_DAYS} days.'}), 400
+
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    min_slots = -(-duration // SLOT_MINUTES)
+    results, truncated = availability_index.search(days, window, min_slots, artist_id, limit)
+    return jsonify({
+        'slot_minutes': SLOT_MINUTES,
+        'duration_minutes': duration,
+        'results': results,
+        'truncated': truncated,
+    }), 200
+
 #--------------------------------------------------------------------#
 
-class Review(db.Model, SerializerMixin):
+class Review(db.Model):
     __tablename__ = "reviews"
+    __table_args__ = (
+        db.Index("ix_reviews_artist_created_at", "artist_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey("artists.id"), nullable=False)
@@ -804,7 +2892,56 @@ class Review(db.Model, SerializerMixin):
     created_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
 
     artist = db.relationship("Artist", back_populates="reviews")
-    serialize_rules = ("-artist.reviews",)
+
+    def to_dict(self):
+        return review_serializer(self)
+
+
+review_serializer = ModelSerializer(
+    "id", "artist_id", "star_rating", "review_text", "photo_url",
+    ("created_at", lambda review: review.created_at.strftime("%Y-%m-%d %H:%M:%S") if review.created_at else None),
+    ("artist", artist_summary),
+)
+
+
+def apply_rating_change(artist_id, added=None, removed=None):
+    """
+    Adjust an artist's rating counters for a review being added, removed or re-rated,
+    using one atomic UPDATE (no read-modify-write, no scan over reviews).
+    Returns False when the artist does not exist.
+    """
+    count_delta = (1 if added else 0) - (1 if removed else 0)
+    sum_delta = (added or 0) - (removed or 0)
+
+    values = {
+        Artist.rating_count: Artist.rating_count + count_delta,
+        Artist.rating_sum: Artist.rating_sum + sum_delta,
+        # The right-hand side sees pre-update values, so recompute from the deltas
+        Artist.average_rating: case(
+            (Artist.rating_count + count_delta > 0,
+             (Artist.rating_sum + sum_delta) * 1.0 / (Artist.rating_count + count_delta)),
+            else_=0.0
+        ),
+    }
+    if added != removed:
+        if added:
+            column = getattr(Artist, f"star_{added}_count")
+            values[column] = column + 1
+        if removed:
+            column = getattr(Artist, f"star_{removed}_count")
+            values[column] = column - 1
+
+    result = db.session.execute(
+        update(Artist).where(Artist.id == artist_id).values(values),
+        execution_options={"synchronize_session": False}
+    )
+    if result.rowcount == 0:
+        return False
+
+    bump_metrics(None, reviews_count=count_delta, rating_sum=sum_delta)
+    defer_table_version_bumps(["artists"])
+    return True
+
 @app.post('/api/artists/<int:artist_id>/reviews')
 def create_review(artist_id):
     data = request.get_json()
@@ -828,26 +2965,43 @@ def create_review(artist_id):
         review_text=review_text,
         photo_url=photo_url
     )
+    if not apply_rating_change(artist_id, added=star_rating):
+        db.session.rollback()
+        return jsonify({"error": "Artist not found"}), 404
     db.session.add(new_review)
     db.session.commit()
 
-    # Update the artist's average rating
-    artist = Artist.query.get(artist_id)
-    artist.average_rating = db.session.query(func.avg(Review.star_rating)).filter_by(artist_id=artist_id).scalar()
-    db.session.commit()
-
     return jsonify(new_review.to_dict()), 201
 
 
+def reviews_rating_summary(artist_id, reviews):
+    """
+    The artist's rating summary from the artist row loaded with `reviews`; only an
+    empty page has to look the artist up.
+    """
+    artist = reviews[0].artist if reviews else Artist.query.get(artist_id)
+    return artist.rating_summary() if artist else None
+
+
 @app.get('/api/artists/<int:artist_id>/reviews')
+@conditional_get("artists", "reviews")
 def get_reviews(artist_id):
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
 
-    reviews = Review.query.filter_by(artist_id=artist_id).paginate(page=page, per_page=per_page)
+    # The artist row comes back joined to every review, for the serializer and the summary
+    query = Review.query.join(Review.artist).options(contains_eager(Review.artist)).filter(Review.artist_id == artist_id)
+    if 'cursor' in request.args:
+        return cursor_page_response(
+            query, Review, "reviews", per_page, scope=f"reviews:{artist_id}",
+            extra=lambda items: {"rating_summary": reviews_rating_summary(artist_id, items)}
+        )
+
+    reviews = query.paginate(page=page, per_page=per_page)
 
     return jsonify({
         "reviews": [review.to_dict() for review in reviews.items],
+        "rating_summary": reviews_rating_summary(artist_id, reviews.items),
         "total_items": reviews.total,
         "total_pages": reviews.pages,
         "current_page": reviews.page
@@ -862,8 +3016,10 @@ def update_review(review_id):
     data = request.get_json()
     if "star_rating" in data:
         star_rating = data["star_rating"]
-        if not (1 <= star_rating <= 5):
+        if not isinstance(star_rating, int) or not (1 <= star_rating <= 5):
             return jsonify({"error": "Star rating must be between 1 and 5"}), 400
+        if star_rating != review.star_rating:
+            apply_rating_change(review.artist_id, added=star_rating, removed=review.star_rating)
         review.star_rating = star_rating
 
     if "review_text" in data:
@@ -874,11 +3030,6 @@ def update_review(review_id):
 
     db.session.commit()
 
-    # Update artist's average rating
-    artist = Artist.query.get(review.artist_id)
-    artist.average_rating = db.session.query(func.avg(Review.star_rating)).filter_by(artist_id=review.artist_id).scalar()
-    db.session.commit()
-
     return jsonify(review.to_dict()), 200
 
 @app.delete('/api/reviews/<int:review_id>')
@@ -887,15 +3038,10 @@ def delete_review(review_id):
     if not review:
         return jsonify({"error": "Review not found"}), 404
 
-    artist_id = review.artist_id
+    apply_rating_change(review.artist_id, removed=review.star_rating)
     db.session.delete(review)
     db.session.commit()
 
-    # Update artist's average rating
-    artist = Artist.query.get(artist_id)
-    artist.average_rating = db.session.query(func.avg(Review.star_rating)).filter_by(artist_id=artist_id).scalar()
-    db.session.commit()
-
     return jsonify({"message": "Review deleted successfully"}), 200
 
 
@@ -921,8 +3067,11 @@ def update_payment_status(booking_id):
 
 
 #------------------------------------------------------------------------------------------#
-class Gallery(db.Model, SerializerMixin):
+class Gallery(db.Model):
     __tablename__ = "gallery"
+    __table_args__ = (
+        db.Index("ix_gallery_artist_created_at", "artist_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     artist_id = db.Column(db.Integer, db.ForeignKey("artists.id", name="fk_gallery_artist"), nullable=False)
@@ -932,14 +3081,14 @@ class Gallery(db.Model, SerializerMixin):
 
     artist = db.relationship("Artist", back_populates="gallery")
 
-    serialize_rules = ("-artist.gallery",)
-
     def to_dict(self):
-        photo_dict = super().to_dict()
-        photo_dict["created_at"] = format_datetime(self.created_at)  # Use the helper function
-        photo_dict["artist_name"] = self.artist.name  # Include the artist's name
+        return gallery_serializer(self)
+
 
-        return photo_dict
+gallery_serializer = ModelSerializer(
+    "id", "artist_id", "image_url", "caption", formatted("created_at"),
+    ("artist_name", lambda photo: photo.artist.name),  # Include the artist's name
+)
 
 
 @app.post('/api/artists/<int:artist_id>/gallery')
@@ -966,6 +3115,7 @@ def upload_photo(current_user, artist_id):
 
 
 @app.get('/api/artists/<int:artist_id>/gallery')
+@conditional_get("artists", "gallery")
 def get_gallery(artist_id):
     """
     Retrieve a paginated list of gallery photos for a specific artist,
@@ -984,7 +3134,10 @@ def get_gallery(artist_id):
 
     # Apply caption search if a search query is provided
     if search_query:
-        query = query.filter(Gallery.caption.ilike(f"%{search_query}%"))
+        query = apply_text_search(query, Gallery, Gallery.caption, search_query)
+
+    if 'cursor' in request.args:
+        return cursor_page_response(query, Gallery, "photos", per_page, scope=cursor_scope("gallery", artist_id, search_query))
 
     # Paginate the results
     photos = query.paginate(page=page, per_page=per_page)
@@ -998,6 +3151,7 @@ def get_gallery(artist_id):
 
 
 @app.get('/api/galleries')
+@conditional_get("artists", "gallery")
 def get_all_galleries():
     """
     Fetch all galleries with optional pagination.
@@ -1005,6 +3159,11 @@ def get_all_galleries():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 12, type=int)
 
+    if 'cursor' in request.args:
+        return cursor_page_response(
+            Gallery.query.options(joinedload(Gallery.artist)), Gallery, "galleries", per_page
+        )
+
     galleries = Gallery.query.options(joinedload(Gallery.artist)).paginate(page=page, per_page=per_page)
 
     return jsonify({
@@ -1034,6 +3193,102 @@ def delete_photo(photo_id):
 
 #----------------------------------------------------------------------------------#
 
+class HasherBusy(Exception):
+    """Raised when the password hashing pool's queue is full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL). The calling
+    request thread still waits for its result; what the pool bounds is how many hashes
+    run at once, so a burst of logins uses at most `workers` cores and the worker's other
+    threads keep serving unrelated requests. That needs a threaded server: gunicorn.conf.py
+    requires the gthread worker with several threads. When `workers + max_queue` hashes
+    are already in flight, new ones fail fast with HasherBusy (served as a 503).
+    """
+
+    def __init__(self, rounds, workers, max_queue):
+        self.rounds = rounds
+        self.pool = WorkerPool(max_workers=workers, thread_name_prefix="bcrypt")
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy("Too many password operations in progress. Please retry shortly.")
+        try:
+            future = self.pool.submit(fn, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+    def hash(self, plaintext_password):
+        return self._run(bcrypt.generate_password_hash, plaintext_password, self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, plaintext_password):
+        return self._run(bcrypt.check_password_hash, password_hash, plaintext_password)
+
+    def needs_rehash(self, password_hash):
+        """
+        True when the stored hash was made with a lower work factor than the configured one.
+        Never lowers it, so workers that calibrated to different costs cannot flip a hash back and forth.
+        """
+        try:
+            return int(password_hash.split('$')[2]) < self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+
+def calibrate_bcrypt_rounds(target_ms, min_rounds=10, max_rounds=15):
+    """
+    Pick the highest work factor whose hash time stays within `target_ms` on this host.
+    Each extra round doubles the cost, so one timing at `min_rounds` is enough.
+    """
+    started = time.perf_counter()
+    bcrypt.generate_password_hash("calibration-password", min_rounds)
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.001)
+    extra = int(math.floor(math.log2(target_ms / elapsed_ms))) if target_ms > elapsed_ms else 0
+    return max(min_rounds, min(max_rounds, min_rounds + extra))
+
+
+def configured_bcrypt_rounds():
+    """
+    BCRYPT_LOG_ROUNDS when set. Otherwise BCRYPT_TARGET_MS calibrates the cost at startup,
+    separately in every worker; pin the value from `flask calibrate-bcrypt` for a stable cost.
+    Default 12.
+    """
+    if os.getenv('BCRYPT_LOG_ROUNDS'):
+        return int(os.getenv('BCRYPT_LOG_ROUNDS'))
+    target_ms = os.getenv('BCRYPT_TARGET_MS')
+    if target_ms:
+        return calibrate_bcrypt_rounds(float(target_ms))
+    return 12
+
+
+@app.cli.command("calibrate-bcrypt")
+@click.option("--target-ms", type=float, default=250, show_default=True, help="Hash time budget per password.")
+def calibrate_bcrypt(target_ms):
+    """Measure this host once and print the BCRYPT_LOG_ROUNDS value to pin for every worker."""
+    rounds = max(calibrate_bcrypt_rounds(target_ms) for _ in range(3))  # Best of three, against timing noise
+    click.echo(f"BCRYPT_LOG_ROUNDS={rounds}")
+
+
+password_hasher = PasswordHasher(
+    rounds=configured_bcrypt_rounds(),
+    workers=int(os.getenv('BCRYPT_WORKERS', 2)),
+    max_queue=int(os.getenv('BCRYPT_MAX_QUEUE', 8)),
+)
+
+
+@app.errorhandler(HasherBusy)
+def handle_hasher_busy(error):
+    response = jsonify({'error': str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+
 class User(db.Model, SerializerMixin):
     __tablename__ = "users"
 
@@ -1043,7 +3298,7 @@ class User(db.Model, SerializerMixin):
     password_hash = db.Column(db.String(128), nullable=False)
     user_type = db.Column(db.String(50), nullable=False)  # 'artist' or 'admin'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_login = db.Column(db.DateTime)
+    last_login = db.Column(db.DateTime, index=True)
 
     @property
     def password(self):
@@ -1051,10 +3306,10 @@ class User(db.Model, SerializerMixin):
 
     @password.setter
     def password(self, plaintext_password):
-        self.password_hash = bcrypt.generate_password_hash(plaintext_password).decode('utf-8')
+        self.password_hash = password_hasher.hash(plaintext_password)
 
     def verify_password(self, plaintext_password):
-        return bcrypt.check_password_hash(self.password_hash, plaintext_password)
+        return password_hasher.verify(self.password_hash, plaintext_password)
     def to_dict(self):
         return {
             'id': self.id,
@@ -1065,6 +3320,20 @@ class User(db.Model, SerializerMixin):
             'last_login': format_datetime(self.last_login) if self.last_login else None
         }
 
+
+@event.listens_for(db.session, "after_flush")
+def track_principal_changes(session, flush_context):
+    """
+    Bump the principals stamp so every worker drops its cached principals. Logins only
+    touch last_login, so they leave the caches alone.
+    """
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and (obj in session.deleted or any(
+            db.inspect(obj).attrs[attr].history.has_changes() for attr in PRINCIPAL_ATTRS
+        )):
+            defer_table_version_bumps(["principals"], session)
+            return
+
 def validate_password(password):
     """
     Validates the password against security criteria.
@@ -1084,6 +3353,7 @@ def validate_password(password):
 
 
 def generate_token(payload):
+    payload["iat"] = datetime.utcnow()
     payload["exp"] = datetime.utcnow() + timedelta(hours=6)  # Extend expiration
     token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
     return token
@@ -1144,6 +3414,9 @@ def signin():
     user = User.query.filter_by(username=username).first()
     if not user or not user.verify_password(password):
         return jsonify({'error': 'Invalid username or password.'}), 401
+    # Upgrade the stored hash if the configured work factor has changed
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password = password
     # Update last_login
     user.last_login = datetime.utcnow()
     db.session.commit()
@@ -1161,6 +3434,441 @@ def signin():
 
     return jsonify({'message': 'Sign-in successful!', 'token': token, 'user': user.to_dict()}), 200
 
+#--------------------------------------------------------------------------------------------#
+# Metrics rollups
+class ArtistMetrics(db.Model):
+    """
+    Per-artist counters written at the end of the transaction that changes them.
+    `flask db upgrade` backfills it when creating the table; `flask rebuild-metrics` repairs drift.
+    """
+    __tablename__ = "artist_metrics"
+
+    artist_id = db.Column(db.Integer, db.ForeignKey("artists.id", name="fk_metrics_artist", ondelete="CASCADE"), primary_key=True)
+    bookings_count = db.Column(db.Integer, nullable=False, default=0)
+    piercings_count = db.Column(db.Integer, nullable=False, default=0)
+    bookings_earnings = db.Column(db.Float, nullable=False, default=0.0)
+    piercings_earnings = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class PlatformMetrics(db.Model):
+    """
+    Platform-wide counters. Holds a single row with id=1, updated right after each commit.
+    """
+    __tablename__ = "platform_metrics"
+
+    id = db.Column(db.Integer, primary_key=True)
+    bookings_count = db.Column(db.Integer, nullable=False, default=0)
+    piercings_count = db.Column(db.Integer, nullable=False, default=0)
+    bookings_earnings = db.Column(db.Float, nullable=False, default=0.0)
+    piercings_earnings = db.Column(db.Float, nullable=False, default=0.0)
+    reviews_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+
+
+ARTIST_METRIC_FIELDS = ('bookings_count', 'piercings_count', 'bookings_earnings', 'piercings_earnings')
+METRIC_FIELDS = ARTIST_METRIC_FIELDS + ('reviews_count', 'rating_sum')
+RATING_FIELDS = ('rating_count', 'rating_sum', 'star_1_count', 'star_2_count', 'star_3_count', 'star_4_count', 'star_5_count')
+PLATFORM_METRICS_ID = 1
+
+
+def _bump_row(model, key_column, key_value, deltas, fields, connection=None):
+    """
+    Increment counters on one rollup row with a single INSERT ... ON CONFLICT DO UPDATE,
+    so concurrent first writes for a new key add up instead of colliding on the primary key.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if field in fields and delta}
+    if not deltas:
+        return
+    row = dict.fromkeys(fields, 0)
+    row.update(deltas)
+    row[key_column.key] = key_value
+    stmt = dialect_insert(model).values(**row)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key_column.key],
+        set_={field: getattr(model, field) + getattr(stmt.excluded, field) for field in deltas},
+    )
+    (connection or db.session).execute(stmt)
+
+
+def bump_metrics(artist_id, include_platform=True, **deltas):
+    """
+    Queue counter deltas for the artist and platform rollups of the current transaction.
+    Pass artist_id=None to only touch the platform row. See write_artist_metrics and
+    publish_platform_metrics for when they are written.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    session = db.session()
+    if not session.in_transaction():
+        session.begin()  # So a rollback before any SQL still discards the deltas
+    pending = session.info.setdefault("pending_metrics", {"artists": {}, "platform": defaultdict(int)})
+    if include_platform:
+        for field, delta in deltas.items():
+            pending["platform"][field] += delta
+    if artist_id is not None:
+        artist_deltas = pending["artists"].setdefault(artist_id, defaultdict(int))
+        for field, delta in deltas.items():
+            artist_deltas[field] += delta
+
+
+def reassign_metrics(kind, old_artist_id, old_price, new_artist_id, new_price):
+    """
+    Keep rollups in sync when an appointment's artist or price changes.
+    `kind` is 'booking' or 'piercing'.
+    """
+    count_field, earnings_field = f"{kind}s_count", f"{kind}s_earnings"
+    old_price, new_price = float(old_price or 0), float(new_price or 0)
+
+    if old_artist_id == new_artist_id:
+        bump_metrics(new_artist_id, **{earnings_field: new_price - old_price})
+        return
+
+    bump_metrics(old_artist_id, include_platform=False, **{count_field: -1, earnings_field: -old_price})
+    bump_metrics(new_artist_id, include_platform=False, **{count_field: 1, earnings_field: new_price})
+    bump_metrics(None, **{earnings_field: new_price - old_price})
+
+
+@event.listens_for(db.session, "before_commit")
+def write_artist_metrics(session):
+    """
+    Write the queued artist rollup deltas at the end of the transaction, in artist id
+    order, so the rows are locked only briefly and always in the same order.
+    """
+    session.flush()  # Flush listeners may still queue deltas
+    pending = session.info.get("pending_metrics")
+    if not pending:
+        return
+    connection = session.connection()
+    for artist_id in sorted(pending["artists"]):
+        _bump_row(ArtistMetrics, ArtistMetrics.artist_id, artist_id, pending["artists"][artist_id], ARTIST_METRIC_FIELDS, connection)
+    pending["artists"].clear()
+
+
+@event.listens_for(db.session, "after_commit")
+def publish_platform_metrics(session):
+    """
+    Add the platform delta in a short transaction of its own once the writes commit, so
+    appointment writes across the platform never queue behind the single platform row.
+    A crash between the two commits leaves drift for `flask rebuild-metrics` to repair.
+    """
+    pending = session.info.pop("pending_metrics", None)
+    if not pending or not any(pending["platform"].values()):
+        return
+    try:
+        with db.engine.begin() as connection:
+            _bump_row(PlatformMetrics, PlatformMetrics.id, PLATFORM_METRICS_ID, pending["platform"], METRIC_FIELDS, connection)
+    except Exception:
+        log.exception("platform metrics update failed", extra={"deltas": dict(pending["platform"])})
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def discard_metrics(session, previous_transaction):
+    # Soft rollbacks too: deltas can be queued before the transaction has run any SQL
+    if not previous_transaction.nested:
+        session.info.pop("pending_metrics", None)
+
+
+def _metrics_dict(row, fields=METRIC_FIELDS):
+    return {field: (getattr(row, field) or 0) if row else 0 for field in fields}
+
+
+def artist_metrics(artist_id):
+    """Rollup counters for one artist (primary-key lookup)."""
+    return _metrics_dict(ArtistMetrics.query.get(artist_id), ARTIST_METRIC_FIELDS)
+
+
+def platform_metrics_row():
+    """Platform-wide rollup counters (primary-key lookup)."""
+    return _metrics_dict(PlatformMetrics.query.get(PLATFORM_METRICS_ID))
+
+
+def compute_metrics_from_source():
+    """
+    Recompute every rollup from the source tables. Used by the rebuild command only.
+    Returns (per_artist, per_artist_ratings, platform).
+    """
+    per_artist = defaultdict(lambda: {field: 0 for field in ARTIST_METRIC_FIELDS})
+    ratings = defaultdict(lambda: {field: 0 for field in RATING_FIELDS})
+    platform = {field: 0 for field in METRIC_FIELDS}
+
+    sources = [
+        (Booking.artist_id, func.count(Booking.id), func.coalesce(func.sum(Booking.price), 0), 'bookings_count', 'bookings_earnings'),
+        (Piercing.artist_id, func.count(Piercing.id), func.coalesce(func.sum(Piercing.price), 0), 'piercings_count', 'piercings_earnings'),
+    ]
+    for group_column, count_expr, sum_expr, count_field, sum_field in sources:
+        for artist_id, count, total in db.session.query(group_column, count_expr, sum_expr).group_by(group_column):
+            platform[count_field] += count
+            platform[sum_field] += total
+            if artist_id is not None:
+                per_artist[artist_id][count_field] = count
+                per_artist[artist_id][sum_field] = total
+
+    star_counts = db.session.query(Review.artist_id, Review.star_rating, func.count(Review.id)).group_by(
+        Review.artist_id, Review.star_rating
+    )
+    for artist_id, stars, count in star_counts:
+        platform['reviews_count'] += count
+        platform['rating_sum'] += stars * count
+        ratings[artist_id]['rating_count'] += count
+        ratings[artist_id]['rating_sum'] += stars * count
+        if 1 <= stars <= 5:
+            ratings[artist_id][f"star_{stars}_count"] = count
+
+    return per_artist, ratings, platform
+
+
+def _metrics_drift(stored, expected):
+    return {
+        field: (stored[field], expected[field])
+        for field in expected
+        if abs((stored[field] or 0) - (expected[field] or 0)) > 0.005
+    }
+
+
+@app.cli.command("rebuild-metrics")
+@click.option("--verify-only", is_flag=True, help="Report drift without repairing it.")
+def rebuild_metrics(verify_only):
+    """Recompute the metrics rollup tables from source data and repair any drift."""
+    per_artist, ratings, platform = compute_metrics_from_source()
+    stored_rows = {row.artist_id: row for row in ArtistMetrics.query.all()}
+    drift_found = False
+
+    artist_ids = set()
+    for artist in Artist.query.options(load_only(Artist.id, *[getattr(Artist, field) for field in RATING_FIELDS])):
+        artist_ids.add(artist.id)
+        expected = ratings[artist.id]
+        drift = _metrics_drift(_metrics_dict(artist, RATING_FIELDS), expected)
+        if drift:
+            drift_found = True
+            click.echo(f"artist {artist.id} ratings: {drift}")
+            if not verify_only:
+                for field, value in expected.items():
+                    setattr(artist, field, value)
+                artist.average_rating = expected['rating_sum'] / expected['rating_count'] if expected['rating_count'] else 0.0
+
+    for artist_id in sorted(artist_ids | set(stored_rows)):
+        stored = stored_rows.get(artist_id)
+        if artist_id not in artist_ids:
+            drift_found = True
+            click.echo(f"artist {artist_id}: orphaned rollup row")
+            if not verify_only:
+                db.session.delete(stored)
+            continue
+
+        expected = per_artist[artist_id]
+        drift = _metrics_drift(_metrics_dict(stored, ARTIST_METRIC_FIELDS), expected)
+        if drift:
+            drift_found = True
+            click.echo(f"artist {artist_id}: {drift}")
+        if not verify_only and (drift or stored is None):
+            db.session.merge(ArtistMetrics(artist_id=artist_id, **expected))
+
+    drift = _metrics_drift(platform_metrics_row(), platform)
+    if drift:
+        drift_found = True
+        click.echo(f"platform: {drift}")
+    if not verify_only:
+        db.session.merge(PlatformMetrics(id=PLATFORM_METRICS_ID, **platform))
+        db.session.commit()
+
+    if not drift_found:
+        click.echo("Metrics verified, no drift.")
+    elif verify_only:
+        raise SystemExit("Metrics drift detected. Run `flask rebuild-metrics` to repair it.")
+    else:
+        click.echo("Metrics drift repaired.")
+
+
+#--------------------------------------------------------------------------------------------#
+# Daily appointment rollup
+class DailyAppointmentStats(db.Model):
+    """
+    Appointment counts and earnings per calendar day of appointment_date, kept in step
+    with every booking and piercing write. Trend queries read one row per day.
+    `flask db upgrade` backfills it when creating the table; `flask rebuild-daily-stats` recomputes it.
+    """
+    __tablename__ = "daily_appointment_stats"
+
+    day = db.Column(db.Date, primary_key=True)
+    bookings_count = db.Column(db.Integer, nullable=False, default=0)
+    piercings_count = db.Column(db.Integer, nullable=False, default=0)
+    bookings_earnings = db.Column(db.Float, nullable=False, default=0.0)
+    piercings_earnings = db.Column(db.Float, nullable=False, default=0.0)
+
+
+DAILY_STAT_FIELDS = ('bookings_count', 'piercings_count', 'bookings_earnings', 'piercings_earnings')
+TREND_GRANULARITIES = ('day', 'week', 'month')
+MAX_TREND_BUCKETS = 1000
+
+
+def bump_daily_stats(deltas, connection=None):
+    """
+    Apply {day: {field: delta}} to the daily rollup with one INSERT ... ON CONFLICT DO UPDATE
+    per day, so concurrent first writes for a day add up instead of colliding on its key.
+    """
+    connection = connection or db.session.connection()
+    table = DailyAppointmentStats.__table__
+    for day in sorted(deltas):
+        values = {field: delta for field, delta in deltas[day].items() if delta}
+        if not values:
+            continue
+        row = dict.fromkeys(DAILY_STAT_FIELDS, 0)
+        row.update(values, day=day)
+        stmt = dialect_insert(table).values(**row)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={field: table.c[field] + stmt.excluded[field] for field in values},
+        ))
+
+
+def daily_stat_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def add_daily_delta(deltas, kind, appointment_date, price, sign):
+    if appointment_date is None:
+        return
+    day = deltas[appointment_date.date()]
+    day[f"{kind}s_count"] += sign
+    day[f"{kind}s_earnings"] += sign * float(price or 0)
+
+
+def _committed_value(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return state.attrs[attr].value
+
+
+@event.listens_for(db.session, "after_flush")
+def track_daily_stats(session, flush_context):
+    """Move ORM booking/piercing writes into the daily rollup, within the same transaction."""
+    deltas = daily_stat_deltas()
+    for obj in session.new:
+        if isinstance(obj, (Booking, Piercing)):
+            add_daily_delta(deltas, obj.__tablename__[:-1], obj.appointment_date, obj.price, 1)
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, (Booking, Piercing)):
+            continue
+        kind, state = obj.__tablename__[:-1], db.inspect(obj)
+        deleted = obj in session.deleted
+        if not deleted and not any(state.attrs[attr].history.has_changes() for attr in ('appointment_date', 'price')):
+            continue
+        add_daily_delta(deltas, kind, _committed_value(state, 'appointment_date'), _committed_value(state, 'price'), -1)
+        if not deleted:
+            add_daily_delta(deltas, kind, obj.appointment_date, obj.price, 1)
+    if deltas:
+        bump_daily_stats(deltas, session.connection())
+
+
+@app.cli.command("rebuild-daily-stats")
+def rebuild_daily_stats():
+    """Recompute the daily appointment rollup from bookings and piercings."""
+    deltas = daily_stat_deltas()
+    for kind, model in (('booking', Booking), ('piercing', Piercing)):
+        rows = db.session.execute(
+            select(model.appointment_date, model.price).execution_options(yield_per=5000)
+        )
+        for appointment_date, price in rows:
+            add_daily_delta(deltas, kind, appointment_date, price, 1)
+    db.session.execute(DailyAppointmentStats.__table__.delete())
+    bump_daily_stats(deltas)
+    db.session.commit()
+    click.echo(f"Daily stats rebuilt for {len(deltas)} days.")
+
+
+def trend_bucket(day, granularity):
+    """First day of the bucket containing `day` (weeks start on Monday)."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(bucket, granularity):
+    if granularity == 'week':
+        return bucket + timedelta(days=7)
+    if granularity == 'month':
+        return bucket + relativedelta(months=1)
+    return bucket + timedelta(days=1)
+
+
+def appointment_trends(start, end, granularity):
+    """
+    Zero-filled buckets covering the half-open day range [start, end), read from the
+    daily rollup (one primary-key range scan). Raises ValueError when the range would
+    produce more than MAX_TREND_BUCKETS buckets.
+    """
+    buckets = OrderedDict()
+    bucket = trend_bucket(start, granularity)
+    while bucket < end:
+        buckets[bucket] = dict.fromkeys(DAILY_STAT_FIELDS, 0)
+        if len(buckets) > MAX_TREND_BUCKETS:
+            raise ValueError(f'Range is too long for {granularity} buckets (max {MAX_TREND_BUCKETS}).')
+        bucket = next_bucket(bucket, granularity)
+
+    rows = db.session.execute(
+        select(DailyAppointmentStats).where(DailyAppointmentStats.day >= start, DailyAppointmentStats.day < end)
+    ).scalars()
+    for row in rows:
+        totals = buckets[trend_bucket(row.day, granularity)]
+        for field in DAILY_STAT_FIELDS:
+            totals[field] += getattr(row, field)
+
+    return [
+        {
+            'start': bucket.isoformat(),
+            **totals,
+            'appointments_count': totals['bookings_count'] + totals['piercings_count'],
+            'earnings': round(totals['bookings_earnings'] + totals['piercings_earnings'], 2),
+        }
+        for bucket, totals in buckets.items()
+    ]
+
+
+@app.get('/api/admin-dashboard/trends')
+@token_required
+def appointment_trends_report(current_user):
+    """
+    Booking and piercing counts and earnings over time.
+    Query params: start_date / end_date (YYYY-MM-DD, inclusive; default the current year),
+    granularity (day|week|month, default month).
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+
+    granularity = request.args.get('granularity', 'month')
+    if granularity not in TREND_GRANULARITIES:
+        return jsonify({'error': 'Invalid granularity. Use day, week or month.'}), 400
+    try:
+        start = parse_date_param(request.args.get('start_date'))
+        end = parse_date_param(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+
+    today = date.today()
+    start = start.date() if start else date(today.year, 1, 1)
+    end = end.date() if end else date(today.year, 12, 31)
+    if end < start:
+        return jsonify({'error': 'end_date must not be before start_date.'}), 400
+
+    try:
+        buckets = appointment_trends(start, end + timedelta(days=1), granularity)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'granularity': granularity,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'buckets': buckets,
+    }), 200
+
+
 @app.get('/api/admin-dashboard/activity')
 @token_required
 def user_activity():
@@ -1224,9 +3932,10 @@ def artist_dashboard(current_user):  # Accept the current_user argument
     reviews = Review.query.filter_by(artist_id=artist.id).order_by(Review.created_at.desc()).limit(5).all()
     portfolio_preview = artist.gallery[:5]  # Limit to 5 images for preview
 
+    metrics = artist_metrics(artist.id)
     performance_metrics = {
-        'total_bookings': Booking.query.filter_by(artist_id=artist.id).count(),
-        'total_earnings': db.session.query(func.sum(Booking.price)).filter_by(artist_id=artist.id).scalar() or 0,
+        'total_bookings': metrics['bookings_count'],
+        'total_earnings': metrics['bookings_earnings'],
     }
 
     # Build the response
@@ -1264,14 +3973,11 @@ def admin_dashboard(current_user):  # Add current_user parameter
 
         recent_reviews = Review.query.filter_by(artist_id=artist.id).order_by(Review.created_at.desc()).limit(5).all()
 
+        metrics = artist_metrics(artist.id)
         performance_metrics = {
-            'total_bookings': Booking.query.filter_by(artist_id=artist.id).count(),
-            'total_piercings': Piercing.query.filter_by(artist_id=artist.id).count(),
-            'total_earnings': (
-                db.session.query(func.sum(Booking.price)).filter_by(artist_id=artist.id).scalar() or 0
-            ) + (
-                db.session.query(func.sum(Piercing.price)).filter_by(artist_id=artist.id).scalar() or 0
-            ),
+            'total_bookings': metrics['bookings_count'],
+            'total_piercings': metrics['piercings_count'],
+            'total_earnings': metrics['bookings_earnings'] + metrics['piercings_earnings'],
         }
 
         personal_data = {
@@ -1282,56 +3988,267 @@ def admin_dashboard(current_user):  # Add current_user parameter
             'performance_metrics': performance_metrics,
         }
 
-    # All Users
-    users = User.query.all()
-    all_users = [user.to_dict() for user in users]
+    # Users and appointments are served by the paginated feeds below
+    total_users = User.query.count()
 
-    # All Bookings
-    bookings = Booking.query.options(joinedload(Booking.artist)).all()
-    piercings = Piercing.query.options(joinedload(Piercing.artist)).all()
-    all_appointments = [
-        {
-            **booking.to_dict(),
-            'artist_name': booking.artist.name if booking.artist else None,
-            'type': 'booking',
-        }
-        for booking in bookings
-    ] + [
-        {
-            **piercing.to_dict(),
-            'artist_name': piercing.artist.name if piercing.artist else None,
-            'type': 'piercing',
+    # Platform Metrics
+    totals = platform_metrics_row()
+    average_rating = totals['rating_sum'] / totals['reviews_count'] if totals['reviews_count'] else 0
+
+    platform_metrics = {
+        'total_bookings': totals['bookings_count'],
+        'total_piercings': totals['piercings_count'],
+        'total_appointments': totals['bookings_count'] + totals['piercings_count'],
+        'total_earnings': totals['bookings_earnings'] + totals['piercings_earnings'],
+        'average_rating': round(average_rating, 2),
+    }
+
+    # Build the response
+    dashboard_data = {
+        'personal_data': personal_data,
+        'total_users': total_users,
+        'platform_metrics': platform_metrics,
+    }
+
+    return jsonify(dashboard_data), 200
+
+
+APPOINTMENT_SEARCH_FIELDS = ('id', 'type', 'name', 'phone_number', 'appointment_date', 'status', 'artist_id', 'artist_name')
+
+
+def appointments_feed_query(start_date=None, end_date=None, artist_id=None, status=None, name=None, phone=None, fields=None):
+    """
+    UNION ALL of bookings and piercings projected onto a shared set of columns,
+    tagged with a `type` column. Filters are pushed into both halves so each side
+    can use its own indexes. `fields` limits the projection to the named columns.
+    """
+    def project(model, kind, service, detail):
+        columns = {
+            'id': model.id,
+            'type': literal(kind),
+            'name': model.name,
+            'phone_number': model.phone_number,
+            'appointment_date': model.appointment_date,
+            'service': service,
+            'detail': detail,
+            'placement': model.placement,
+            'studio_location': model.studio_location,
+            'price': model.price,
+            'status': model.status,
+            'payment_status': model.payment_status,
+            'artist_id': model.artist_id,
+            'artist_name': Artist.name,
         }
-        for piercing in piercings
+        stmt = select(*[
+            expr.label(label) for label, expr in columns.items() if fields is None or label in fields
+        ]).outerjoin(Artist, model.artist_id == Artist.id)
+
+        if start_date:
+            stmt = stmt.where(model.appointment_date >= start_date)
+        if end_date:
+            stmt = stmt.where(model.appointment_date < end_date)
+        if artist_id is not None:
+            stmt = stmt.where(model.artist_id == artist_id)
+        if status:
+            stmt = stmt.where(model.status == status)
+        if name:
+            stmt = stmt.where(text_search_clause(model, model.name, name))
+        if phone:
+            stmt = stmt.where(model.phone_number.contains(phone, autoescape=True))
+        return stmt
+
+    return union_all(
+        project(Booking, 'booking', Booking.tattoo_style, Booking.tattoo_size),
+        project(Piercing, 'piercing', Piercing.piercing_type, Piercing.jewelry_type),
+    ).subquery('appointments')
+
+
+@app.get('/api/admin-dashboard/appointments')
+@token_required
+def admin_appointments_feed(current_user):
+    """
+    Paginated appointments feed for the admin dashboard. Ordering and pagination
+    happen in SQL, so only one page of rows is ever loaded.
+    Filters: start_date/end_date (YYYY-MM-DD, inclusive), artist_id, status, order (asc|desc).
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+    artist_id = request.args.get('artist_id', type=int)
+    status = request.args.get('status')
+    order = request.args.get('order', 'asc')
+
+    try:
+        start_date = parse_date_param(request.args.get('start_date'))
+        end_date = parse_date_param(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+    if end_date:
+        end_date += timedelta(days=1)  # Make the end date inclusive
+
+    feed = appointments_feed_query(start_date, end_date, artist_id, status)
+    if order == 'desc':
+        ordering = (feed.c.appointment_date.desc(), feed.c.type, feed.c.id.desc())
+    else:
+        ordering = (feed.c.appointment_date.asc(), feed.c.type, feed.c.id.asc())
+
+    stmt = select(feed).order_by(*ordering).limit(per_page + 1).offset((page - 1) * per_page)
+    rows = db.session.execute(stmt).mappings().all()
+
+    appointments = [
+        {**row, 'appointment_date': format_datetime(row['appointment_date'])}
+        for row in rows[:per_page]
     ]
 
-    # Platform Metrics
-    total_bookings = Booking.query.count()
-    total_piercings = Piercing.query.count()
-    total_earnings = (
-        db.session.query(func.sum(Booking.price)).scalar() or 0
-    ) + (
-        db.session.query(func.sum(Piercing.price)).scalar() or 0
-    )
-    average_rating = db.session.query(func.avg(Review.star_rating)).scalar() or 0
+    return jsonify({
+        'appointments': appointments,
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': len(rows) > per_page
+    }), 200
+
+
+@app.get('/api/admin-dashboard/users')
+@token_required
+def admin_users_feed(current_user):
+    """
+    Paginated user list for the admin dashboard.
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+
+    page = request.args.get('page', 1, type=int)
+    per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+
+    users = User.query.order_by(User.id).paginate(page=page, per_page=per_page, error_out=False)
+
+    return jsonify({
+        'users': [user.to_dict() for user in users.items],
+        'total_items': users.total,
+        'total_pages': users.pages,
+        'current_page': users.page
+    }), 200
+
+
+#--------------------------------------------------------------------------------------------#
+# Streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def export_statement(kind, start_date=None, end_date=None, artist_id=None):
+    """Core SELECT for one export, ordered by primary key. Raises ValueError on unsupported filters."""
+    if kind == 'subscribers':
+        if artist_id is not None:
+            raise ValueError('artist_id does not apply to subscribers.')
+        stmt = select(*Subscriber.__table__.columns)
+        date_column = Subscriber.subscribed_at
+        id_column = Subscriber.id
+    else:
+        model = {'bookings': Booking, 'piercings': Piercing}[kind]
+        stmt = select(*model.__table__.columns, Artist.name.label('artist_name')) \
+            .outerjoin(Artist, model.artist_id == Artist.id)
+        date_column = model.appointment_date
+        id_column = model.id
+        if artist_id is not None:
+            stmt = stmt.where(model.artist_id == artist_id)
+
+    if start_date:
+        stmt = stmt.where(date_column >= start_date)
+    if end_date:
+        stmt = stmt.where(date_column < end_date)
+    return stmt.order_by(id_column)
+
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_chunks(stmt, fmt):
+    """
+    Encode rows as CSV or NDJSON, one chunk per batch. yield_per makes the driver use
+    a server-side cursor where it has one (psycopg2), so memory stays at one batch.
+    """
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    columns = list(result.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+        yield buffer.getvalue()
+
+    for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            values = [export_value(value) for value in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values)), default=str))
+                buffer.write('\n')
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.get('/api/admin/export/<kind>')
+@token_required
+def export_records(current_user, kind):
+    """
+    Stream every booking, piercing or subscriber as CSV or NDJSON.
+    Query params: format (csv|ndjson), start_date/end_date (YYYY-MM-DD, inclusive),
+    artist_id (appointments only), gzip (true to compress the download).
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+    if kind not in ('bookings', 'piercings', 'subscribers'):
+        return jsonify({'error': 'Unknown export. Use bookings, piercings or subscribers.'}), 404
+
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Invalid format. Use csv or ndjson.'}), 400
+    compress = request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
 
-    platform_metrics = {
-        'total_bookings': total_bookings,
-        'total_piercings': total_piercings,
-        'total_appointments': total_bookings + total_piercings,
-        'total_earnings': total_earnings,
-        'average_rating': round(average_rating, 2),
-    }
+    try:
+        start_date = parse_date_param(request.args.get('start_date'))
+        end_date = parse_date_param(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+    if end_date:
+        end_date += timedelta(days=1)  # Make the end date inclusive
 
-    # Build the response
-    dashboard_data = {
-        'personal_data': personal_data,
-        'users': all_users,
-        'appointments': all_appointments,
-        'platform_metrics': platform_metrics,
-    }
+    try:
+        stmt = export_statement(kind, start_date, end_date, request.args.get('artist_id', type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify(dashboard_data), 200
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    chunks = export_chunks(stmt, fmt)
+    filename = f"{kind}-{datetime.utcnow():%Y%m%d}.{extension}"
+    if compress:
+        chunks = gzip_chunks(chunks)
+        mimetype, filename = 'application/gzip', filename + '.gz'
+    else:
+        chunks = (chunk.encode('utf-8') for chunk in chunks)
+
+    response = app.response_class(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'  # Let reverse proxies pass chunks through
+    return response
 
 
 @app.patch('/api/users/<int:user_id>')
@@ -1364,9 +4281,9 @@ def update_user(current_user, user_id):
     if 'password' in data:
         try:
             validate_password(data['password'])  # Validate password strength
-            user.password = data['password']
         except Exception as e:
             return jsonify({'error': str(e)}), 400
+        user.password = data['password']
     if 'user_type' in data:
         if current_user.user_type != 'admin':  # Only admins can change user type
             return jsonify({'error': 'Only admins can change user type.'}), 403
@@ -1376,6 +4293,7 @@ def update_user(current_user, user_id):
 
     try:
         db.session.commit()
+        invalidate_principal(user.id)
         return jsonify({'message': 'User updated successfully.', 'user': user.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -1400,17 +4318,16 @@ def request_password_reset():
     # Generate a secure token
     token = serializer.dumps(user.email, salt="password-reset-salt")
     reset_link = f"https://jwhitproductionstattooparlor.netlify.app/reset-password?token={token}"
-    print(f"Reset link: {reset_link}")
+    log.info("password reset requested", extra={"user_id": user.id})
 
-    # Send the email
-    try:
-        send_email(
-            recipient=user.email,
-            subject="Password Reset Request",
-            reset_link=reset_link  # Pass only the link
-        )
-    except Exception as e:
-        return jsonify({"error": "Failed to send email.", "details": str(e)}), 500
+    # Queue the email; the outbox worker delivers it and retries on failure
+    enqueue_email(
+        kind="password_reset",
+        recipient=user.email,
+        payload={"subject": "Password Reset Request", "reset_link": reset_link}
+    )
+    db.session.commit()
+    wake_outbox_worker()
 
     return jsonify({"message": "Password reset email sent successfully."}), 200
 
@@ -1442,9 +4359,10 @@ def reset_password():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-    # Hash the password before saving
-    user.password = bcrypt.generate_password_hash(new_password).decode('utf-8')
+    # The password setter hashes it
+    user.password = new_password
     db.session.commit()
+    invalidate_principal(user.id)
 
     return jsonify({"message": "Password reset successfully."}), 200
 
@@ -1456,19 +4374,231 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+def smtp_settings():
+    """
+    SMTP configuration from the environment. EMAIL_PASSWORD is optional and
+    SMTP_STARTTLS=false disables TLS, so a local stand-in such as
+    `python -m aiosmtpd -n -l localhost:1025` can be used for testing.
+    """
+    settings = {
+        'sender': os.getenv('EMAIL_ADDRESS'),
+        'password': os.getenv('EMAIL_PASSWORD'),
+        'server': os.getenv('SMTP_SERVER'),
+        'port': int(os.getenv('SMTP_PORT', 587)),  # Default to 587 if not provided
+        'starttls': os.getenv('SMTP_STARTTLS', 'true').lower() == 'true',
+        'timeout': float(os.getenv('SMTP_TIMEOUT', 30)),
+    }
+    if not all([settings['sender'], settings['server'], settings['port']]):
+        raise ValueError("Missing email configuration in environment variables.")
+    return settings
+
+
+def open_smtp_connection(settings):
+    """Connect, upgrade to TLS and authenticate according to `settings`."""
+    server = smtplib.SMTP(settings['server'], settings['port'], timeout=settings['timeout'])
+    try:
+        server.ehlo()  # Identify with the server
+        if settings['starttls']:
+            server.starttls()  # Upgrade connection to TLS
+            server.ehlo()
+        if settings['password']:
+            server.login(settings['sender'], settings['password'])  # Authenticate
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def is_smtp_connection_error(error):
+    """True when the SMTP session itself is unusable (smtplib errors subclass OSError, so exclude them)."""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class PooledSMTPConnection:
+    """An open SMTP session plus the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, server):
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPTransport:
+    """
+    Bounded pool of authenticated SMTP connections shared by every mail sender.
+    Connections are reused across messages, probed with NOOP after sitting idle,
+    replaced after `max_messages_per_connection` messages, and reconnected once
+    when the server drops them mid-send.
+    """
+
+    def __init__(self, max_connections=4, max_messages_per_connection=100, keepalive_seconds=30, checkout_timeout=30):
+        self.max_messages_per_connection = max_messages_per_connection
+        self.keepalive_seconds = keepalive_seconds
+        self.checkout_timeout = checkout_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(int)
+        self._send_seconds = 0.0
+        self._started = time.monotonic()
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _connect(self):
+        connection = PooledSMTPConnection(open_smtp_connection(smtp_settings()))
+        self._count('handshakes')
+        return connection
+
+    def _is_healthy(self, connection):
+        if time.monotonic() - connection.last_used < self.keepalive_seconds:
+            return True
+        self._count('noops')
+        try:
+            return connection.server.noop()[0] == 250
+        except OSError:
+            return False
+
+    def _checkout(self):
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise smtplib.SMTPException("Timed out waiting for a pooled SMTP connection.")
+        try:
+            while True:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._connect()
+                if self._is_healthy(connection):
+                    return connection
+                self._count('stale_connections')
+                connection.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection, broken=False):
+        try:
+            if broken or connection.messages_sent >= self.max_messages_per_connection:
+                connection.close()
+            else:
+                connection.last_used = time.monotonic()
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for several sends; it is discarded if the session breaks."""
+        connection = self._checkout()
+        try:
+            yield connection
+        except BaseException as e:
+            self._release(connection, broken=is_smtp_connection_error(e))
+            raise
+        else:
+            self._release(connection)
+
+    def send(self, msg):
+        """Send one message on a pooled connection, reconnecting once if the session was dropped."""
+        started = time.monotonic()
+        try:
+            for attempt in range(2):
+                try:
+                    with self.connection() as connection:
+                        connection.server.send_message(msg)
+                        connection.messages_sent += 1
+                    break
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+                    if attempt:
+                        raise
+                    self._count('reconnects')
+        except Exception:
+            self._count('failures')
+            raise
+        finally:
+            with self._stats_lock:
+                self._send_seconds += time.monotonic() - started
+        self._count('messages_sent')
+
+    def close_all(self):
+        """Close every idle connection (e.g. on shutdown or after a config change)."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            send_seconds = self._send_seconds
+        sent = stats.get('messages_sent', 0)
+        elapsed = time.monotonic() - self._started
+        return {
+            'messages_sent': sent,
+            'failures': stats.get('failures', 0),
+            'handshakes': stats.get('handshakes', 0),
+            'reconnects': stats.get('reconnects', 0),
+            'noops': stats.get('noops', 0),
+            'stale_connections': stats.get('stale_connections', 0),
+            'idle_connections': self._idle.qsize(),
+            'messages_per_handshake': round(sent / stats['handshakes'], 2) if stats.get('handshakes') else 0,
+            'messages_per_second': round(sent / elapsed, 3) if elapsed else 0,
+            'messages_per_send_second': round(sent / send_seconds, 3) if send_seconds else 0,
+        }
+
+
+smtp_transport = SMTPTransport(
+    max_connections=int(os.getenv('SMTP_POOL_SIZE', 4)),
+    max_messages_per_connection=int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', 100)),
+    keepalive_seconds=int(os.getenv('SMTP_KEEPALIVE_SECONDS', 30)),
+)
+
+
+def send_message(msg):
+    """Deliver a single MIME message over the shared SMTP transport."""
+    smtp_transport.send(msg)
+
+
+@app.get('/api/admin/email-transport')
+@token_required
+def email_transport_metrics(current_user):
+    """
+    Throughput and connection metrics for the shared SMTP transport (this process only).
+    """
+    if current_user.user_type != 'admin':
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+    return jsonify(smtp_transport.stats()), 200
+
+
 def send_email(recipient, subject, reset_link, background_image_url=None):
     """
     Sends an email with improved styling using smtplib.
     """
-    # Get environment variables
-    sender_email = os.getenv('EMAIL_ADDRESS')
-    sender_password = os.getenv('EMAIL_PASSWORD')
-    smtp_server = os.getenv('SMTP_SERVER')
-    smtp_port = int(os.getenv('SMTP_PORT', 587))  # Default to 587 if not provided
+    msg = build_password_reset_email(recipient, subject, reset_link, background_image_url)
 
-    # Check if essential environment variables are set
-    if not all([sender_email, sender_password, smtp_server, smtp_port]):
-        raise ValueError("Missing email configuration in environment variables.")
+    # Send the email
+    try:
+        send_message(msg)
+        log.info("password reset email sent", extra={"email_kind": "password_reset"})
+    except Exception:
+        log.exception("password reset email failed", extra={"email_kind": "password_reset"})
+
+
+def build_password_reset_email(recipient, subject, reset_link, background_image_url=None):
+    """
+    Builds the styled password reset message.
+    """
+    sender_email = os.getenv('EMAIL_ADDRESS')
 
     # Build the HTML body with styling
     html_body = f"""
@@ -1567,17 +4697,7 @@ def send_email(recipient, subject, reset_link, background_image_url=None):
 
     # Attach the HTML content
     msg.attach(MIMEText(html_body, "html"))
-
-    # Send the email
-    try:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.ehlo()  # Identify with the server
-            server.starttls()  # Upgrade connection to TLS
-            server.login(sender_email, sender_password)  # Authenticate
-            server.send_message(msg)  # Send the email
-        print("Email sent successfully!")
-    except Exception as e:
-        print(f"Failed to send email: {str(e)}")
+    return msg
 
 
 @app.get('/api/admin-dashboard/bookings-trends')
@@ -1587,19 +4707,11 @@ def monthly_booking_trends(current_user):  # Add current_user parameter
         return jsonify({'error': 'Access denied. Admins only.'}), 403
 
     current_year = datetime.now().year
-    trends = db.session.query(
-        extract('month', Booking.appointment_date).label('month'),
-        func.count(Booking.id).label('total_bookings')
-    ).filter(
-        extract('year', Booking.appointment_date) == current_year
-    ).group_by(
-        extract('month', Booking.appointment_date)
-    ).order_by('month').all()
-
-    # Ensure `month` is cast to int
+    buckets = appointment_trends(date(current_year, 1, 1), date(current_year + 1, 1, 1), 'month')
+
     monthly_trends = [
-        {'month': calendar.month_name[int(month)], 'total_bookings': total} 
-        for month, total in trends
+        {'month': calendar.month_name[int(bucket['start'][5:7])], 'total_bookings': bucket['bookings_count']}
+        for bucket in buckets if bucket['bookings_count']
     ]
     return jsonify({
         'year': current_year,
@@ -1616,7 +4728,7 @@ class Inquiry(db.Model, SerializerMixin):
     phone_number = db.Column(db.String(15), nullable=True)  # Optional
     email = db.Column(db.String(255), nullable=False)  # Required
     inquiry = db.Column(db.Text, nullable=False)  # Required inquiry message
-    submitted_at = db.Column(db.DateTime, default=db.func.now(), nullable=False)
+    submitted_at = db.Column(db.DateTime, default=db.func.now(), nullable=False, index=True)
     status = db.Column(db.String(50), default="pending", nullable=False)  # New column
 
     def to_dict(self):
@@ -1721,6 +4833,11 @@ def get_inquiries(current_user):
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
 
+    if 'cursor' in request.args:
+        return cursor_page_response(
+            Inquiry.query, Inquiry, "inquiries", per_page, sort_attr="submitted_at", descending=True
+        )
+
     inquiries_query = Inquiry.query.order_by(Inquiry.submitted_at.desc()).paginate(page=page, per_page=per_page)
 
     return jsonify({
@@ -1735,25 +4852,127 @@ class GlobalSettings(db.Model, SerializerMixin):
 
     id = db.Column(db.Integer, primary_key=True)
     key = db.Column(db.String(50), unique=True, nullable=False)
-    value = db.Column(db.String(50), nullable=False, default=False)
+    value = db.Column(db.String(50), nullable=False, default=False)  # JSON-encoded; legacy "true"/"false" decode as booleans
+
+
+SETTING_VALUE_TYPES = (bool, int, float, str)
+SETTING_DEFAULT = False  # What an unknown key reads as
+
+
+def decode_setting(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw  # Plain strings stored before values were JSON-encoded
+
+
+def encode_setting(value):
+    """JSON text for a typed setting value. Raises ValueError when the value cannot be stored."""
+    if value is None or not isinstance(value, SETTING_VALUE_TYPES):
+        raise ValueError("Setting values must be a boolean, number or string.")
+    encoded = json.dumps(value)
+    if len(encoded) > GlobalSettings.value.type.length:
+        raise ValueError(f"Setting values are limited to {GlobalSettings.value.type.length} characters when encoded.")
+    return encoded
+
+
+BOOLEAN_SETTING_VALUES = {"true": True, "false": False, 1: True, 0: False}
+
+
+def coerce_setting(current, value):
+    """
+    `value` in the type of the stored value `current`. Keys holding a boolean stay
+    boolean: "true"/"false" and 1/0 are read as booleans, anything else raises
+    ValueError. Other keys take the value as given.
+    """
+    if not isinstance(current, bool) or isinstance(value, bool):
+        return value
+    key = value.lower() if isinstance(value, str) else value
+    if isinstance(key, (str, int)) and key in BOOLEAN_SETTING_VALUES:
+        return BOOLEAN_SETTING_VALUES[key]
+    raise ValueError("This setting holds a boolean; send true or false.")
+
+
+class SettingsService:
+    """
+    Process-local copy of every global setting with typed values. The copy is
+    revalidated against the global_settings version stamp at most once every
+    `max_staleness` seconds, so a change made by another worker shows up within that
+    window and requests in between never touch the database.
+    """
+
+    def __init__(self, max_staleness):
+        self.max_staleness = max_staleness
+        self.lock = threading.Lock()
+        self.values = {}
+        self.version = None
+        self.checked_at = None
+
+    def snapshot(self):
+        """(version, {key: value}) as of the last revalidation. Treat the dict as read-only."""
+        if self.checked_at is not None and time.monotonic() - self.checked_at < self.max_staleness:
+            return self.version, self.values
+        with self.lock:
+            if self.checked_at is None or time.monotonic() - self.checked_at >= self.max_staleness:
+                version = db.session.execute(
+                    select(TableVersion.version).where(TableVersion.table_name == "global_settings")
+                ).scalar() or 0
+                if version != self.version:
+                    # Read after the version, so the rows are at least as new as the stamp they are cached under
+                    rows = db.session.execute(select(GlobalSettings.key, GlobalSettings.value)).all()
+                    self.values = {key: decode_setting(raw) for key, raw in rows}
+                    self.version = version
+                self.checked_at = time.monotonic()
+            return self.version, self.values
+
+    def get(self, key, default=SETTING_DEFAULT):
+        return self.snapshot()[1].get(key, default)
+
+    def set(self, key, value):
+        """Store `value` (see encode_setting and coerce_setting) under `key` and commit."""
+        setting = GlobalSettings.query.filter_by(key=key).first()
+        encoded = encode_setting(coerce_setting(decode_setting(setting.value) if setting else None, value))
+        if not setting:
+            setting = GlobalSettings(key=key)
+            db.session.add(setting)
+        setting.value = encoded
+        db.session.commit()  # Bumps the global_settings stamp once the row is committed
+        self.invalidate()
+        return decode_setting(encoded)
+
+    def invalidate(self):
+        """Revalidate on the next read instead of waiting out the staleness window."""
+        with self.lock:
+            self.checked_at = None
+
+
+settings_service = SettingsService(max_staleness=float(os.getenv('SETTINGS_MAX_STALENESS', 5)))
+
+
+@app.route('/api/global-settings', methods=['GET'])
+def get_global_settings():
+    """Every global setting with its typed value, in one call. Supports If-None-Match."""
+    version, values = settings_service.snapshot()
+    response = make_response(jsonify(values))
+    response.set_etag(f"settings-{version}")
+    response.headers['Cache-Control'] = app.config['CACHE_CONTROL'].get(request.endpoint, 'no-cache')
+    return response.make_conditional(request)
+
+
 @app.route('/api/global-settings/<string:key>', methods=['GET'])
 def get_or_create_global_setting(key):
     """
-    Fetch the value of a global setting by its key, creating it with a default value if it doesn't exist.
+    Fetch the value of a global setting by its key. Unknown keys read as false
+    without being written; they are created on their first update.
     """
-    setting = GlobalSettings.query.filter_by(key=key).first()
-    if not setting:
-        setting = GlobalSettings(key=key, value="false")  # Default value
-        db.session.add(setting)
-        db.session.commit()
-
-    return jsonify({key: setting.value == "true"}), 200
+    return jsonify({key: settings_service.get(key)}), 200
 
 
 @app.route('/api/global-settings/<string:key>', methods=['PATCH'])
 def update_global_setting(key):
     """
-    Update the value of a global setting by its key.
+    Update the value of a global setting by its key. Booleans, numbers and strings
+    keep their type; keys that hold a boolean only take true/false (or "true"/"false", 1/0).
     """
     # Parse request data
     data = request.get_json()
@@ -1762,30 +4981,33 @@ def update_global_setting(key):
     if new_value is None:
         return jsonify({'error': 'New value is required.'}), 400
 
-    # Retrieve or create the setting
-    setting = GlobalSettings.query.filter_by(key=key).first()
-    if not setting:
-        setting = GlobalSettings(key=key, value="false")  # Default value
-        db.session.add(setting)
-
-    # Update the value
-    setting.value = "true" if bool(new_value) else "false"
-    db.session.commit()
+    try:
+        value = settings_service.set(key, new_value)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify({'message': 'Setting updated successfully.', key: setting.value == "true"}), 200
+    return jsonify({'message': 'Setting updated successfully.', key: value}), 200
 
 #-----------------------------------------------------------------------------------------------------------------------------------
 def send_newsletter_email(recipient, subject, body, background_image_url=None):
     """
     Sends a newsletter email with a custom body and optional background image.
     """
-    sender_email = os.getenv('EMAIL_ADDRESS')
-    sender_password = os.getenv('EMAIL_PASSWORD')
-    smtp_server = os.getenv('SMTP_SERVER')
-    smtp_port = int(os.getenv('SMTP_PORT', 587))  # Default to 587 if not provided
+    msg = build_newsletter_email(recipient, subject, body, background_image_url)
 
-    if not all([sender_email, sender_password, smtp_server, smtp_port]):
-        raise ValueError("Missing email configuration in environment variables.")
+    # Send the email
+    try:
+        send_message(msg)
+        log.debug("newsletter email sent", extra={"email_kind": "newsletter"})
+    except Exception:
+        log.exception("newsletter email failed", extra={"email_kind": "newsletter"})
+
+
+def build_newsletter_email(recipient, subject, body, background_image_url=None):
+    """
+    Builds a newsletter message with a custom body and optional background image.
+    """
+    sender_email = os.getenv('EMAIL_ADDRESS')
 
     # Add a personalized greeting to the email body
     personalized_body = f"Hello {recipient},\n\n{body}"
@@ -1827,16 +5049,7 @@ def send_newsletter_email(recipient, subject, body, background_image_url=None):
     text_body = f"{subject}\n\nHello {recipient},\n\n{body}\n\n© 2024 Tattoo Parlor. All rights reserved."
     msg.attach(MIMEText(text_body, "plain"))
     msg.attach(MIMEText(html_body, "html"))
-
-    # Send the email
-    try:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-        print(f"Newsletter sent successfully to {recipient}")
-    except Exception as e:
-        print(f"Failed to send newsletter to {recipient}: {str(e)}")
+    return msg
 
 
 class Newsletter(db.Model, SerializerMixin):
@@ -1869,22 +5082,23 @@ def create_newsletter():
 
     newsletter = Newsletter(title=title, image=image, body=body)
     db.session.add(newsletter)
-    db.session.commit()
+    db.session.flush()
 
-    # Send newsletter to all subscribers
-    subscribers = Subscriber.query.all()
-    for subscriber in subscribers:
-        send_newsletter_email(
-            recipient=subscriber.email,
-            subject=f"New Newsletter: {title}",
-            body=body,
-            background_image_url=image
-        )
+    # Queue one outbox message per active subscriber; delivery happens in the background
+    job = enqueue_newsletter(newsletter)
+    db.session.commit()
+    wake_outbox_worker()
 
-    return jsonify({"message": "Newsletter created and emails sent", "newsletter": newsletter.to_dict()}), 201
+    return jsonify({
+        "message": "Newsletter created and emails queued",
+        "newsletter": newsletter.to_dict(),
+        "job_id": job.id,
+        "recipients": job.total
+    }), 201
 
 
 @app.get('/api/newsletters')
+@conditional_get("newsletters")
 def get_newsletters():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
@@ -1893,7 +5107,13 @@ def get_newsletters():
     query = Newsletter.query
 
     if search_query:
-        query = query.filter(Newsletter.title.ilike(f"%{search_query}%"))
+        query = apply_text_search(query, Newsletter, Newsletter.title, search_query)
+
+    if 'cursor' in request.args:
+        return cursor_page_response(
+            query, Newsletter, "newsletters", per_page, scope=cursor_scope("newsletters", search_query),
+            sort_attr="created_at", descending=True
+        )
 
     paginated_newsletters = query.order_by(Newsletter.created_at.desc()).paginate(page=page, per_page=per_page)
 
@@ -1925,7 +5145,7 @@ class Subscriber(db.Model):
     __tablename__ = "subscribers"  # Ensure this matches the actual table name
 
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(255), nullable=False)  # Stored normalized; see normalize_email
     subscribed_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
     is_active = db.Column(db.Boolean, default=True)  # New field for soft delete
 
@@ -1939,6 +5159,175 @@ class Subscriber(db.Model):
         }
 
 
+# One subscription per address regardless of case; also the index behind email lookups
+db.Index("uq_subscribers_email_lower", func.lower(Subscriber.email), unique=True)
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+SUBSCRIBER_EMAIL_INDEX = "uq_subscribers_email_lower"
+subscriber_email_index_state = {"present": False, "checked_at": None}
+
+
+def subscriber_email_index_ready():
+    """
+    Whether the unique lower(email) index exists yet (`flask db upgrade` builds it).
+    Until it does, subscribe falls back to a lookup; the check repeats once a minute.
+    """
+    state = subscriber_email_index_state
+    now = time.monotonic()
+    if state["present"] or (state["checked_at"] is not None and now - state["checked_at"] < 60):
+        return state["present"]
+    # Expression indexes are not reflected on every dialect, so ask the catalog directly
+    if db.engine.dialect.name == "postgresql":
+        query = "SELECT 1 FROM pg_indexes WHERE indexname = :name"
+    else:
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"
+    state["present"] = db.session.execute(text(query), {"name": SUBSCRIBER_EMAIL_INDEX}).first() is not None
+    state["checked_at"] = now
+    return state["present"]
+
+
+def upsert_subscriber(email, now):
+    """
+    Subscribe, or reactivate an inactive subscription, in one INSERT ... ON CONFLICT on
+    the lower(email) index, so concurrent sign-ups for one address converge on one row.
+    Returns (subscriber_id, inserted), or None when the address is already active.
+    """
+    stmt = dialect_insert(Subscriber).values(email=email, subscribed_at=now, is_active=True)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[func.lower(Subscriber.email)],
+        set_={"is_active": True, "subscribed_at": now},
+        where=Subscriber.is_active.isnot(True),
+    )
+    if db.engine.dialect.name == "postgresql":
+        inserted = literal_column("xmax = 0")  # xmax is only set on rows the statement updated
+    else:
+        # SQLite has no equivalent of xmax, so probe first. The probe only picks which event is
+        # logged; under a concurrent sign-up it may say "subscribe" for a reactivation. The row
+        # itself is still decided by the upsert.
+        inserted = literal(db.session.execute(
+            select(Subscriber.id).where(func.lower(Subscriber.email) == email)
+        ).first() is None)
+    row = db.session.execute(stmt.returning(Subscriber.id, inserted)).first()
+    return tuple(row) if row is not None else None
+
+
+def subscribe_with_lookup(email, now):
+    """Fallback for upsert_subscriber before the unique index exists: lookup, then insert or update."""
+    existing = db.session.execute(
+        select(Subscriber.id, Subscriber.is_active)
+        .where(func.lower(Subscriber.email) == email).order_by(Subscriber.id)
+    ).first()
+    if existing is None:
+        subscriber = Subscriber(email=email, subscribed_at=now, is_active=True)
+        db.session.add(subscriber)
+        db.session.flush()
+        return subscriber.id, True
+    if existing.is_active:
+        return None
+    db.session.execute(
+        update(Subscriber).where(Subscriber.id == existing.id).values(is_active=True, subscribed_at=now),
+        execution_options={"synchronize_session": False}
+    )
+    return existing.id, False
+
+
+class SubscriptionEvent(db.Model):
+    """Append-only log of subscription changes: subscribe, reactivate, unsubscribe."""
+    __tablename__ = "subscription_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    subscriber_id = db.Column(db.Integer, db.ForeignKey("subscribers.id", ondelete="SET NULL"), nullable=True, index=True)
+    event_type = db.Column(db.String(20), nullable=False)
+    occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class SubscriberMonthlyStats(db.Model):
+    """
+    Subscription events per calendar month (UTC), keyed by the first day of the month.
+    Maintained with every event and backfilled by `flask db upgrade`; `flask rebuild-subscription-stats` recomputes it.
+    """
+    __tablename__ = "subscriber_monthly_stats"
+
+    month = db.Column(db.Date, primary_key=True)
+    subscribe_count = db.Column(db.Integer, nullable=False, default=0)
+    reactivate_count = db.Column(db.Integer, nullable=False, default=0)
+    unsubscribe_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+SUBSCRIPTION_EVENTS = ('subscribe', 'reactivate', 'unsubscribe')
+SUBSCRIPTION_STAT_FIELDS = tuple(f"{event}_count" for event in SUBSCRIPTION_EVENTS)
+subscriber_metrics_cache = {}  # (events version, current month) -> payload
+
+
+def record_subscription_event(subscriber_id, event_type, occurred_at=None):
+    """Log one subscription event and count it in its month's rollup row, in the current transaction."""
+    occurred_at = occurred_at or datetime.utcnow()
+    db.session.add(SubscriptionEvent(subscriber_id=subscriber_id, event_type=event_type, occurred_at=occurred_at))
+    _bump_row(
+        SubscriberMonthlyStats, SubscriberMonthlyStats.month, occurred_at.date().replace(day=1),
+        {f"{event_type}_count": 1}, SUBSCRIPTION_STAT_FIELDS
+    )
+
+
+@app.cli.command("rebuild-subscription-stats")
+def rebuild_subscription_stats():
+    """
+    Log a subscribe event for subscribers that predate the event log, then recompute
+    the monthly rollup from the events. Unsubscribes from before the log have no date
+    and cannot be recovered.
+    """
+    logged = select(SubscriptionEvent.subscriber_id).where(SubscriptionEvent.subscriber_id.isnot(None))
+    missing = db.session.execute(
+        select(Subscriber.id, Subscriber.subscribed_at).where(Subscriber.id.notin_(logged))
+    ).all()
+    for subscriber_id, subscribed_at in missing:
+        db.session.add(SubscriptionEvent(subscriber_id=subscriber_id, event_type='subscribe', occurred_at=subscribed_at))
+    db.session.flush()
+
+    months = defaultdict(lambda: dict.fromkeys(SUBSCRIPTION_STAT_FIELDS, 0))
+    rows = db.session.execute(select(SubscriptionEvent.event_type, SubscriptionEvent.occurred_at))
+    for event_type, occurred_at in rows:
+        months[occurred_at.date().replace(day=1)][f"{event_type}_count"] += 1
+    db.session.execute(SubscriberMonthlyStats.__table__.delete())
+    for month, counts in months.items():
+        db.session.add(SubscriberMonthlyStats(month=month, **counts))
+    db.session.commit()
+    click.echo(f"Logged {len(missing)} missing subscribe events; rebuilt {len(months)} months.")
+
+
+@app.cli.command("merge-duplicate-subscribers")
+def merge_duplicate_subscribers():
+    """
+    Normalize subscriber emails and fold rows that differ only by case or whitespace
+    into the oldest one. `flask db upgrade` does the same before building the unique
+    lower(email) index; this repairs databases that get indexes from `flask create-indexes`.
+    """
+    groups = defaultdict(list)
+    for subscriber in Subscriber.query.order_by(Subscriber.subscribed_at, Subscriber.id):
+        groups[normalize_email(subscriber.email)].append(subscriber)
+
+    merged = 0
+    for email, (keep, *duplicates) in groups.items():
+        if duplicates:
+            keep.is_active = any(subscriber.is_active for subscriber in [keep, *duplicates])
+            duplicate_ids = [subscriber.id for subscriber in duplicates]
+            db.session.execute(
+                update(SubscriptionEvent).where(SubscriptionEvent.subscriber_id.in_(duplicate_ids))
+                .values(subscriber_id=keep.id),
+                execution_options={"synchronize_session": False}
+            )
+            for subscriber in duplicates:
+                db.session.delete(subscriber)
+            merged += len(duplicates)
+        keep.email = email
+    db.session.commit()
+    click.echo(f"Merged {merged} duplicate subscribers.")
+
+
 @app.post('/api/subscribe')
 def subscribe():
     data = request.get_json()
@@ -1947,25 +5336,26 @@ def subscribe():
     # Validate the email format
     if not email or not re.match(r"[^@]+@[^@]+\.[^@]+", email):
         return jsonify({"error": "Invalid email format"}), 400
+    email = normalize_email(email)
 
-    # Check if the subscriber already exists
-    subscriber = Subscriber.query.filter_by(email=email).first()
-    if subscriber:
-        if subscriber.is_active:
-            return jsonify({"error": "This email is already subscribed"}), 400
-        else:
-            # Reactivate the existing subscription
-            subscriber.is_active = True
-            subscriber.subscribed_at = db.func.now()  # Update the subscription date
-            db.session.commit()
-            return jsonify({"message": "Subscription reactivated successfully", "subscriber": subscriber.to_dict()}), 200
+    now = datetime.utcnow()
+    if subscriber_email_index_ready():
+        row = upsert_subscriber(email, now)
+    else:
+        row = subscribe_with_lookup(email, now)
+
+    if row is None:  # Already active
+        db.session.rollback()
+        return jsonify({"error": "This email is already subscribed"}), 400
 
-    # Create a new subscriber if it doesn't exist
-    new_subscriber = Subscriber(email=email)
-    db.session.add(new_subscriber)
+    subscriber_id, inserted = row
+    record_subscription_event(subscriber_id, 'subscribe' if inserted else 'reactivate', now)
     db.session.commit()
 
-    return jsonify({"message": "Subscription successful", "subscriber": new_subscriber.to_dict()}), 201
+    subscriber = Subscriber(id=subscriber_id, email=email, subscribed_at=now, is_active=True).to_dict()
+    if inserted:
+        return jsonify({"message": "Subscription successful", "subscriber": subscriber}), 201
+    return jsonify({"message": "Subscription reactivated successfully", "subscriber": subscriber}), 200
 
 @app.get('/api/subscribers')
 def get_subscribers():
@@ -1976,7 +5366,10 @@ def get_subscribers():
     query = Subscriber.query
 
     if search_query:
-        query = query.filter(Subscriber.email.ilike(f"%{search_query}%"))
+        query = apply_text_search(query, Subscriber, Subscriber.email, search_query)
+
+    if 'cursor' in request.args:
+        return cursor_page_response(query, Subscriber, "subscribers", per_page, scope=cursor_scope("subscribers", search_query))
 
     paginated_subscribers = query.paginate(page=page, per_page=per_page, error_out=False)
 
@@ -1995,101 +5388,81 @@ def unsubscribe():
         if not email:
             return jsonify({"error": "Email is required"}), 400
 
-        # Query the subscriber by email
-        subscriber = Subscriber.query.filter_by(email=email).first()
-        if not subscriber:
-            return jsonify({"error": "Subscriber not found"}), 404
-
-        # Mark the subscriber as inactive
-        subscriber.is_active = False
-        db.session.commit()
+        email = normalize_email(email)
+
+        # Deactivate with one indexed UPDATE; only a miss needs a second look
+        subscriber_id = db.session.execute(
+            update(Subscriber)
+            .where(func.lower(Subscriber.email) == email, Subscriber.is_active.is_(True))
+            .values(is_active=False)
+            .returning(Subscriber.id),
+            execution_options={"synchronize_session": False}
+        ).scalar()
+        if subscriber_id is None:
+            subscriber_id = db.session.execute(
+                select(Subscriber.id).where(func.lower(Subscriber.email) == email)
+            ).scalar()
+            if subscriber_id is None:
+                return jsonify({"error": "Subscriber not found"}), 404
+        else:
+            record_subscription_event(subscriber_id, 'unsubscribe')
+            db.session.commit()
 
-        print(f"Unsubscribed email: {email}")  # Log the unsubscribed email
+        log.info("subscriber unsubscribed", extra={"subscriber_id": subscriber_id})
         return jsonify({"message": "Successfully unsubscribed"}), 200
 
-    except Exception as e:
-        print(f"Error: {str(e)}")  # Log any unexpected errors
+    except Exception:
+        log.exception("unsubscribe failed")
         return jsonify({"error": "Internal server error"}), 500
 @app.get('/api/metrics/subscribers')
 def get_subscriber_metrics():
-    try:
-        # Calculate the start and end dates for the last 12 months
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=365)  # 12 months ago
-        print(f"Start Date: {start_date}, End Date: {end_date}")  # Debug: Date range
-
-        # Query to calculate counts of new subscribers by month
-        new_subscribers = db.session.query(
-            extract('year', Subscriber.subscribed_at).label('year'),
-            extract('month', Subscriber.subscribed_at).label('month'),
-            func.count(Subscriber.id).label('count')
-        ).filter(
-            Subscriber.subscribed_at >= start_date,
-            Subscriber.subscribed_at <= end_date,
-            Subscriber.is_active == True
-        ).group_by('year', 'month').all()
-        print(f"New Subscribers Raw Data: {new_subscribers}")  # Debug: New subscribers query results
-
-        # Query to calculate counts of unsubscribes by month
-        unsubscribes = db.session.query(
-            extract('year', Subscriber.subscribed_at).label('year'),
-            extract('month', Subscriber.subscribed_at).label('month'),
-            func.count(Subscriber.id).label('count')
-        ).filter(
-            Subscriber.subscribed_at >= start_date,
-            Subscriber.subscribed_at <= end_date,
-            Subscriber.is_active == False
-        ).group_by('year', 'month').all()
-        print(f"Unsubscribes Raw Data: {unsubscribes}")  # Debug: Unsubscribes query results
-
-        def build_monthly_data(query_results):
-            data = defaultdict(int)
-            for year, month, count in query_results:
-                key = f"{int(year)}-{int(month):02d}"
-                data[key] = count
-                print(f"Processed Data - Key: {key}, Count: {count}")  # Debug
-            return data
-
-        # Convert query results into dictionaries
-        new_subscribers_by_month = defaultdict(int, build_monthly_data(new_subscribers))
-        unsubscribes_by_month = build_monthly_data(unsubscribes)
-        print(f"New Subscribers by Month: {new_subscribers_by_month}")  # Debug: Processed new subscribers
-        print(f"Unsubscribes by Month: {unsubscribes_by_month}") 
-        # Generate a complete list of months for the last 12 months
-        months = [(end_date - relativedelta(months=i)).strftime('%Y-%m') for i in range(11, -1, -1)]
-        print(f"Months for the Last Year: {months}")  # Debug: Month list
-        print(f"Generated Months: {months}")
-        print(f"Keys in New Subscribers by Month: {list(new_subscribers_by_month.keys())}")
-
-        # Build lists for charting
-        monthly_new_subscribers = [new_subscribers_by_month.get(month, 0) for month in months]
-        monthly_unsubscribes = [unsubscribes_by_month.get(month, 0) for month in months]
-        print(f"Monthly New Subscribers: {monthly_new_subscribers}")  # Debug: Chart-ready data
-        print(f"Monthly Unsubscribes: {monthly_unsubscribes}") 
-        # Calculate overall trends
-        net_subscriptions = sum(monthly_new_subscribers) - sum(monthly_unsubscribes)
-        trend = "positive" if net_subscriptions > 0 else "negative" if net_subscriptions < 0 else "neutral"
-        print(f"Net Subscriptions: {net_subscriptions}, Trend: {trend}")  # Debug: Overall trend
-        print("Months:", months)
-        print("New Subscribers by Month:", new_subscribers_by_month)
-        print("Unsubscribes by Month:", unsubscribes_by_month)
-        print("Monthly New Subscribers:", monthly_new_subscribers)
-        print("Monthly Unsubscribes:", monthly_unsubscribes)
-
-        return jsonify({
-            "total_new_subscribers": sum(monthly_new_subscribers),
-            "total_unsubscribes": sum(monthly_unsubscribes),
-            "net_subscriptions": net_subscriptions,
-            "trend": trend,
-            "start_date": start_date.strftime('%Y-%m-%d'),
-            "end_date": end_date.strftime('%Y-%m-%d'),
-            "monthly_new_subscribers": monthly_new_subscribers,
-            "monthly_unsubscribes": monthly_unsubscribes
-        }), 200
-
-    except Exception as e:
-        print(f"Error: {str(e)}")  # Log the error
-        return jsonify({"error": "Internal server error"}), 500
+    """
+    New, reactivated and churned subscribers for the last 12 months (current month
+    included), from one primary-key range scan over the monthly rollup. The payload is
+    cached until the next subscription event or the start of a new month.
+    """
+    now = datetime.utcnow()
+    first_month = (now - relativedelta(months=11)).date().replace(day=1)
+    version = db.session.execute(
+        select(TableVersion.version).where(TableVersion.table_name == "subscription_events")
+    ).scalar() or 0
+    cache_key = (version, first_month)
+    cached = subscriber_metrics_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+
+    rows = db.session.execute(
+        select(SubscriberMonthlyStats).where(SubscriberMonthlyStats.month >= first_month)
+    ).scalars()
+    by_month = {row.month: row for row in rows}
+
+    months = [first_month + relativedelta(months=i) for i in range(12)]
+    stats = [by_month.get(month) for month in months]
+    monthly_subscribes = [row.subscribe_count if row else 0 for row in stats]
+    monthly_reactivations = [row.reactivate_count if row else 0 for row in stats]
+    monthly_unsubscribes = [row.unsubscribe_count if row else 0 for row in stats]
+    monthly_new_subscribers = [a + b for a, b in zip(monthly_subscribes, monthly_reactivations)]
+    monthly_net = [new - lost for new, lost in zip(monthly_new_subscribers, monthly_unsubscribes)]
+
+    net_subscriptions = sum(monthly_net)
+    trend = "positive" if net_subscriptions > 0 else "negative" if net_subscriptions < 0 else "neutral"
+    payload = {
+        "total_new_subscribers": sum(monthly_new_subscribers),
+        "total_reactivations": sum(monthly_reactivations),
+        "total_unsubscribes": sum(monthly_unsubscribes),
+        "net_subscriptions": net_subscriptions,
+        "trend": trend,
+        "start_date": first_month.strftime('%Y-%m-%d'),
+        "end_date": now.strftime('%Y-%m-%d'),
+        "months": [month.strftime('%Y-%m') for month in months],
+        "monthly_new_subscribers": monthly_new_subscribers,
+        "monthly_reactivations": monthly_reactivations,
+        "monthly_unsubscribes": monthly_unsubscribes,
+        "monthly_net": monthly_net,
+    }
+    subscriber_metrics_cache.clear()
+    subscriber_metrics_cache[cache_key] = payload
+    return jsonify(payload), 200
 
  
 @app.delete('/api/subscribers/<int:subscriber_id>/delete')
@@ -2104,6 +5477,9 @@ def delete_subscriber(subscriber_id):
         return jsonify({"error": "Subscriber not found"}), 404
 
     try:
+        if subscriber.is_active:
+            record_subscription_event(subscriber.id, 'unsubscribe')
+            db.session.flush()  # Write the event first; the FK then nulls its subscriber_id
         db.session.delete(subscriber)
         db.session.commit()
         return jsonify({"message": f"Subscriber with ID {subscriber_id} deleted successfully."}), 200
@@ -2113,5 +5489,295 @@ def delete_subscriber(subscriber_id):
 
 
 
+#--------------------------------------------------------------------------------------------------------
+# Email outbox
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', 2))
+OUTBOX_POLL_SECONDS = int(os.getenv('OUTBOX_POLL_SECONDS', 15))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_BACKOFF_SECONDS = int(os.getenv('OUTBOX_BACKOFF_SECONDS', 30))
+OUTBOX_LEASE_SECONDS = int(os.getenv('OUTBOX_LEASE_SECONDS', 300))
+
+
+class EmailJob(db.Model):
+    """
+    A group of outbox messages (one newsletter send or one transactional email) with progress counters.
+    """
+    __tablename__ = "email_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)  # 'newsletter' or 'password_reset'
+    newsletter_id = db.Column(db.Integer, db.ForeignKey("newsletters.id", name="fk_email_job_newsletter", ondelete="SET NULL"), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, sending, completed
+    total = db.Column(db.Integer, nullable=False, default=0)
+    sent = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "newsletter_id": self.newsletter_id,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "pending": max(self.total - self.sent - self.failed, 0),
+            "created_at": format_datetime(self.created_at)
+        }
+
+
+class OutboxMessage(db.Model):
+    """
+    One email waiting for delivery. Status moves pending -> sending -> sent, or to dead
+    after a permanent failure or OUTBOX_MAX_ATTEMPTS transient ones.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("email_jobs.id", name="fk_outbox_job", ondelete="CASCADE"), nullable=False, index=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    payload = db.Column(db.JSON, nullable=True)  # Per-message template data, e.g. the reset link
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+class PermanentDeliveryError(Exception):
+    """A message that can never be delivered and should be dead-lettered right away."""
+
+
+def enqueue_email(kind, recipient, payload):
+    """Queue a single transactional email in the current transaction."""
+    job = EmailJob(kind=kind, status="queued", total=1)
+    db.session.add(job)
+    db.session.flush()
+    db.session.add(OutboxMessage(job_id=job.id, recipient=recipient, payload=payload))
+    return job
+
+
+def enqueue_newsletter(newsletter):
+    """
+    Queue the newsletter for every active subscriber with a single INSERT ... SELECT,
+    so no subscriber rows are loaded into the worker.
+    """
+    job = EmailJob(kind="newsletter", newsletter_id=newsletter.id, status="queued")
+    db.session.add(job)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    recipients = select(
+        literal(job.id), Subscriber.email, literal("pending"), literal(0), literal(now), literal(now)
+    ).where(Subscriber.is_active == True)
+    result = db.session.execute(
+        insert(OutboxMessage).from_select(
+            ["job_id", "recipient", "status", "attempts", "next_attempt_at", "created_at"], recipients
+        )
+    )
+    job.total = max(result.rowcount, 0)
+    if job.total == 0:
+        job.status = "completed"
+    return job
+
+
+def render_outbox_message(message, job, newsletters):
+    """Build the MIME message for an outbox row. `newsletters` caches newsletters per batch."""
+    if job.kind == "password_reset":
+        payload = message.payload or {}
+        if not payload.get("reset_link"):
+            raise PermanentDeliveryError("Missing reset link.")
+        return build_password_reset_email(message.recipient, payload.get("subject", "Password Reset Request"), payload["reset_link"])
+
+    if job.kind == "newsletter":
+        if job.newsletter_id not in newsletters:
+            newsletters[job.newsletter_id] = Newsletter.query.get(job.newsletter_id) if job.newsletter_id else None
+        newsletter = newsletters[job.newsletter_id]
+        if not newsletter:
+            raise PermanentDeliveryError("Newsletter no longer exists.")
+        return build_newsletter_email(
+            recipient=message.recipient,
+            subject=f"New Newsletter: {newsletter.title}",
+            body=newsletter.body,
+            background_image_url=newsletter.image
+        )
+
+    raise PermanentDeliveryError(f"Unknown email kind: {job.kind}")
+
+
+def is_permanent_failure(error):
+    """5xx replies (other than authentication) and unrenderable messages are not retried."""
+    if isinstance(error, PermanentDeliveryError):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError)):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def process_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Claim one batch of due messages, deliver them over the pooled SMTP transport and
+    record the outcome. Returns the number of messages claimed.
+    """
+    now = datetime.utcnow()
+    claimable = or_(
+        and_(OutboxMessage.status == "pending", OutboxMessage.next_attempt_at <= now),
+        and_(OutboxMessage.status == "sending", OutboxMessage.lease_expires_at < now),  # Abandoned by a crashed worker
+    )
+    candidates = db.session.scalars(
+        select(OutboxMessage.id).where(claimable).order_by(OutboxMessage.id)
+        .limit(batch_size).with_for_update(skip_locked=True)
+    ).all()
+    if not candidates:
+        db.session.commit()
+        return 0
+
+    # SKIP LOCKED only keeps PostgreSQL workers apart (SQLite ignores FOR UPDATE), so the
+    # claim itself re-checks `claimable`: a row another worker claimed first is left out.
+    ids = db.session.scalars(
+        update(OutboxMessage).where(OutboxMessage.id.in_(candidates), claimable)
+        .values(status="sending", lease_expires_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+        .returning(OutboxMessage.id),
+        execution_options={"synchronize_session": False}
+    ).all()
+    db.session.commit()
+    if not ids:
+        return 0
+
+    messages = OutboxMessage.query.filter(OutboxMessage.id.in_(ids)).order_by(OutboxMessage.id).all()
+    jobs = {job.id: job for job in EmailJob.query.filter(EmailJob.id.in_({m.job_id for m in messages}))}
+    newsletters = {}
+    progress = defaultdict(lambda: {"sent": 0, "failed": 0})
+
+    transport_down = False
+
+    for message in messages:
+        message.lease_expires_at = None
+        if transport_down:
+            # Don't burn attempts on the rest of the batch while the server is unreachable
+            message.status = "pending"
+            message.next_attempt_at = datetime.utcnow() + timedelta(seconds=OUTBOX_BACKOFF_SECONDS)
+            continue
+        try:
+            send_message(render_outbox_message(message, jobs[message.job_id], newsletters))
+        except Exception as e:
+            message.attempts += 1
+            message.last_error = str(e)[:1000]
+            if is_permanent_failure(e) or message.attempts >= OUTBOX_MAX_ATTEMPTS:
+                message.status = "dead"
+                progress[message.job_id]["failed"] += 1
+            else:
+                delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** (message.attempts - 1), 3600)
+                message.status = "pending"
+                message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            transport_down = is_smtp_connection_error(e) or isinstance(e, ValueError)
+        else:
+            message.status = "sent"
+            message.sent_at = datetime.utcnow()
+            message.payload = None  # Drop one-time secrets such as reset links once delivered
+            progress[message.job_id]["sent"] += 1
+
+    for job_id, counts in progress.items():
+        done = EmailJob.sent + EmailJob.failed + counts["sent"] + counts["failed"]
+        db.session.execute(
+            update(EmailJob).where(EmailJob.id == job_id).values(
+                sent=EmailJob.sent + counts["sent"],
+                failed=EmailJob.failed + counts["failed"],
+                status=case((done >= EmailJob.total, "completed"), else_="sending"),
+            ),
+            execution_options={"synchronize_session": False}
+        )
+    db.session.commit()
+    return len(messages)
+
+
+def run_outbox_worker():
+    """Drain the outbox until no full batch remains. Runs on the scheduler's thread pool."""
+    with app.app_context():
+        try:
+            while process_outbox() >= OUTBOX_BATCH_SIZE:
+                pass
+        except Exception:
+            db.session.rollback()
+            log.exception("outbox delivery failed")
+        finally:
+            db.session.remove()
+
+
+outbox_scheduler = None
+outbox_scheduler_lock = threading.Lock()
+
+
+def ensure_outbox_worker():
+    """
+    Start the background delivery pool once per process. Set OUTBOX_WORKER=false on web
+    workers when running `flask deliver-outbox` as a dedicated process instead.
+    """
+    global outbox_scheduler
+    if outbox_scheduler is not None:
+        return outbox_scheduler
+    if os.getenv('OUTBOX_WORKER', 'true').lower() != 'true':
+        return None
+    with outbox_scheduler_lock:
+        if outbox_scheduler is None:
+            outbox_scheduler = BackgroundScheduler(
+                executors={'default': ThreadPoolExecutor(OUTBOX_WORKERS)},
+                job_defaults={'coalesce': True, 'max_instances': OUTBOX_WORKERS}
+            )
+            outbox_scheduler.add_job(
+                run_outbox_worker, 'interval', seconds=OUTBOX_POLL_SECONDS,
+                id='outbox-delivery', next_run_time=datetime.now()
+            )
+            outbox_scheduler.start()
+    return outbox_scheduler
+
+
+def wake_outbox_worker():
+    """Run a delivery pass now instead of waiting for the next poll."""
+    scheduler = ensure_outbox_worker()
+    if scheduler is not None:
+        scheduler.add_job(run_outbox_worker)
+
+
+@app.get('/api/email-jobs/<int:job_id>')
+@token_required
+def get_email_job(current_user, job_id):
+    """
+    Delivery progress for a queued email job. Admin only.
+    """
+    if not is_admin_user():
+        return jsonify({'error': 'Access denied. Admins only.'}), 403
+    job = EmailJob.query.get(job_id)
+    if not job:
+        return jsonify({"error": "Email job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.cli.command("deliver-outbox")
+@click.option("--loop", is_flag=True, help="Keep polling instead of exiting once the outbox is drained.")
+def deliver_outbox(loop):
+    """Deliver queued emails from this process."""
+    while True:
+        claimed = process_outbox()
+        if claimed:
+            click.echo(f"Processed {claimed} messages.")
+        elif not loop:
+            break
+        else:
+            time.sleep(OUTBOX_POLL_SECONDS)
+
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Performance benchmarks for the tattoo parlor API.
+
+    python -m benchmarks generate --scale 0.1           # seeded dataset (scale 1.0 = 1M bookings)
+    python -m benchmarks run --output results.json      # endpoint scenarios via the Flask test client
+    python -m benchmarks run --base-url http://127.0.0.1:8000 --output results.json   # against a running server
+    python -m benchmarks run --gunicorn --scenario artists_list_during_login_storm   # gunicorn from gunicorn.conf.py
+    python -m benchmarks micro --output micro.json      # serializer / logging / metrics overhead
+    python -m benchmarks smtp --output smtp.json        # per-message SMTP vs the pooled transport
+    python -m benchmarks plans                          # fail if a hot query plans a sequential scan
+    python -m benchmarks compare before.json after.json
+
+DATABASE_URI selects the database (default: a SQLite file next to this package).
+Every command writes JSON, so runs can be diffed with `compare`.
+"""
+import os
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE_URI = f"sqlite:///{os.path.join(BENCH_DIR, 'bench.db')}"
+ADMIN_USERNAME = "bench_admin"
+ADMIN_PASSWORD = "Bench-Admin-Pass1!"
+
+
+def load_app():
+    """Import the Flask app with benchmark-friendly defaults for anything not already configured."""
+    os.environ.setdefault("DATABASE_URI", DEFAULT_DATABASE_URI)
+    os.environ.setdefault("OUTBOX_WORKER", "false")  # Keep the outbox worker out of the measurements
+    import app as application
+    return application
@@ -0,0 +1,121 @@
+import argparse
+import json
+import sys
+from datetime import date
+
+COMPARED_METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def write_output(document, path):
+    text = json.dumps(document, indent=2, sort_keys=True, default=str)
+    if path:
+        with open(path, "w") as handle:
+            handle.write(text + "\n")
+        print(f"Wrote {path}")
+    else:
+        print(text)
+
+
+def compare(before_path, after_path, echo=print):
+    """Side-by-side scenario metrics from two `run` documents, with the percentage change."""
+    with open(before_path) as handle:
+        before = json.load(handle)["results"]
+    with open(after_path) as handle:
+        after = json.load(handle)["results"]
+
+    rows = {}
+    echo(f"{'scenario':34s} {'metric':15s} {'before':>10} {'after':>10} {'change':>8}")
+    for name in sorted(set(before) & set(after)):
+        rows[name] = {}
+        for metric in COMPARED_METRICS:
+            old, new = before[name].get(metric), after[name].get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            change = round((new - old) / old * 100, 1) if old else None
+            rows[name][metric] = {"before": old, "after": new, "change_pct": change}
+            shown = f"{change:+.1f}%" if change is not None else "n/a"
+            echo(f"{name:34s} {metric:15s} {old:>10} {new:>10} {shown:>8}")
+    only = sorted(set(before) ^ set(after))
+    if only:
+        echo(f"Not in both runs: {', '.join(only)}")
+    return {"before": before_path, "after": after_path, "scenarios": rows}
+
+
+def query_plans(echo=print):
+    """The app's query plan checks against the benchmark database (run `generate` first)."""
+    from . import load_app
+    application = load_app()
+    with application.app.app_context():
+        report = application.query_plan_report()
+    for entry in report:
+        echo(f"{entry['status']:9s} {entry['query']} ({entry['table']}, {entry['rows']} rows)")
+    return {"checks": report, "failures": sum(entry["status"] == "seq_scan" for entry in report)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Tattoo parlor API benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Build the seeded synthetic dataset")
+    generate.add_argument("--scale", type=float, default=1.0, help="1.0 = 100k artists, 1M bookings, 1M piercings")
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--batch-size", type=int, default=10_000)
+    generate.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    generate.add_argument("--anchor", type=date.fromisoformat, help="Date appointments are spread around (YYYY-MM-DD)")
+
+    run = commands.add_parser("run", help="Run endpoint scenarios")
+    run.add_argument("--scenario", action="append", dest="scenarios", help="Repeatable; default is every scenario")
+    target = run.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="Benchmark a running server instead of the in-process test client")
+    target.add_argument("--gunicorn", action="store_true", help="Start gunicorn with gunicorn.conf.py for the run")
+    run.add_argument("--iterations", type=int, default=200)
+    run.add_argument("--concurrency", type=int, default=4)
+    run.add_argument("--warmup", type=int, default=10)
+    run.add_argument("--seed", type=int, default=7)
+
+    micro = commands.add_parser("micro", help="Serializer, logging and request-metrics microbenchmarks")
+    micro.add_argument("--benchmark", action="append", dest="names", help="Repeatable; default is all")
+
+    smtp = commands.add_parser("smtp", help="Per-message SMTP connections vs the pooled transport")
+    smtp.add_argument("--messages", type=int, default=500)
+    smtp.add_argument("--concurrency", type=int, default=4)
+    smtp.add_argument("--handshake-delay-ms", type=float, default=30.0,
+                      help="Simulated TLS/AUTH cost per connection (0 for none)")
+
+    commands.add_parser("plans", help="EXPLAIN the hot queries; exit 1 if any uses a sequential scan")
+
+    diff = commands.add_parser("compare", help="Compare two `run` result files")
+    diff.add_argument("before")
+    diff.add_argument("after")
+
+    for command in (generate, run, micro, smtp, commands.choices["plans"], diff):
+        command.add_argument("--output", help="Write the JSON result here instead of stdout")
+
+    args = parser.parse_args(argv)
+    log = lambda line: print(line, file=sys.stderr)
+
+    if args.command == "generate":
+        from .datagen import generate as build
+        document = build(args.scale, args.seed, args.batch_size, args.reset, args.anchor, echo=log)
+    elif args.command == "run":
+        from .scenarios import run as run_scenarios
+        document = run_scenarios(args.scenarios, args.base_url, args.iterations, args.concurrency,
+                                 args.warmup, args.seed, echo=log, gunicorn=args.gunicorn)
+    elif args.command == "micro":
+        from .micro import run as run_micro
+        document = run_micro(args.names, echo=log)
+    elif args.command == "smtp":
+        from .smtp import run as run_smtp
+        document = run_smtp(args.messages, args.concurrency, args.handshake_delay_ms, echo=log)
+    elif args.command == "plans":
+        document = query_plans(echo=log)
+    else:
+        document = compare(args.before, args.after, echo=log)
+
+    write_output(document, args.output)
+    if args.command == "plans" and document["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
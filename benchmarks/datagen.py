@@ -0,0 +1,270 @@
+"""
+Seeded synthetic dataset generator.
+
+Row counts scale linearly from FULL_COUNTS (scale=1.0: 100k artist accounts and
+artists, 1M bookings, 1M piercings). The same seed and scale always produce the same rows. Rows are written
+with batched multi-row Core INSERTs, then the rollup tables and search indexes are
+rebuilt through the app's own CLI commands so the database matches what the ORM
+write paths would have produced.
+"""
+import random
+import time
+from datetime import datetime, timedelta, time as clock
+
+from . import ADMIN_PASSWORD, ADMIN_USERNAME, load_app
+
+FULL_COUNTS = {
+    "users": 100_000,
+    "artists": 100_000,
+    "bookings": 1_000_000,
+    "piercings": 1_000_000,
+    "reviews": 500_000,
+    "gallery": 300_000,
+    "subscribers": 200_000,
+    "newsletters": 2_000,
+    "inquiries": 200_000,
+}
+SPAN_DAYS = 730  # Appointments spread over a year either side of today
+
+FIRST_NAMES = ["Ava", "Liam", "Mia", "Noah", "Zoe", "Ezra", "Luna", "Kai", "Ivy", "Owen", "Nora", "Milo",
+               "Ruby", "Jude", "Iris", "Finn", "Hazel", "Axel", "Cleo", "Rhys", "Sage", "Theo", "Wren", "Jett"]
+LAST_NAMES = ["Rivera", "Nguyen", "Okafor", "Schmidt", "Kowalski", "Haddad", "Moreau", "Tanaka", "Silva",
+              "Byrne", "Lindqvist", "Petrov", "Mensah", "Castillo", "Hughes", "Novak", "Sato", "Reyes"]
+TATTOO_STYLES = ["Traditional", "Neo-traditional", "Realism", "Blackwork", "Watercolor", "Japanese",
+                 "Tribal", "Fine line", "Geometric", "Dotwork", "Lettering", "Minimalist"]
+TATTOO_SIZES = ["Small", "Medium", "Large", "Sleeve"]
+PLACEMENTS = ["Forearm", "Upper arm", "Shoulder", "Back", "Chest", "Calf", "Thigh", "Ankle", "Wrist", "Neck"]
+PIERCING_TYPES = ["Lobe", "Helix", "Tragus", "Nostril", "Septum", "Eyebrow", "Navel", "Tongue", "Daith"]
+JEWELRY_TYPES = ["Stud", "Hoop", "Barbell", "Captive bead ring", "Labret", "Clicker"]
+STUDIOS = ["Downtown", "Riverside", "Old Town", "Harbor"]
+STATUSES = (["confirmed"] * 5) + (["completed"] * 3) + ["pending", "cancelled"]
+REVIEW_PHRASES = ["Clean lines and great aftercare advice.", "Took the time to get the design right.",
+                  "Friendly studio, would come back.", "Healed perfectly.", "Ran late but worth the wait."]
+
+
+def scaled_counts(scale):
+    return {table: max(1, int(count * scale)) for table, count in FULL_COUNTS.items()}
+
+
+def person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def phone(rng):
+    return f"555-{rng.randrange(1000):03d}-{rng.randrange(10000):04d}"
+
+
+def weekly_schedule(rng):
+    days = rng.sample(["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"], 5)
+    opening = rng.choice(["09:00", "10:00", "11:00", "12:00"])
+    closing = rng.choice(["17:00", "18:00", "20:00"])
+    return {day: f"{opening}-{closing}" for day in days}
+
+
+def user_rows(rng, count, password_hash, now):
+    """Artist accounts. They share one precomputed hash; bcrypt per row would dominate the load."""
+    for index in range(count):
+        yield {
+            "username": f"artist_{index}",
+            "email": f"artist_{index}@example.com",
+            "password_hash": password_hash,
+            "user_type": "artist",
+            "created_at": now - timedelta(days=rng.randrange(SPAN_DAYS)),
+            "last_login": now - timedelta(minutes=rng.randrange(90 * 24 * 60)) if rng.random() < 0.8 else None,
+        }
+
+
+def artist_rows(rng, count, user_ids):
+    for index in range(count):
+        name = f"{person(rng)} {index}"
+        yield {
+            "name": name,
+            "specialties": ", ".join(rng.sample(TATTOO_STYLES, 2)),
+            "bio": f"{name} has been tattooing in {rng.choice(STUDIOS)} for years.",
+            "social_media": f"@{name.lower().replace(' ', '_')}",
+            "years_of_experience": rng.randint(1, 30),
+            "styles": rng.sample(TATTOO_STYLES, 3),
+            "average_rating": 0.0,
+            "location": rng.choice(STUDIOS),
+            "profile_picture": f"https://images.example.com/artists/{index}.jpg",
+            "availability_schedule": weekly_schedule(rng),
+            "is_active": rng.random() < 0.95,
+            "created_by": user_ids[index % len(user_ids)],
+        }
+
+
+def appointment_rows(rng, kind, count, artist_ids, now):
+    """
+    Spread each artist's appointments over SPAN_DAYS on distinct days, bookings in the
+    morning and piercings in the evening, so the per-artist overlap constraints hold.
+    """
+    per_artist = -(-count // len(artist_ids))
+    stride = max(1, SPAN_DAYS // per_artist)
+    first_day = now.date() - timedelta(days=SPAN_DAYS // 2)
+
+    for k in range(count):
+        artist_id, slot = artist_ids[k % len(artist_ids)], k // len(artist_ids)
+        day = first_day + timedelta(days=slot * stride + rng.randrange(stride))
+        if kind == "booking":
+            start = datetime.combine(day, clock(rng.randint(9, 11), rng.choice((0, 15, 30, 45))))
+            minutes = rng.choice((60, 90, 120, 180))
+        else:
+            start = datetime.combine(day, clock(rng.randint(15, 19), rng.choice((0, 15, 30, 45))))
+            minutes = rng.choice((30, 45, 60))
+        row = {
+            "booking_date": start - timedelta(days=rng.randint(1, 60)),
+            "appointment_date": start,
+            "duration_minutes": minutes,
+            "appointment_end": start + timedelta(minutes=minutes),
+            "placement": rng.choice(PLACEMENTS),
+            "studio_location": rng.choice(STUDIOS),
+            "price": float(rng.randrange(40, 1200, 5)),
+            "payment_status": "paid" if start < now and rng.random() < 0.9 else "unpaid",
+            "status": rng.choice(STATUSES),
+            "name": person(rng),
+            "phone_number": phone(rng),
+            "call_or_text_preference": rng.choice(("call", "text")),
+        }
+        if kind == "booking":
+            row.update(tattoo_style=rng.choice(TATTOO_STYLES), tattoo_size=rng.choice(TATTOO_SIZES), artist_id=artist_id)
+        else:
+            row.update(piercing_type=rng.choice(PIERCING_TYPES), jewelry_type=rng.choice(JEWELRY_TYPES),
+                       artist_id=artist_id if rng.random() < 0.9 else None)
+        yield row
+
+
+def review_rows(rng, count, artist_ids, now):
+    for _ in range(count):
+        yield {
+            "artist_id": rng.choice(artist_ids),
+            "star_rating": rng.choices((1, 2, 3, 4, 5), weights=(2, 3, 10, 35, 50))[0],
+            "review_text": rng.choice(REVIEW_PHRASES),
+            "photo_url": None,
+            "created_at": now - timedelta(minutes=rng.randrange(SPAN_DAYS * 24 * 60)),
+        }
+
+
+def gallery_rows(rng, count, artist_ids, now):
+    for index in range(count):
+        yield {
+            "artist_id": rng.choice(artist_ids),
+            "image_url": f"https://images.example.com/gallery/{index}.jpg",
+            "caption": f"{rng.choice(TATTOO_STYLES)} {rng.choice(PLACEMENTS).lower()} piece",
+            "created_at": now - timedelta(minutes=rng.randrange(SPAN_DAYS * 24 * 60)),
+        }
+
+
+def subscriber_rows(rng, count, now):
+    for index in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "email": f"{first}.{last}.{index}@example.com".lower(),
+            "subscribed_at": now - timedelta(minutes=rng.randrange(SPAN_DAYS * 24 * 60)),
+            "is_active": rng.random() < 0.9,
+        }
+
+
+def newsletter_rows(rng, count, now):
+    for index in range(count):
+        yield {
+            "title": f"{rng.choice(TATTOO_STYLES)} flash day #{index}",
+            "image": None,
+            "body": "Walk-ins welcome. " * rng.randint(5, 40),
+            "created_at": now - timedelta(days=rng.randrange(SPAN_DAYS)),
+        }
+
+
+def inquiry_rows(rng, count, now):
+    for index in range(count):
+        name = person(rng)
+        yield {
+            "name": name,
+            "phone_number": phone(rng),
+            "email": f"{name.lower().replace(' ', '.')}.{index}@example.com",
+            "inquiry": f"Do you have availability for a {rng.choice(TATTOO_STYLES).lower()} piece?",
+            "submitted_at": now - timedelta(minutes=rng.randrange(SPAN_DAYS * 24 * 60)),
+            "status": rng.choice(("pending", "pending", "responded", "closed")),
+        }
+
+
+def insert_batches(db, table, rows, batch_size):
+    """Multi-row INSERTs of `batch_size` rows, one commit per batch. Returns the row count."""
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            total += len(batch)
+            batch.clear()
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def generate(scale=1.0, seed=42, batch_size=10_000, reset=False, anchor=None, echo=print):
+    """
+    Build the dataset and return a summary dict (row counts and seconds per table).
+    `anchor` is the date appointments are spread around (default today); fix it too
+    when two runs must produce byte-identical rows.
+    """
+    application = load_app()
+    app, db = application.app, application.db
+    counts = scaled_counts(scale)
+    rng = random.Random(seed)
+    now = datetime.combine(anchor or datetime.utcnow().date(), clock())
+    timings = {}
+
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+        if db.session.query(application.Artist.id).first() is not None:
+            raise SystemExit("Database already has data; pass --reset to rebuild it.")
+
+        admin = application.User(username=ADMIN_USERNAME, email=f"{ADMIN_USERNAME}@example.com", user_type="admin")
+        admin.password = ADMIN_PASSWORD
+        db.session.add(admin)
+        db.session.commit()
+
+        def load(name, table, rows):
+            started = time.perf_counter()
+            written = insert_batches(db, table, rows, batch_size)
+            timings[name] = {"rows": written, "seconds": round(time.perf_counter() - started, 2)}
+            echo(f"{name}: {written} rows in {timings[name]['seconds']}s")
+
+        load("users", application.User.__table__, user_rows(rng, counts["users"], admin.password_hash, now))
+        user_ids = list(db.session.execute(
+            db.select(application.User.id).where(application.User.user_type == "artist").order_by(application.User.id)
+        ).scalars())
+        load("artists", application.Artist.__table__, artist_rows(rng, counts["artists"], user_ids))
+        artist_ids = list(db.session.execute(
+            db.select(application.Artist.id).order_by(application.Artist.id)
+        ).scalars())
+        load("bookings", application.Booking.__table__, appointment_rows(rng, "booking", counts["bookings"], artist_ids, now))
+        load("piercings", application.Piercing.__table__, appointment_rows(rng, "piercing", counts["piercings"], artist_ids, now))
+        load("reviews", application.Review.__table__, review_rows(rng, counts["reviews"], artist_ids, now))
+        load("gallery", application.Gallery.__table__, gallery_rows(rng, counts["gallery"], artist_ids, now))
+        load("subscribers", application.Subscriber.__table__, subscriber_rows(rng, counts["subscribers"], now))
+        load("newsletters", application.Newsletter.__table__, newsletter_rows(rng, counts["newsletters"], now))
+        load("inquiries", application.Inquiry.__table__, inquiry_rows(rng, counts["inquiries"], now))
+
+        # Rollups, search indexes and version stamps, exactly as an operator would build them
+        runner = app.test_cli_runner()
+        for command in (["rebuild-metrics"], ["rebuild-daily-stats"], ["rebuild-subscription-stats"],
+                        ["create-search-indexes"]):
+            started = time.perf_counter()
+            result = runner.invoke(args=command)
+            if result.exit_code != 0:
+                raise SystemExit(f"{' '.join(command)} failed:\n{result.output}")
+            timings[command[0]] = {"seconds": round(time.perf_counter() - started, 2)}
+            echo(f"{command[0]}: {timings[command[0]]['seconds']}s")
+        application.bump_table_versions(application.VERSIONED_TABLES)
+        db.session.commit()
+
+    return {
+        "scale": scale, "seed": seed, "anchor": now.date().isoformat(),
+        "database": app.config["SQLALCHEMY_DATABASE_URI"], "tables": timings,
+    }
@@ -0,0 +1,178 @@
+"""
+Microbenchmarks for code paths too small to see through HTTP:
+
+* serializers - precompiled ModelSerializer vs sqlalchemy-serializer's SerializerMixin
+  (with the rules the models used to declare) on transient bookings, in rows/sec;
+* logging     - request-thread cost of print() to /dev/null vs the queued structured logger;
+* request_metrics - cost of the per-request latency/SQL recording hooks.
+
+No database is needed; models are built transiently.
+"""
+import contextlib
+import os
+import platform
+import time
+from datetime import datetime, timedelta
+
+from . import load_app
+
+LEGACY_SERIALIZE_RULES = {
+    "Booking": ("-artist.bookings",),
+    "Piercing": ("-artist.piercings",),
+    "Artist": ("-bookings.artist", "-reviews.artist"),
+    "Review": ("-artist.reviews",),
+    "Gallery": ("-artist.gallery",),
+}
+
+
+def timed(fn, iterations):
+    """Seconds for `iterations` calls of fn()."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return time.perf_counter() - started
+
+
+def transient_bookings(application, count, artists=50):
+    """Bookings spread over `artists` artists, each with a few reviews and gallery rows."""
+    now = datetime(2025, 6, 1, 12, 0)
+    roster = []
+    for index in range(artists):
+        artist = application.Artist(
+            id=index + 1, name=f"Artist {index}", styles=["Blackwork"], availability_schedule={},
+            average_rating=4.5, rating_count=3, rating_sum=14, star_1_count=0, star_2_count=0,
+            star_3_count=0, star_4_count=1, star_5_count=2, is_active=True, created_at=now,
+            updated_at=now, created_by=1,
+        )
+        artist.reviews = [
+            application.Review(id=index * 3 + n, artist_id=artist.id, star_rating=5, review_text="Great", created_at=now)
+            for n in range(3)
+        ]
+        artist.gallery = [
+            application.Gallery(id=index * 3 + n, artist_id=artist.id, image_url=f"https://img/{n}.jpg", caption="Piece", created_at=now)
+            for n in range(3)
+        ]
+        roster.append(artist)
+
+    bookings = []
+    for index in range(count):
+        artist = roster[index % artists]
+        bookings.append(application.Booking(
+            id=index + 1, booking_date=now, appointment_date=now + timedelta(days=index % 300),
+            tattoo_style="Blackwork", tattoo_size="Small", placement="Forearm", artist_id=artist.id,
+            studio_location="Downtown", price=150.0, payment_status="unpaid", status="pending",
+            name="Client", phone_number="555-010-0000", call_or_text_preference="text",
+            duration_minutes=60, artist=artist,
+        ))
+    return bookings
+
+
+@contextlib.contextmanager
+def legacy_serializer_mixin(application):
+    """Temporarily put SerializerMixin back on the models, with their old serialize_rules."""
+    from sqlalchemy_serializer import SerializerMixin
+
+    models = [getattr(application, name) for name in LEGACY_SERIALIZE_RULES]
+    saved = [(model, model.__bases__, model.__dict__.get("serialize_rules")) for model in models]
+    try:
+        for model in models:
+            model.__bases__ = (SerializerMixin,) + model.__bases__
+            model.serialize_rules = LEGACY_SERIALIZE_RULES[model.__name__]
+        yield SerializerMixin
+    finally:
+        for model, bases, rules in saved:
+            model.__bases__ = bases
+            if rules is None:
+                with contextlib.suppress(AttributeError):
+                    del model.serialize_rules
+            else:
+                model.serialize_rules = rules
+
+
+def bench_serializers(application, rows=10_000):
+    bookings = transient_bookings(application, rows)
+    format_datetime = application.format_datetime
+
+    current = timed(lambda: application.booking_serializer.many(bookings), 1)
+    result = {"rows": rows, "model_serializer_rows_per_second": round(rows / current)}
+
+    try:
+        with legacy_serializer_mixin(application) as mixin:
+            def legacy():
+                for booking in bookings:
+                    data = mixin.to_dict(booking)
+                    data["booking_date"] = format_datetime(booking.booking_date)
+                    data["appointment_date"] = format_datetime(booking.appointment_date)
+            legacy_seconds = timed(legacy, 1)
+        result["serializer_mixin_rows_per_second"] = round(rows / legacy_seconds)
+        result["speedup"] = round(legacy_seconds / current, 1)
+    except Exception as e:  # Missing package or a layout Python refuses to patch
+        result["serializer_mixin_skipped"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def bench_logging(application, iterations=100_000):
+    """Microseconds spent on the calling thread per record."""
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            print_seconds = timed(lambda: print(f"Unsubscribed email: client{iterations}@example.com"), iterations)
+
+        handlers = application.log_listener.handlers
+        previous = [handler.setStream(devnull) for handler in handlers]
+        dropped_before = application.log_handler.dropped
+        try:
+            log_seconds = timed(
+                lambda: application.log.info("subscriber unsubscribed", extra={"subscriber_id": iterations}), iterations
+            )
+            while not application.log_listener.queue.empty():
+                time.sleep(0.01)
+        finally:
+            for handler, stream in zip(handlers, previous):
+                handler.setStream(stream)
+
+    return {
+        "iterations": iterations,
+        "print_devnull_us": round(print_seconds / iterations * 1e6, 3),
+        "queued_logger_us": round(log_seconds / iterations * 1e6, 3),
+        "records_dropped": application.log_handler.dropped - dropped_before,
+        "note": "print() here writes to /dev/null, its cheapest case; a slow stdout pipe blocks it, the queue never does.",
+    }
+
+
+def bench_request_metrics(application, iterations=100_000, queries_per_request=5):
+    """Microseconds of recording overhead per request (with `queries_per_request` queries)."""
+    metrics = application.RequestMetrics()
+
+    def one_request():
+        metrics.begin()
+        for _ in range(queries_per_request):
+            metrics.query_started()
+            metrics.query_finished(1)
+        metrics.finish("bench", 200)
+
+    seconds = timed(one_request, iterations)
+    return {
+        "iterations": iterations,
+        "queries_per_request": queries_per_request,
+        "overhead_us_per_request": round(seconds / iterations * 1e6, 3),
+        "budget_us": 50,
+    }
+
+
+BENCHMARKS = {
+    "serializers": bench_serializers,
+    "logging": bench_logging,
+    "request_metrics": bench_request_metrics,
+}
+
+
+def run(names=None, echo=print):
+    application = load_app()
+    results = {}
+    for name in names or BENCHMARKS:
+        results[name] = BENCHMARKS[name](application)
+        echo(f"{name}: {results[name]}")
+    return {
+        "meta": {"kind": "micro", "python": platform.python_version(), "started_at": datetime.utcnow().isoformat() + "Z"},
+        "results": results,
+    }
@@ -0,0 +1,378 @@
+"""
+Scenario runner: drives the hot endpoints through the Flask test client (in-process)
+or a real server (`--base-url`, or `--gunicorn` to start one with the repo's
+gunicorn.conf.py) and reports throughput and latency percentiles per scenario.
+
+Each scenario is one kind of request repeated `iterations` times across `concurrency`
+threads after `warmup` untimed calls. Some scenarios exist in pairs so a run shows a
+before/after directly: offset vs cursor paging at page 1000, full vs conditional
+artist listings, single vs bulk booking creation, and the artist listing alone vs
+during a sign-in storm.
+"""
+import http.client
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import runpy
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from . import ADMIN_PASSWORD, ADMIN_USERNAME, BENCH_DIR, load_app
+
+REPO_DIR = os.path.dirname(BENCH_DIR)
+GUNICORN_CONF = os.path.join(REPO_DIR, "gunicorn.conf.py")
+APPOINTMENT_FORMAT = "%A, %B %d, %Y %I:%M %p"
+SEARCH_TERMS = ["Rivera", "Nguyen", "ava", "Sato", "lia", "Castillo", "Milo", "wren", "Okafor", "hug"]
+
+
+class TestClientTransport:
+    """In-process requests through Flask's test client (one client per thread)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+        self.name = "flask-test-client"
+
+    def request(self, method, path, body=None, headers=None):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body, headers=headers or {})
+        return response.status_code, response.headers, response.get_data()
+
+
+class HTTPTransport:
+    """Keep-alive HTTP/1.1 requests against a running server (one connection per thread)."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.local = threading.local()
+        self.name = base_url
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        for attempt in (1, 2):
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                connection = self.local.connection = self.connection_class(self.host, self.port, timeout=60)
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.headers, response.read()
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                self.local.connection = None
+                if attempt == 2:
+                    raise
+
+
+@contextmanager
+def gunicorn_server(startup_timeout=60):
+    """
+    gunicorn serving the app with gunicorn.conf.py on a free local port; yields
+    (base_url, settings). The server inherits DATABASE_URI and the other settings.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    conf = runpy.run_path(GUNICORN_CONF)
+    settings = {"server": "gunicorn", "worker_class": conf["worker_class"], "workers": conf["workers"], "threads": conf["threads"]}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", GUNICORN_CONF, "--bind", f"127.0.0.1:{port}", "app:app"],
+        cwd=REPO_DIR,
+    )
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise SystemExit(f"gunicorn exited with status {process.returncode} before accepting connections.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"gunicorn did not accept connections within {startup_timeout}s.")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}", settings
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, seconds, ok_statuses, rows_per_call=1):
+    latencies = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    errors = sum(count for status, count in statuses.items() if status not in ok_statuses)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(len(latencies) / seconds, 2) if seconds else None,
+        "rows_per_second": round(len(latencies) * rows_per_call / seconds, 2) if seconds else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+
+def measure(transport, step, ctx, iterations, concurrency, warmup, seed):
+    """Run `step` iterations times over `concurrency` threads; returns (latencies, statuses, seconds)."""
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        step(transport, ctx, rng)
+
+    latencies, statuses, lock = [], {}, threading.Lock()
+    share = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+
+    def worker(count, worker_seed):
+        local_rng = random.Random(worker_seed)
+        local_latencies, local_statuses = [], {}
+        for _ in range(count):
+            started = time.perf_counter()
+            status = step(transport, ctx, local_rng)
+            local_latencies.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count_ in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count_
+
+    threads = [threading.Thread(target=worker, args=(count, seed + index + 1)) for index, count in enumerate(share)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+# --- context -------------------------------------------------------------------------------
+
+def build_context(application, transport, seed):
+    """Ids, tokens and validators the scenarios need, read from the database and the API."""
+    app, db = application.app, application.db
+    rng = random.Random(seed)
+    with app.app_context():
+        artist_ids = list(db.session.execute(
+            db.select(application.Artist.id).where(application.Artist.is_active == True)
+            .order_by(application.Artist.id).limit(20_000)
+        ).scalars())
+        if not artist_ids:
+            raise SystemExit("No artists found; run `python -m benchmarks generate` first.")
+        boundary = db.session.execute(
+            db.select(application.Booking.id).order_by(application.Booking.id).offset(999 * 10 - 1).limit(1)
+        ).scalar()
+
+    status, _, body = transport.request("POST", "/api/signin", {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    if status != 200:
+        raise SystemExit(f"Admin sign-in failed ({status}); was the dataset generated by this package?")
+    token = json.loads(body)["token"]
+
+    status, headers, _ = transport.request("GET", "/api/artists?page=1&per_page=20", headers={"Authorization": f"Bearer {token}"})
+    return SimpleNamespace(
+        artist_ids=rng.sample(artist_ids, min(len(artist_ids), 2000)),
+        auth={"Authorization": f"Bearer {token}"},
+        artists_etag=headers.get("ETag"),
+        page_1000_cursor=application.encode_cursor("bookings", SimpleNamespace(id=boundary), "id", "next") if boundary else None,
+        # Far enough out that created bookings never collide with generated ones
+        slot_base=datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=3 * 365),
+        slots=itertools.count(),
+    )
+
+
+def next_slot(ctx):
+    """A unique two-hour slot; consecutive slots never overlap for any artist."""
+    return (ctx.slot_base + timedelta(hours=2 * next(ctx.slots))).strftime(APPOINTMENT_FORMAT)
+
+
+def booking_payload(ctx, rng):
+    return {
+        "tattoo_style": "Blackwork", "tattoo_size": "Small", "placement": "Forearm",
+        "artist_id": rng.choice(ctx.artist_ids), "studio_location": "Downtown",
+        "appointment_date": next_slot(ctx), "price": 150, "name": "Bench Client",
+        "phone_number": "555-010-0000", "call_or_text_preference": "text",
+    }
+
+
+# --- scenarios -----------------------------------------------------------------------------
+
+BULK_SIZE = 100
+
+
+def get(path_fn, auth=True, extra_headers=None):
+    def step(transport, ctx, rng):
+        headers = dict(ctx.auth) if auth else {}
+        if extra_headers:
+            headers.update(extra_headers(ctx))
+        return transport.request("GET", path_fn(ctx, rng), headers=headers)[0]
+    return step
+
+
+def post(path_fn, body_fn, auth=False):
+    def step(transport, ctx, rng):
+        return transport.request("POST", path_fn(ctx, rng), body_fn(ctx, rng), headers=ctx.auth if auth else None)[0]
+    return step
+
+
+SCENARIOS = {
+    # name: (step, ok statuses, rows per call)
+    "artists_list": (get(lambda ctx, rng: f"/api/artists?page={rng.randint(1, 50)}&per_page=20", auth=False), {200}, 1),
+    "artists_list_repeat_visit": (
+        get(lambda ctx, rng: "/api/artists?page=1&per_page=20", auth=False,
+            extra_headers=lambda ctx: {"If-None-Match": ctx.artists_etag} if ctx.artists_etag else {}),
+        {200, 304}, 1,
+    ),
+    "artists_list_repeat_visit_full": (get(lambda ctx, rng: "/api/artists?page=1&per_page=20", auth=False), {200}, 1),
+    "artist_profile": (get(lambda ctx, rng: f"/api/artists/{rng.choice(ctx.artist_ids)}", auth=False), {200}, 1),
+    "artist_gallery": (get(lambda ctx, rng: f"/api/artists/{rng.choice(ctx.artist_ids)}/gallery", auth=False), {200, 404}, 1),
+    "galleries": (get(lambda ctx, rng: f"/api/galleries?page={rng.randint(1, 50)}", auth=False), {200}, 1),
+    "bookings_offset_page_1000": (get(lambda ctx, rng: "/api/bookings?page=1000&per_page=10", auth=False), {200}, 1),
+    "bookings_cursor_page_1000": (
+        get(lambda ctx, rng: f"/api/bookings?per_page=10&cursor={ctx.page_1000_cursor}", auth=False), {200}, 1
+    ),
+    "search_bookings": (get(lambda ctx, rng: f"/api/bookings/search?name={rng.choice(SEARCH_TERMS)}", auth=False), {200, 404}, 1),
+    "search_piercings": (get(lambda ctx, rng: f"/api/piercings/search?name={rng.choice(SEARCH_TERMS)}", auth=False), {200, 404}, 1),
+    "search_appointments": (
+        get(lambda ctx, rng: f"/api/appointments/search?name={rng.choice(SEARCH_TERMS)}", auth=False), {200}, 1
+    ),
+    "search_artists": (get(lambda ctx, rng: f"/api/artists/search?name={rng.choice(SEARCH_TERMS)}"), {200, 404}, 1),
+    "availability_search": (
+        get(lambda ctx, rng: "/api/availability/search?start_date={0}&end_date={1}&from=12:00&to=18:00".format(
+            (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
+            (datetime.utcnow() + timedelta(days=7)).strftime("%Y-%m-%d"),
+        ), auth=False), {200}, 1,
+    ),
+    "admin_dashboard": (get(lambda ctx, rng: "/api/admin-dashboard"), {200}, 1),
+    "admin_trends": (get(lambda ctx, rng: "/api/admin-dashboard/trends?granularity=week"), {200}, 1),
+    "subscriber_metrics": (get(lambda ctx, rng: "/api/metrics/subscribers", auth=False), {200}, 1),
+    "create_review": (
+        post(lambda ctx, rng: f"/api/artists/{rng.choice(ctx.artist_ids)}/reviews",
+             lambda ctx, rng: {"star_rating": rng.randint(1, 5), "review_text": "Benchmark review"}),
+        {201}, 1,
+    ),
+    "create_booking": (post(lambda ctx, rng: "/api/bookings", booking_payload), {201}, 1),
+    "create_bookings_bulk": (
+        post(lambda ctx, rng: "/api/bookings/bulk",
+             lambda ctx, rng: [booking_payload(ctx, rng) for _ in range(BULK_SIZE)], auth=True),
+        {201}, BULK_SIZE,
+    ),
+}
+DEFAULT_SCENARIOS = list(SCENARIOS) + ["artists_list_during_login_storm"]
+
+
+def login_storm(transport, ctx, iterations, concurrency, warmup, seed, storm_threads=8):
+    """
+    The artist listing measured while `storm_threads` threads sign in back to back,
+    to show whether bcrypt work stalls unrelated requests. Sign-ins hold their request
+    thread while bcrypt runs, so run it against a threaded server (`--gunicorn` uses the
+    gthread settings from gunicorn.conf.py); the test client gives every caller its own thread.
+    """
+    stop, lock = threading.Event(), threading.Lock()
+    storm_statuses = {}
+
+    def storm():
+        while not stop.is_set():
+            status = transport.request("POST", "/api/signin", {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})[0]
+            with lock:
+                storm_statuses[status] = storm_statuses.get(status, 0) + 1
+
+    threads = [threading.Thread(target=storm, daemon=True) for _ in range(storm_threads)]
+    for thread in threads:
+        thread.start()
+    try:
+        step = SCENARIOS["artists_list"][0]
+        latencies, statuses, seconds = measure(transport, step, ctx, iterations, concurrency, warmup, seed)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    result = summarize(latencies, statuses, seconds, {200})
+    result["signin_statuses"] = {str(status): count for status, count in sorted(storm_statuses.items())}
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios=None, base_url=None, iterations=200, concurrency=4, warmup=10, seed=7, echo=print, gunicorn=False):
+    """
+    Run the named scenarios (default: all) and return the results document. With
+    `gunicorn`, a server is started from gunicorn.conf.py for the run and its worker
+    settings are recorded under meta.server.
+    """
+    application = load_app()
+    if not gunicorn:
+        server = {"server": base_url} if base_url else {"server": "flask-test-client", "threads": "one per caller"}
+        transport = HTTPTransport(base_url) if base_url else TestClientTransport(application.app)
+        return run_with(application, transport, server, scenarios, iterations, concurrency, warmup, seed, echo)
+    with gunicorn_server() as (url, server):
+        echo(f"gunicorn at {url}: {server['workers']} x {server['worker_class']} worker(s), {server['threads']} threads each")
+        return run_with(application, HTTPTransport(url), server, scenarios, iterations, concurrency, warmup, seed, echo)
+
+
+def run_with(application, transport, server, scenarios, iterations, concurrency, warmup, seed, echo):
+    ctx = build_context(application, transport, seed)
+
+    results = {}
+    for name in scenarios or DEFAULT_SCENARIOS:
+        if name == "artists_list_during_login_storm":
+            results[name] = login_storm(transport, ctx, iterations, concurrency, warmup, seed)
+        elif name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name}. Choose from {', '.join(DEFAULT_SCENARIOS)}.")
+        else:
+            step, ok_statuses, rows_per_call = SCENARIOS[name]
+            latencies, statuses, seconds = measure(transport, step, ctx, iterations, concurrency, warmup, seed)
+            results[name] = summarize(latencies, statuses, seconds, ok_statuses, rows_per_call)
+        summary = results[name]
+        echo(f"{name:34s} {summary['throughput_rps']:>9} req/s  p50 {summary['p50_ms']} ms  "
+             f"p95 {summary['p95_ms']} ms  p99 {summary['p99_ms']} ms  errors {summary['errors']}")
+
+    return {
+        "meta": {
+            "kind": "scenarios",
+            "transport": transport.name,
+            "server": server,
+            "database": application.app.config["SQLALCHEMY_DATABASE_URI"].split("@")[-1],
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "seed": seed,
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "started_at": datetime.utcnow().isoformat() + "Z",
+        },
+        "results": results,
+    }
@@ -0,0 +1,163 @@
+"""
+SMTP throughput: a fresh connection per message (what send_email used to do) vs the
+pooled SMTPTransport, against a local sink server.
+
+The sink accepts everything and sleeps `handshake_delay_ms` on EHLO to stand in for
+the TLS handshake and AUTH round trips a real provider costs; pass 0 to measure the
+raw local path.
+"""
+import os
+import platform
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from email.mime.text import MIMEText
+
+from . import load_app
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, NOOP, RSET, QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(line + b"\r\n")
+
+    def handle(self):
+        self.reply(b"220 bench-sink ESMTP")
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line.rstrip(b"\r\n") == b".":
+                    in_data = False
+                    self.server.record_message()
+                    self.reply(b"250 OK queued")
+                continue
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                time.sleep(self.server.handshake_delay)
+                self.reply(b"250-bench-sink")
+                self.reply(b"250 8BITMIME")
+            elif command == b"DATA":
+                in_data = True
+                self.reply(b"354 End data with <CR><LF>.<CR><LF>")
+            elif command == b"QUIT":
+                self.reply(b"221 Bye")
+                return
+            elif command in (b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                self.reply(b"250 OK")
+            else:
+                self.reply(b"502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay):
+        super().__init__(("127.0.0.1", 0), SMTPSinkHandler)
+        self.handshake_delay = handshake_delay
+        self.messages = 0
+        self.lock = threading.Lock()
+
+    def record_message(self):
+        with self.lock:
+            self.messages += 1
+
+
+@contextmanager
+def sink_environment(port):
+    """Point the app's SMTP settings at the sink for the duration of the run."""
+    overrides = {
+        "EMAIL_ADDRESS": "bench@example.com", "SMTP_SERVER": "127.0.0.1", "SMTP_PORT": str(port),
+        "SMTP_STARTTLS": "false", "EMAIL_PASSWORD": None,
+    }
+    saved = {key: os.environ.get(key) for key in overrides}
+    try:
+        for key, value in overrides.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def send_all(send, messages, concurrency):
+    """Send `messages` messages over `concurrency` threads; returns elapsed seconds."""
+    counter = iter(range(messages))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            msg = MIMEText(f"Benchmark message {index}")
+            msg["From"], msg["To"], msg["Subject"] = "bench@example.com", f"client{index}@example.com", "Benchmark"
+            send(msg)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def run(messages=500, concurrency=4, handshake_delay_ms=30.0, echo=print):
+    application = load_app()
+    sink = SMTPSink(handshake_delay_ms / 1000)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    results = {}
+
+    try:
+        with sink_environment(sink.server_address[1]):
+            def per_message(msg):
+                server = application.open_smtp_connection(application.smtp_settings())
+                try:
+                    server.send_message(msg)
+                finally:
+                    server.quit()
+
+            seconds = send_all(per_message, messages, concurrency)
+            results["connection_per_message"] = {
+                "messages_per_second": round(messages / seconds, 2), "handshakes": messages, "seconds": round(seconds, 3),
+            }
+
+            transport = application.SMTPTransport(max_connections=concurrency)
+            seconds = send_all(transport.send, messages, concurrency)
+            stats = transport.stats()
+            transport.close_all()
+            results["pooled_transport"] = {
+                "messages_per_second": round(messages / seconds, 2), "seconds": round(seconds, 3), "transport": stats,
+            }
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+    results["speedup"] = round(
+        results["pooled_transport"]["messages_per_second"] / results["connection_per_message"]["messages_per_second"], 1
+    )
+    results["messages_received"] = sink.messages
+    echo(f"per-message: {results['connection_per_message']['messages_per_second']} msg/s, "
+         f"pooled: {results['pooled_transport']['messages_per_second']} msg/s ({results['speedup']}x)")
+    return {
+        "meta": {
+            "kind": "smtp", "messages": messages, "concurrency": concurrency,
+            "handshake_delay_ms": handshake_delay_ms, "python": platform.python_version(),
+            "started_at": datetime.utcnow().isoformat() + "Z",
+        },
+        "results": results,
+    }
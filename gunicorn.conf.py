@@ -0,0 +1,23 @@
+"""
+gunicorn settings, picked up automatically when gunicorn starts from this directory.
+
+Sign-in, sign-up and password changes wait on bcrypt (see PasswordHasher in app.py).
+The wait holds the request's thread, so other requests on that worker are only served
+when it has spare threads: gthread with two or more. The sync worker serves one request
+at a time, and under gevent the hashing pool's threads become greenlets that block the
+hub while bcrypt runs, so both are refused.
+"""
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+
+
+def on_starting(server):
+    worker_class, threads = server.cfg.worker_class_str, server.cfg.threads
+    if worker_class != "gthread" or threads < 2:
+        raise SystemExit(
+            f"Worker class {worker_class} with {threads} thread(s) lets a sign-in burst stall every other "
+            f"request. Run the gthread worker with --threads 2 or more."
+        )
@@ -0,0 +1,138 @@
+"""Baseline schema: the tables the app had before migrations were tracked
+
+Revision ID: 0a4c2e9d5b17
+Revises:
+Create Date: 2026-10-18 08:00:00
+
+Creates the original tables on an empty database. Databases that predate migrations
+already have them, so each table is only created when it is missing and
+`flask db upgrade` brings both kinds of database to the same schema.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a4c2e9d5b17'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# In foreign key order
+TABLES = [
+    ('users', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('username', sa.String(length=50), nullable=False, unique=True),
+        sa.Column('email', sa.String(length=255), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('user_type', sa.String(length=50), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+    ]),
+    ('artists', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(length=100), nullable=False, index=True),
+        sa.Column('specialties', sa.String(length=200), nullable=True),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('social_media', sa.Text(), nullable=True),
+        sa.Column('years_of_experience', sa.Integer(), nullable=True),
+        sa.Column('styles', sa.JSON(), nullable=True),
+        sa.Column('average_rating', sa.Float(), nullable=True),
+        sa.Column('location', sa.String(length=100), nullable=True),
+        sa.Column('profile_picture', sa.String(length=255), nullable=True),
+        sa.Column('availability_schedule', sa.JSON(), nullable=True),
+        sa.Column('certifications', sa.Text(), nullable=True),
+        sa.Column('awards', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+    ]),
+    ('bookings', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('booking_date', sa.DateTime(), nullable=False),
+        sa.Column('appointment_date', sa.DateTime(), nullable=False),
+        sa.Column('tattoo_style', sa.String(length=50), nullable=False),
+        sa.Column('tattoo_size', sa.String(length=50), nullable=False),
+        sa.Column('placement', sa.String(length=50), nullable=False),
+        sa.Column('artist_id', sa.Integer(), sa.ForeignKey('artists.id', name='fk_booking_artist'), nullable=False),
+        sa.Column('studio_location', sa.String(length=100), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('payment_status', sa.String(length=20), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('phone_number', sa.String(length=15), nullable=False),
+        sa.Column('call_or_text_preference', sa.String(length=10), nullable=False),
+    ]),
+    ('piercings', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('booking_date', sa.DateTime(), nullable=False),
+        sa.Column('appointment_date', sa.DateTime(), nullable=False),
+        sa.Column('piercing_type', sa.String(length=50), nullable=False),
+        sa.Column('jewelry_type', sa.String(length=50), nullable=False),
+        sa.Column('placement', sa.String(length=50), nullable=False),
+        sa.Column('artist_id', sa.Integer(), sa.ForeignKey('artists.id', name='fk_piercing_artist'), nullable=True),
+        sa.Column('studio_location', sa.String(length=100), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('payment_status', sa.String(length=20), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('phone_number', sa.String(length=15), nullable=False),
+        sa.Column('call_or_text_preference', sa.String(length=10), nullable=False),
+    ]),
+    ('reviews', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('artist_id', sa.Integer(), sa.ForeignKey('artists.id'), nullable=False),
+        sa.Column('star_rating', sa.Integer(), nullable=False),
+        sa.Column('review_text', sa.Text(), nullable=True),
+        sa.Column('photo_url', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    ]),
+    ('gallery', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('artist_id', sa.Integer(), sa.ForeignKey('artists.id', name='fk_gallery_artist'), nullable=False),
+        sa.Column('image_url', sa.String(length=255), nullable=False),
+        sa.Column('caption', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    ]),
+    ('inquiries', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('phone_number', sa.String(length=15), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('inquiry', sa.Text(), nullable=False),
+        sa.Column('submitted_at', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+    ]),
+    ('global_settings', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('key', sa.String(length=50), nullable=False, unique=True),
+        sa.Column('value', sa.String(length=50), nullable=False),
+    ]),
+    ('newsletters', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('image', sa.String(length=255), nullable=True),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    ]),
+    ('subscribers', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('subscribed_at', sa.DateTime(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+    ]),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, columns in TABLES:
+        if not inspector.has_table(name):
+            op.create_table(name, *columns())
+
+
+def downgrade():
+    for name, _ in reversed(TABLES):
+        op.drop_table(name)
@@ -0,0 +1,56 @@
+"""Add indexes for the hot filter columns
+
+Revision ID: 3f2a9c1d7b10
+Revises: 9d2b4f6e1c38
+Create Date: 2026-10-18 09:00:00
+
+Skips indexes that already exist (e.g. on a database built by db.create_all). On
+PostgreSQL the indexes are built CONCURRENTLY, outside a transaction, so bookings and
+reviews keep accepting writes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b10'
+down_revision = '9d2b4f6e1c38'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_bookings_artist_appointment', 'bookings', ['artist_id', 'appointment_date']),
+    ('ix_piercings_artist_appointment', 'piercings', ['artist_id', 'appointment_date']),
+    ('ix_reviews_artist_created_at', 'reviews', ['artist_id', 'created_at']),
+    ('ix_gallery_artist_created_at', 'gallery', ['artist_id', 'created_at']),
+    ('ix_inquiries_submitted_at', 'inquiries', ['submitted_at']),
+    ('ix_artists_created_by', 'artists', ['created_by']),
+    ('ix_users_last_login', 'users', ['last_login']),
+]
+
+
+def existing_indexes():
+    inspector = sa.inspect(op.get_bind())
+    return {
+        index['name']
+        for table in {table for _, table, _ in INDEXES}
+        for index in inspector.get_indexes(table)
+    }
+
+
+def upgrade():
+    existing = existing_indexes()
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in existing:
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    existing = existing_indexes()
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            if name in existing:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
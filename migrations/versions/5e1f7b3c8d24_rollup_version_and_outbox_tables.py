@@ -0,0 +1,208 @@
+"""Add the rollup, table version, subscription event and email outbox tables
+
+Revision ID: 5e1f7b3c8d24
+Revises: 0a4c2e9d5b17
+Create Date: 2026-10-18 08:30:00
+
+Tables that already exist (e.g. on a database built by db.create_all) are left alone.
+The rollups and the subscription event log are backfilled from the source tables
+when they are created, the same way the `flask rebuild-*` commands compute them.
+
+"""
+from collections import defaultdict
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1f7b3c8d24'
+down_revision = '0a4c2e9d5b17'
+branch_labels = None
+depends_on = None
+
+APPOINTMENT_FIELDS = ('bookings_count', 'piercings_count', 'bookings_earnings', 'piercings_earnings')
+PLATFORM_METRICS_ID = 1
+
+bookings = sa.table('bookings', sa.column('artist_id', sa.Integer), sa.column('appointment_date', sa.DateTime), sa.column('price', sa.Float))
+piercings = sa.table('piercings', sa.column('artist_id', sa.Integer), sa.column('appointment_date', sa.DateTime), sa.column('price', sa.Float))
+reviews = sa.table('reviews', sa.column('star_rating', sa.Integer))
+artists = sa.table('artists', sa.column('id', sa.Integer))
+subscribers = sa.table('subscribers', sa.column('id', sa.Integer), sa.column('subscribed_at', sa.DateTime))
+
+
+def counter(name, type_=sa.Integer):
+    return sa.Column(name, type_(), nullable=False)
+
+
+def appointment_counters():
+    return [
+        counter('bookings_count'), counter('piercings_count'),
+        counter('bookings_earnings', sa.Float), counter('piercings_earnings', sa.Float),
+    ]
+
+
+# In foreign key order
+TABLES = [
+    ('table_versions', lambda: [
+        sa.Column('table_name', sa.String(length=50), primary_key=True),
+        counter('version'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    ]),
+    ('artist_metrics', lambda: [
+        sa.Column('artist_id', sa.Integer(), sa.ForeignKey('artists.id', name='fk_metrics_artist', ondelete='CASCADE'), primary_key=True),
+        *appointment_counters(),
+    ]),
+    ('platform_metrics', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        *appointment_counters(),
+        counter('reviews_count'), counter('rating_sum'),
+    ]),
+    ('daily_appointment_stats', lambda: [
+        sa.Column('day', sa.Date(), primary_key=True),
+        *appointment_counters(),
+    ]),
+    ('subscription_events', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('subscriber_id', sa.Integer(), sa.ForeignKey('subscribers.id', ondelete='SET NULL'), nullable=True, index=True),
+        sa.Column('event_type', sa.String(length=20), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False, index=True),
+    ]),
+    ('subscriber_monthly_stats', lambda: [
+        sa.Column('month', sa.Date(), primary_key=True),
+        counter('subscribe_count'), counter('reactivate_count'), counter('unsubscribe_count'),
+    ]),
+    ('email_jobs', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.String(length=30), nullable=False),
+        sa.Column('newsletter_id', sa.Integer(), sa.ForeignKey('newsletters.id', name='fk_email_job_newsletter', ondelete='SET NULL'), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        counter('total'), counter('sent'), counter('failed'),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    ]),
+    ('email_outbox', lambda: [
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('email_jobs.id', name='fk_outbox_job', ondelete='CASCADE'), nullable=False, index=True),
+        sa.Column('recipient', sa.String(length=255), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        counter('attempts'),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    ]),
+]
+
+
+def calendar_day(bind, column):
+    if bind.dialect.name == 'postgresql':
+        return sa.cast(column, sa.Date)
+    return sa.func.date(column)
+
+
+def calendar_month(bind, column):
+    if bind.dialect.name == 'postgresql':
+        return sa.cast(sa.func.date_trunc('month', column), sa.Date)
+    return sa.func.date(column, 'start of month')
+
+
+def as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def appointment_totals(bind, group_by=None):
+    """{key: {field: value}} from bookings and piercings, grouped by `group_by(table)` (or in total)."""
+    totals = defaultdict(lambda: dict.fromkeys(APPOINTMENT_FIELDS, 0))
+    for kind, table in (('bookings', bookings), ('piercings', piercings)):
+        aggregates = (sa.func.count(), sa.func.coalesce(sa.func.sum(table.c.price), 0))
+        if group_by is None:
+            query = sa.select(sa.null(), *aggregates)
+        else:
+            key = group_by(table)
+            query = sa.select(key, *aggregates).group_by(key)
+        rows = bind.execute(query).all()
+        for value, count, earnings in rows:
+            totals[value][f'{kind}_count'] = count
+            totals[value][f'{kind}_earnings'] = earnings
+    return totals
+
+
+def backfill_artist_metrics(bind):
+    per_artist = appointment_totals(bind, lambda table: table.c.artist_id)
+    artist_ids = bind.execute(sa.select(artists.c.id)).scalars().all()
+    rows = [{'artist_id': artist_id, **per_artist[artist_id]} for artist_id in artist_ids]
+    if rows:
+        op.bulk_insert(sa.table('artist_metrics', *[sa.column(name) for name in rows[0]]), rows)
+
+
+def backfill_platform_metrics(bind):
+    totals = appointment_totals(bind)[None]
+    reviews_count, rating_sum = bind.execute(
+        sa.select(sa.func.count(), sa.func.coalesce(sa.func.sum(reviews.c.star_rating), 0))
+    ).one()
+    row = {'id': PLATFORM_METRICS_ID, **totals, 'reviews_count': reviews_count, 'rating_sum': rating_sum}
+    op.bulk_insert(sa.table('platform_metrics', *[sa.column(name) for name in row]), [row])
+
+
+def backfill_daily_stats(bind):
+    per_day = appointment_totals(bind, lambda table: calendar_day(bind, table.c.appointment_date))
+    rows = [{'day': as_date(day), **fields} for day, fields in per_day.items() if day is not None]
+    if rows:
+        op.bulk_insert(
+            sa.table('daily_appointment_stats', sa.column('day', sa.Date), *[sa.column(name) for name in APPOINTMENT_FIELDS]),
+            rows,
+        )
+
+
+def backfill_subscription_events(bind):
+    # Subscribers that predate the event log get a subscribe event; earlier unsubscribes have no date
+    bind.execute(
+        sa.table('subscription_events', sa.column('subscriber_id'), sa.column('event_type'), sa.column('occurred_at')).insert()
+        .from_select(
+            ['subscriber_id', 'event_type', 'occurred_at'],
+            sa.select(subscribers.c.id, sa.literal('subscribe'), subscribers.c.subscribed_at),
+        )
+    )
+
+
+def backfill_subscriber_monthly_stats(bind):
+    month = calendar_month(bind, subscribers.c.subscribed_at)
+    rows = [
+        {'month': as_date(value), 'subscribe_count': count, 'reactivate_count': 0, 'unsubscribe_count': 0}
+        for value, count in bind.execute(sa.select(month, sa.func.count()).group_by(month)).all()
+    ]
+    if rows:
+        op.bulk_insert(
+            sa.table('subscriber_monthly_stats', sa.column('month', sa.Date), sa.column('subscribe_count'),
+                     sa.column('reactivate_count'), sa.column('unsubscribe_count')),
+            rows,
+        )
+
+
+BACKFILLS = {
+    'artist_metrics': backfill_artist_metrics,
+    'platform_metrics': backfill_platform_metrics,
+    'daily_appointment_stats': backfill_daily_stats,
+    'subscription_events': backfill_subscription_events,
+    'subscriber_monthly_stats': backfill_subscriber_monthly_stats,
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for name, columns in TABLES:
+        if inspector.has_table(name):
+            continue
+        op.create_table(name, *columns())
+        if name in BACKFILLS:
+            BACKFILLS[name](bind)
+
+
+def downgrade():
+    for name, _ in reversed(TABLES):
+        op.drop_table(name)
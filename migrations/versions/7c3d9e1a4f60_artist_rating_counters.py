@@ -0,0 +1,58 @@
+"""Add artist rating counters and backfill them from reviews
+
+Revision ID: 7c3d9e1a4f60
+Revises: 5e1f7b3c8d24
+Create Date: 2026-10-18 08:45:00
+
+The counters are filled with one grouped UPDATE ... FROM over reviews, and
+average_rating is recomputed from them so both agree from the start.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3d9e1a4f60'
+down_revision = '5e1f7b3c8d24'
+branch_labels = None
+depends_on = None
+
+STAR_COLUMNS = [f'star_{stars}_count' for stars in range(1, 6)]
+COLUMNS = ['rating_count', 'rating_sum'] + STAR_COLUMNS
+
+artists = sa.table('artists', sa.column('id', sa.Integer), sa.column('average_rating', sa.Float), *[sa.column(name, sa.Integer) for name in COLUMNS])
+reviews = sa.table('reviews', sa.column('artist_id', sa.Integer), sa.column('star_rating', sa.Integer))
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('artists')}
+    missing = [name for name in COLUMNS if name not in existing]
+    if not missing:
+        return
+    for name in missing:
+        op.add_column('artists', sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
+
+    totals = sa.select(
+        reviews.c.artist_id,
+        sa.func.count().label('rating_count'),
+        sa.func.sum(reviews.c.star_rating).label('rating_sum'),
+        *[
+            sa.func.sum(sa.case((reviews.c.star_rating == stars, 1), else_=0)).label(f'star_{stars}_count')
+            for stars in range(1, 6)
+        ],
+    ).group_by(reviews.c.artist_id).subquery()
+    op.execute(
+        artists.update()
+        .where(artists.c.id == totals.c.artist_id)
+        .values(
+            average_rating=totals.c.rating_sum * 1.0 / totals.c.rating_count,
+            **{name: totals.c[name] for name in COLUMNS},
+        )
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('artists') as batch:
+        for name in reversed(COLUMNS):
+            batch.drop_column(name)
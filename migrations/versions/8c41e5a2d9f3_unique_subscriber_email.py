@@ -0,0 +1,83 @@
+"""Normalize subscriber emails and make lower(email) unique
+
+Revision ID: 8c41e5a2d9f3
+Revises: 3f2a9c1d7b10
+Create Date: 2026-10-18 10:00:00
+
+Rows whose emails differ only by case or surrounding whitespace are folded into the
+oldest one (active if any of them was, subscription events repointed) before the
+unique index is built, so the index build cannot fail on existing duplicates.
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41e5a2d9f3'
+down_revision = '3f2a9c1d7b10'
+branch_labels = None
+depends_on = None
+
+subscribers = sa.table(
+    'subscribers',
+    sa.column('id', sa.Integer), sa.column('email', sa.String),
+    sa.column('subscribed_at', sa.DateTime), sa.column('is_active', sa.Boolean),
+)
+subscription_events = sa.table('subscription_events', sa.column('subscriber_id', sa.Integer))
+
+
+def index_exists(bind, name):
+    # Expression indexes are not reflected on every dialect, so ask the catalog directly
+    if bind.dialect.name == 'postgresql':
+        query = "SELECT 1 FROM pg_indexes WHERE indexname = :name"
+    else:
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"
+    return bind.execute(sa.text(query), {'name': name}).first() is not None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if index_exists(bind, 'uq_subscribers_email_lower'):  # Built by db.create_all
+        return
+    has_events = sa.inspect(bind).has_table('subscription_events')
+
+    groups = defaultdict(list)
+    rows = bind.execute(
+        sa.select(subscribers.c.id, subscribers.c.email, subscribers.c.is_active)
+        .order_by(subscribers.c.subscribed_at, subscribers.c.id)
+    ).all()
+    for row in rows:
+        groups[row.email.strip().lower()].append(row)
+
+    for email, (keep, *duplicates) in groups.items():
+        if duplicates:
+            duplicate_ids = [row.id for row in duplicates]
+            if has_events:
+                bind.execute(
+                    subscription_events.update()
+                    .where(subscription_events.c.subscriber_id.in_(duplicate_ids))
+                    .values(subscriber_id=keep.id)
+                )
+            bind.execute(subscribers.delete().where(subscribers.c.id.in_(duplicate_ids)))
+        is_active = any(row.is_active for row in (keep, *duplicates))
+        if email != keep.email or is_active != keep.is_active:
+            bind.execute(
+                subscribers.update().where(subscribers.c.id == keep.id).values(email=email, is_active=is_active)
+            )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_subscribers_email_lower', 'subscribers', [sa.text('lower(email)')],
+            unique=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    if not index_exists(op.get_bind(), 'uq_subscribers_email_lower'):
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_subscribers_email_lower', table_name='subscribers', postgresql_concurrently=True)
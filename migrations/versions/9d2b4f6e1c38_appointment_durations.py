@@ -0,0 +1,101 @@
+"""Add appointment durations, backfill appointment_end and add the overlap constraints
+
+Revision ID: 9d2b4f6e1c38
+Revises: 7c3d9e1a4f60
+Create Date: 2026-10-18 08:50:00
+
+Existing appointments get the default duration and their appointment_end is filled
+in before the column becomes NOT NULL, so every row takes part in conflict checks.
+On PostgreSQL the per-artist exclusion constraints (btree_gist) come last; the
+upgrade stops with the offending ids if live appointments already overlap.
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2b4f6e1c38'
+down_revision = '7c3d9e1a4f60'
+branch_labels = None
+depends_on = None
+
+DEFAULT_APPOINTMENT_MINUTES = int(os.getenv('DEFAULT_APPOINTMENT_MINUTES', 60))
+TABLES = ('bookings', 'piercings')
+LIVE = "status IS NULL OR status NOT IN ('cancelled', 'canceled')"
+
+
+def appointment_end(bind):
+    if bind.dialect.name == 'postgresql':
+        return "appointment_date + make_interval(mins => duration_minutes)"
+    # Keep the stored text format (fractional seconds included) so range comparisons still order correctly
+    return "substr(datetime(appointment_date, '+' || duration_minutes || ' minutes'), 1, 19) || substr(appointment_date, 20)"
+
+
+def constraint_exists(bind, name):
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {'name': name}
+    ).first() is not None
+
+
+def overlapping_ids(bind, table, limit=10):
+    """Ids of live appointments starting before an earlier one of the same artist has ended."""
+    return bind.execute(sa.text(f"""
+        SELECT id FROM (
+            SELECT id, appointment_date, max(appointment_end) OVER (
+                PARTITION BY artist_id ORDER BY appointment_date, id
+                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+            ) AS previous_end
+            FROM {table}
+            WHERE artist_id IS NOT NULL AND ({LIVE})
+        ) ordered
+        WHERE previous_end > appointment_date
+        ORDER BY id
+        LIMIT {limit}
+    """)).scalars().all()
+
+
+def upgrade():
+    bind = op.get_bind()
+    postgresql = bind.dialect.name == 'postgresql'
+    if postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    for table in TABLES:
+        columns = {column['name']: column for column in sa.inspect(bind).get_columns(table)}
+        if 'duration_minutes' not in columns:
+            op.add_column(table, sa.Column(
+                'duration_minutes', sa.Integer(), nullable=False, server_default=str(DEFAULT_APPOINTMENT_MINUTES)
+            ))
+        if 'appointment_end' not in columns:
+            op.add_column(table, sa.Column('appointment_end', sa.DateTime(), nullable=True))
+
+        if columns.get('appointment_end', {'nullable': True})['nullable']:
+            op.execute(f"UPDATE {table} SET appointment_end = {appointment_end(bind)} WHERE appointment_end IS NULL")
+            with op.batch_alter_table(table) as batch:
+                batch.alter_column('appointment_end', existing_type=sa.DateTime(), nullable=False)
+
+        name = f'ex_{table}_artist_overlap'
+        if postgresql and not constraint_exists(bind, name):
+            overlapping = overlapping_ids(bind, table)
+            if overlapping:
+                raise RuntimeError(
+                    f"{table} {overlapping} overlap earlier live appointments of the same artist. "
+                    f"Cancel or move them, then run `flask db upgrade` again."
+                )
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {name} EXCLUDE USING gist "
+                f"(artist_id WITH =, tsrange(appointment_date, appointment_end) WITH &&) WHERE ({LIVE})"
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table in reversed(TABLES):
+        if bind.dialect.name == 'postgresql':
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS ex_{table}_artist_overlap")
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('appointment_end')
+            batch.drop_column('duration_minutes')
@@ -0,0 +1,55 @@
+import os
+import uuid
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def application(tmp_path_factory):
+    """
+    The app module bound to a scratch database: a temporary SQLite file, or the
+    PostgreSQL database named by TEST_DATABASE_URI (its tables are dropped afterwards).
+    """
+    os.environ["DATABASE_URI"] = (
+        os.getenv("TEST_DATABASE_URI") or f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    )
+    os.environ["OUTBOX_WORKER"] = "false"
+    import app as application
+
+    with application.app.app_context():
+        application.db.drop_all()
+        application.db.create_all()
+        yield application
+        application.db.session.remove()
+        application.db.drop_all()
+
+
+@pytest.fixture
+def api(application):
+    client = application.app.test_client()
+
+    def call(method, url, **kwargs):
+        response = client.open(url, method=method, **kwargs)
+        # The test app context outlives requests, so end the session like request teardown would
+        application.db.session.remove()
+        return response
+
+    return call
+
+
+@pytest.fixture
+def make_artist(application):
+    def make():
+        db = application.db
+        suffix = uuid.uuid4().hex[:12]
+        user = application.User(username=f"artist-{suffix}", email=f"{suffix}@example.com", password_hash="x", user_type="artist")
+        db.session.add(user)
+        db.session.flush()
+        artist = application.Artist(name=f"Artist {suffix}", created_by=user.id)
+        db.session.add(artist)
+        db.session.commit()
+        artist_id = artist.id
+        db.session.remove()
+        return artist_id
+
+    return make
@@ -0,0 +1,74 @@
+"""
+Principal cache: a deletion or role change made on another worker reaches this
+worker's cached principals through the principals version stamp.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, update
+
+
+@pytest.fixture
+def make_user(application):
+    def make(user_type):
+        db = application.db
+        suffix = uuid.uuid4().hex[:12]
+        user = application.User(username=f"user-{suffix}", email=f"{suffix}@example.com", password_hash="x", user_type=user_type)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        db.session.remove()
+        return user_id
+
+    return make
+
+
+def stamp(application):
+    return application.db.session.execute(
+        application.select(application.TableVersion.version).where(application.TableVersion.table_name == "principals")
+    ).scalar() or 0
+
+
+def on_another_worker(application, statement):
+    """Change users the way another process would: commit, then publish the stamp."""
+    with application.db.engine.begin() as connection:
+        connection.execute(statement)
+    with application.db.engine.begin() as connection:
+        application.bump_table_versions(["principals"], connection)
+
+
+def test_admin_demoted_elsewhere_loses_admin_on_the_next_request(application, make_user):
+    users = application.User.__table__
+    user_id = make_user("admin")
+    assert application.load_principal(user_id, 1).user_type == "admin"
+
+    on_another_worker(application, update(users).where(users.c.id == user_id).values(user_type="artist"))
+
+    assert application.load_principal(user_id, 1).user_type == "artist"
+
+
+def test_cached_principals_are_revalidated_after_the_recheck_interval(application, make_user, monkeypatch):
+    users = application.User.__table__
+    user_id = make_user("artist")
+    assert application.load_principal(user_id, 1) is not None
+
+    on_another_worker(application, delete(users).where(users.c.id == user_id))
+    assert application.load_principal(user_id, 1) is not None  # Within PRINCIPAL_RECHECK_SECONDS
+
+    monkeypatch.setattr(application, "PRINCIPAL_RECHECK_SECONDS", 0)
+    assert application.load_principal(user_id, 1) is None
+
+
+def test_role_changes_bump_the_stamp_and_logins_do_not(application, make_user):
+    db = application.db
+    user = db.session.get(application.User, make_user("artist"))
+    before = stamp(application)
+
+    user.last_login = datetime.utcnow()
+    db.session.commit()
+    assert stamp(application) == before
+
+    user.user_type = "admin"
+    db.session.commit()
+    assert stamp(application) == before + 1
@@ -0,0 +1,48 @@
+"""
+Metric rollups: artist counters are written at commit and the platform row right after
+it, and nothing is written for a transaction that rolls back.
+"""
+import pytest
+
+from tests.test_scheduling import TEN_AM, booking
+
+
+@pytest.fixture
+def metrics(application):
+    def read(artist_id=None):
+        with application.app.app_context():
+            if artist_id is None:
+                return application.platform_metrics_row()
+            return application.artist_metrics(artist_id)
+
+    return read
+
+
+def test_rollups_follow_create_reassign_and_delete(api, make_artist, metrics):
+    first, second = make_artist(), make_artist()
+    platform = metrics()
+
+    created = api("POST", "/api/bookings", json=booking(first, TEN_AM, price=100)).json
+    assert (metrics(first)["bookings_count"], metrics(first)["bookings_earnings"]) == (1, 100)
+    assert metrics()["bookings_count"] == platform["bookings_count"] + 1
+
+    api("PATCH", f"/api/bookings/{created['id']}", json={"artist_id": second, "price": 150})
+    assert (metrics(first)["bookings_count"], metrics(first)["bookings_earnings"]) == (0, 0)
+    assert (metrics(second)["bookings_count"], metrics(second)["bookings_earnings"]) == (1, 150)
+    assert metrics()["bookings_earnings"] == platform["bookings_earnings"] + 150
+
+    api("DELETE", f"/api/bookings/{created['id']}")
+    assert metrics(second)["bookings_count"] == 0
+    assert metrics() == platform
+
+
+def test_rolled_back_deltas_are_discarded(application, make_artist, metrics):
+    artist_id = make_artist()
+    platform = metrics()
+
+    application.bump_metrics(artist_id, bookings_count=1, bookings_earnings=50.0)
+    application.db.session.rollback()
+    application.db.session.commit()
+
+    assert metrics(artist_id)["bookings_count"] == 0
+    assert metrics() == platform
@@ -0,0 +1,107 @@
+"""
+Migration tests: `flask db upgrade` on an empty database has to build exactly the
+schema the models declare, and a database holding pre-migration data has to come out
+backfilled.
+"""
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
+
+MIGRATIONS = str(Path(__file__).resolve().parent.parent / "migrations")
+BASELINE_REVISION = "0a4c2e9d5b17"
+
+
+@pytest.fixture
+def empty_database(application):
+    """An empty database for the test; the model schema is recreated afterwards."""
+    db = application.db
+
+    def clear():
+        db.session.remove()
+        db.drop_all()
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+    clear()
+    yield db
+    clear()
+    db.create_all()
+
+
+def schema_diff(db):
+    with db.engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), db.metadata)
+
+
+def test_upgrade_builds_the_model_schema(empty_database):
+    upgrade(directory=MIGRATIONS)
+
+    assert schema_diff(empty_database) == []
+
+
+def test_downgrade_to_base_drops_every_table(empty_database):
+    upgrade(directory=MIGRATIONS)
+    downgrade(directory=MIGRATIONS, revision="base")
+
+    assert set(inspect(empty_database.engine).get_table_names()) == {"alembic_version"}
+
+
+def test_upgrade_backfills_from_existing_rows(application, empty_database):
+    db = empty_database
+    upgrade(directory=MIGRATIONS, revision=BASELINE_REVISION)
+    now = datetime(2026, 3, 14, 9, 30)
+    with db.engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO users (id, username, email, password_hash, user_type) VALUES (1, 'ink', 'ink@example.com', 'x', 'artist')")
+        )
+        connection.execute(
+            text("INSERT INTO artists (id, name, created_at, updated_at, created_by) VALUES (1, 'Ink', :now, :now, 1), (2, 'Idle', :now, :now, 1)"),
+            {"now": now},
+        )
+        for price, day in ((100.0, 14), (50.0, 14), (25.0, 15)):
+            connection.execute(
+                text(
+                    "INSERT INTO bookings (booking_date, appointment_date, tattoo_style, tattoo_size, placement, artist_id,"
+                    " studio_location, price, status, name, phone_number, call_or_text_preference)"
+                    " VALUES (:now, :appointment, 'trad', 'small', 'arm', 1, 'Main', :price, 'pending', 'A', '555', 'text')"
+                ),
+                {"now": now, "appointment": now.replace(day=day), "price": price},
+            )
+        connection.execute(
+            text("INSERT INTO reviews (artist_id, star_rating, created_at) VALUES (1, 5, :now), (1, 3, :now)"), {"now": now}
+        )
+        connection.execute(
+            text("INSERT INTO subscribers (email, subscribed_at, is_active) VALUES ('a@example.com', :now, 1), ('b@example.com', :now, 0)"),
+            {"now": now},
+        )
+
+    upgrade(directory=MIGRATIONS)
+
+    appointments = db.session.execute(
+        db.select(application.Booking.appointment_date, application.Booking.appointment_end, application.Booking.duration_minutes)
+    ).all()
+    assert [(end - start, minutes) for start, end, minutes in appointments] == [(timedelta(hours=1), 60)] * 3
+    ratings = db.session.execute(
+        text("SELECT rating_count, rating_sum, average_rating, star_3_count, star_5_count FROM artists ORDER BY id")
+    ).all()
+    assert [tuple(row) for row in ratings] == [(2, 8, 4.0, 1, 1), (0, 0, None, 0, 0)]
+    artist_metrics = dict(db.session.execute(text("SELECT artist_id, bookings_count FROM artist_metrics")).all())
+    assert artist_metrics == {1: 3, 2: 0}
+    platform = db.session.execute(
+        text("SELECT bookings_count, bookings_earnings, reviews_count, rating_sum FROM platform_metrics WHERE id = 1")
+    ).one()
+    assert tuple(platform) == (3, 175.0, 2, 8)
+    daily = db.session.execute(
+        db.select(db.metadata.tables["daily_appointment_stats"]).order_by(text("day"))
+    ).all()
+    assert [(row.day, row.bookings_count, row.bookings_earnings) for row in daily] == [
+        (date(2026, 3, 14), 2, 150.0), (date(2026, 3, 15), 1, 25.0),
+    ]
+    assert db.session.execute(text("SELECT count(*) FROM subscription_events WHERE event_type = 'subscribe'")).scalar() == 2
+    monthly = db.session.execute(db.select(db.metadata.tables["subscriber_monthly_stats"])).all()
+    assert [(row.month, row.subscribe_count) for row in monthly] == [(date(2026, 3, 1), 2)]
@@ -0,0 +1,33 @@
+"""
+Cursor pagination: a cursor resumes only the result set it was issued for.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def newsletters(application):
+    db = application.db
+    start = datetime(2026, 5, 1, 12, 0)
+    for day, title in enumerate(("Flash sale", "Flash day", "Guest artist", "Guest spot")):
+        db.session.add(application.Newsletter(title=title, body="...", created_at=start + timedelta(days=day)))
+    db.session.commit()
+    db.session.remove()
+
+
+def test_cursor_pages_through_one_search(api, newsletters):
+    first = api("GET", "/api/newsletters?search=Flash&per_page=1&cursor=").json
+    second = api("GET", f"/api/newsletters?search=Flash&per_page=1&cursor={first['next_cursor']}").json
+
+    titles = [item["title"] for item in first["newsletters"] + second["newsletters"]]
+    assert sorted(titles) == ["Flash day", "Flash sale"]
+
+
+@pytest.mark.parametrize("search", ["Guest", ""])
+def test_cursor_is_rejected_for_a_different_search(api, newsletters, search):
+    first = api("GET", "/api/newsletters?search=Flash&per_page=1&cursor=").json
+
+    response = api("GET", f"/api/newsletters?search={search}&per_page=1&cursor={first['next_cursor']}")
+
+    assert response.status_code == 400
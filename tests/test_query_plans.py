@@ -0,0 +1,56 @@
+"""
+Query plan regression tests: seed every table QUERY_PLAN_CHECKS reads past
+PLAN_CHECK_MIN_ROWS with the benchmark generators, then require each hot query to be
+planned on an index.
+"""
+import random
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from benchmarks import datagen
+
+
+@pytest.fixture(scope="module")
+def seeded(application):
+    db = application.db
+    rng = random.Random(23)
+    now = datetime(2026, 1, 1)
+    count = application.PLAN_CHECK_MIN_ROWS + 500
+
+    def load(model, rows):
+        datagen.insert_batches(db, model.__table__, rows, 5_000)
+
+    load(application.User, datagen.user_rows(rng, count, "x" * 60, now))
+    user_ids = list(db.session.execute(db.select(application.User.id)).scalars())
+    load(application.Artist, datagen.artist_rows(rng, count, user_ids))
+    artist_ids = list(db.session.execute(db.select(application.Artist.id).order_by(application.Artist.id)).scalars())
+    load(application.Booking, datagen.appointment_rows(rng, "booking", count, artist_ids, now))
+    load(application.Piercing, datagen.appointment_rows(rng, "piercing", count, artist_ids, now))
+    load(application.Review, datagen.review_rows(rng, count, artist_ids, now))
+    load(application.Gallery, datagen.gallery_rows(rng, count, artist_ids, now))
+    load(application.Inquiry, datagen.inquiry_rows(rng, count, now))
+    load(application.Subscriber, datagen.subscriber_rows(rng, count, now))
+    return application
+
+
+def test_hot_queries_use_indexes(seeded):
+    report = seeded.query_plan_report()
+
+    assert [entry["status"] for entry in report] == ["ok"] * len(seeded.QUERY_PLAN_CHECKS), report
+
+
+def test_missing_index_is_reported_as_sequential_scan(seeded):
+    db = seeded.db
+    db.session.execute(text("DROP INDEX ix_inquiries_submitted_at"))
+    db.session.commit()
+    try:
+        report = {entry["query"]: entry for entry in seeded.query_plan_report()}
+        assert report["latest inquiries"]["status"] == "seq_scan"
+        assert report["latest inquiries"]["sequential_scans"] == ["inquiries"]
+    finally:
+        result = seeded.app.test_cli_runner().invoke(args=["create-indexes"])
+        assert result.exit_code == 0, result.output
+
+    assert all(entry["status"] == "ok" for entry in seeded.query_plan_report())
@@ -0,0 +1,132 @@
+"""
+Double-booking detection: an artist's live bookings and piercings may touch but not
+overlap, cancelled appointments free their slot, and updates never conflict with the
+appointment being updated.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+DATE_FORMAT = '%A, %B %d, %Y %I:%M %p'
+TEN_AM = datetime(2030, 6, 3, 10, 0)
+
+
+@pytest.fixture
+def artist_id(make_artist):
+    return make_artist()
+
+
+def booking(artist_id, start, **fields):
+    return {
+        "tattoo_style": "traditional", "tattoo_size": "small", "placement": "forearm", "artist_id": artist_id,
+        "studio_location": "Main", "appointment_date": start.strftime(DATE_FORMAT), "price": 100,
+        "name": "Client", "phone_number": "5550100", "call_or_text_preference": "text", **fields,
+    }
+
+
+def piercing(artist_id, start, **fields):
+    return {
+        "piercing_type": "ear", "jewelry_type": "stud", "placement": "left lobe", "artist_id": artist_id,
+        "studio_location": "Main", "appointment_date": start.strftime(DATE_FORMAT), "price": 40,
+        "name": "Client", "phone_number": "5550100", "call_or_text_preference": "call", **fields,
+    }
+
+
+def test_overlapping_booking_is_rejected_with_the_conflict(api, artist_id):
+    first = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM))
+    assert first.status_code == 201, first.json
+
+    response = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM + timedelta(minutes=30)))
+
+    assert response.status_code == 409
+    assert response.json == {
+        "error": "The artist already has an appointment at that time.",
+        "conflict": {
+            "type": "booking",
+            "id": first.json["id"],
+            "appointment_date": first.json["appointment_date"],
+            "appointment_end": first.json["appointment_end"],
+        },
+    }
+
+
+def test_appointment_containing_another_is_rejected(api, artist_id):
+    assert api("POST", "/api/bookings", json=booking(artist_id, TEN_AM, duration_minutes=30)).status_code == 201
+
+    response = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM - timedelta(hours=1), duration_minutes=180))
+
+    assert response.status_code == 409
+
+
+def test_back_to_back_appointments_are_allowed(api, artist_id):
+    assert api("POST", "/api/bookings", json=booking(artist_id, TEN_AM)).status_code == 201
+
+    after = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM + timedelta(hours=1)))
+    before = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM - timedelta(minutes=30), duration_minutes=30))
+
+    assert after.status_code == 201, after.json
+    assert before.status_code == 201, before.json
+
+
+def test_other_artists_are_not_blocked(api, artist_id, make_artist):
+    assert api("POST", "/api/bookings", json=booking(artist_id, TEN_AM)).status_code == 201
+
+    assert api("POST", "/api/bookings", json=booking(make_artist(), TEN_AM)).status_code == 201
+
+
+def test_bookings_and_piercings_conflict_with_each_other(api, artist_id):
+    tattoo = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM, duration_minutes=120))
+    assert tattoo.status_code == 201
+
+    response = api("POST", "/api/piercings", json=piercing(artist_id, TEN_AM + timedelta(hours=1)))
+    assert response.status_code == 409
+    assert response.json["conflict"]["type"] == "booking"
+    assert response.json["conflict"]["id"] == tattoo.json["id"]
+
+    ear = api("POST", "/api/piercings", json=piercing(artist_id, TEN_AM + timedelta(hours=2)))
+    assert ear.status_code == 201, ear.json
+    response = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM + timedelta(hours=2, minutes=30)))
+    assert response.status_code == 409
+    assert response.json["conflict"]["type"] == "piercing"
+    assert response.json["conflict"]["id"] == ear.json["id"]
+
+
+@pytest.mark.parametrize("status", ["cancelled", "canceled"])
+def test_cancelled_appointments_free_their_slot(api, artist_id, status):
+    first = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM)).json
+    assert api("PATCH", f"/api/bookings/{first['id']}", json={"status": status}).status_code == 200
+
+    replacement = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM))
+    assert replacement.status_code == 201, replacement.json
+
+    reinstated = api("PATCH", f"/api/bookings/{first['id']}", json={"status": "pending"})
+    assert reinstated.status_code == 409
+    assert reinstated.json["conflict"]["id"] == replacement.json["id"]
+
+
+def test_update_does_not_conflict_with_itself(api, artist_id):
+    first = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM)).json
+
+    longer = api("PATCH", f"/api/bookings/{first['id']}", json={"duration_minutes": 90})
+    moved = api("PATCH", f"/api/bookings/{first['id']}", json={
+        "appointment_date": (TEN_AM + timedelta(minutes=30)).strftime(DATE_FORMAT),
+    })
+
+    assert longer.status_code == 200, longer.json
+    assert moved.status_code == 200, moved.json
+    assert moved.json["duration_minutes"] == 90
+
+
+def test_update_into_another_appointment_is_rejected(api, artist_id):
+    first = api("POST", "/api/bookings", json=booking(artist_id, TEN_AM)).json
+    second = api("POST", "/api/piercings", json=piercing(artist_id, TEN_AM + timedelta(hours=2))).json
+
+    response = api("PATCH", f"/api/piercings/{second['id']}", json={
+        "appointment_date": (TEN_AM + timedelta(minutes=45)).strftime(DATE_FORMAT),
+    })
+
+    assert response.status_code == 409
+    assert response.json["conflict"] == {
+        "type": "booking", "id": first["id"],
+        "appointment_date": first["appointment_date"], "appointment_end": first["appointment_end"],
+    }
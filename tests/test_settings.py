@@ -0,0 +1,45 @@
+"""
+Global settings keep their stored type: keys holding a boolean stay boolean whatever
+form the update takes, and other keys store the value as sent.
+"""
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def api(api, application):
+    """Requests carrying a bearer token, which updating a setting needs."""
+    token = application.generate_token({"user_id": 1, "username": "admin", "user_type": "admin"})
+    return lambda method, url, **kwargs: api(method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+
+
+@pytest.fixture
+def key(api):
+    key = f"flag-{uuid.uuid4().hex[:8]}"
+    assert api("PATCH", f"/api/global-settings/{key}", json={"value": True}).json[key] is True
+    return key
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("TRUE", True), (0, False), (1, True), (False, False)])
+def test_boolean_setting_stays_boolean(api, key, value, expected):
+    response = api("PATCH", f"/api/global-settings/{key}", json={"value": value})
+
+    assert response.status_code == 200, response.json
+    assert response.json[key] is expected
+    assert api("GET", f"/api/global-settings/{key}").json[key] is expected
+
+
+@pytest.mark.parametrize("value", ["yes", 2, 0.5])
+def test_boolean_setting_rejects_other_values(api, key, value):
+    response = api("PATCH", f"/api/global-settings/{key}", json={"value": value})
+
+    assert response.status_code == 400
+    assert api("GET", f"/api/global-settings/{key}").json[key] is True
+
+
+def test_new_keys_keep_the_type_sent(api):
+    key = f"banner-{uuid.uuid4().hex[:8]}"
+
+    assert api("PATCH", f"/api/global-settings/{key}", json={"value": "Closed Monday"}).json[key] == "Closed Monday"
+    assert api("PATCH", f"/api/global-settings/{key}", json={"value": "false"}).json[key] == "false"